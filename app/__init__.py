@@ -17,6 +17,10 @@ def create_app(test_config=None):
     load_dotenv()
     app = Flask(__name__)
 
+    # ---- Profil (development / production) ----
+    APP_ENV = os.getenv("APP_ENV", "development").lower()
+    PRODUCTION = APP_ENV == "production"
+
     # ---- Cesty / limity ----
     BASE_DIR   = os.path.abspath(os.path.dirname(__file__))
     DATA_DIR   = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "..", "data"))
@@ -25,6 +29,33 @@ def create_app(test_config=None):
     REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join(BASE_DIR, "..", "storage", "reports"))  # CSV
     PDFS_DIR    = os.getenv("PDFS_DIR",    os.path.join(BASE_DIR, "..", "storage", "pdfs"))     # <-- PDF
     MAX_MB     = int(os.getenv("MAX_CONTENT_LENGTH_MB", "5"))
+    STORAGE_INDEX_TTL = float(os.getenv("STORAGE_INDEX_TTL", "30"))
+    PDF_LINEARIZE = os.getenv("PDF_LINEARIZE", "false").lower() in ("1", "true", "yes")
+    DURATION_BASELINE_WINDOW = int(os.getenv("DURATION_BASELINE_WINDOW", "10"))
+    DURATION_REGRESSION_THRESHOLD = float(os.getenv("DURATION_REGRESSION_THRESHOLD", "0.5"))
+    DURATION_REGRESSION_MIN_MS = int(os.getenv("DURATION_REGRESSION_MIN_MS", "500"))
+    SLOWEST_N = int(os.getenv("SLOWEST_N", "10"))
+    LIVE_BACKLOG = int(os.getenv("LIVE_BACKLOG", "1000"))
+    LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", "0.5"))
+    RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "3600"))
+    RETENTION_BATCH = int(os.getenv("RETENTION_BATCH", "500"))
+    RETENTION_UNLINK_RATE = float(os.getenv("RETENTION_UNLINK_RATE", "200"))
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+    METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(DATA_DIR, "metrics"))
+    METRICS_STORAGE_INTERVAL = float(os.getenv("METRICS_STORAGE_INTERVAL", "300"))
+    READY_CACHE_TTL = float(os.getenv("READY_CACHE_TTL", "5"))
+    READY_DB_TIMEOUT = float(os.getenv("READY_DB_TIMEOUT", "1"))
+    READY_MIN_FREE_MB = int(os.getenv("READY_MIN_FREE_MB", "100"))
+    READY_WAL_MAX_MB = int(os.getenv("READY_WAL_MAX_MB", "64"))
+    PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", os.path.join(DATA_DIR, "parse-cache"))
+    PARSE_WAIT_TIMEOUT = float(os.getenv("PARSE_WAIT_TIMEOUT", "60"))
+    PARSE_CACHE_TTL = float(os.getenv("PARSE_CACHE_TTL", "600"))
+    PARSE_SHARE_MIN_BYTES = int(os.getenv("PARSE_SHARE_MIN_BYTES", str(1024 * 1024)))
+    STATIC_FINGERPRINT = os.getenv("STATIC_FINGERPRINT", str(PRODUCTION)).lower() in ("1", "true", "yes")
+    STATIC_CACHE_DIR = os.getenv("STATIC_CACHE_DIR", os.path.join(DATA_DIR, "static"))
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "true").lower() in ("1", "true", "yes")
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_MIMETYPES = os.getenv("COMPRESS_MIMETYPES")
 
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     os.makedirs(UPLOAD_DIR,  exist_ok=True)
@@ -57,9 +88,69 @@ def create_app(test_config=None):
         REPORTS_DIR=REPORTS_DIR,  # CSV
         PDFS_DIR=PDFS_DIR,        # <-- PDF             # <— zaregistrované v configu
         MAX_CONTENT_LENGTH=MAX_MB * 1024 * 1024,
+        PDF_LINEARIZE=PDF_LINEARIZE,  # linearizovat PDF při uploadu (pikepdf / qpdf)
+        STORAGE_INDEX_TTL=STORAGE_INDEX_TTL,  # s – index vlastníků adresářů v úložišti
+
+        # Backend úložiště: "local" (adresáře výše) nebo "s3" (adresáře = lokální cache)
+        STORAGE_BACKEND=STORAGE_BACKEND,
+        S3_BUCKET=os.getenv("S3_BUCKET"),
+        S3_ENDPOINT_URL=os.getenv("S3_ENDPOINT_URL"),   # MinIO / moto, jinak AWS
+        S3_REGION=os.getenv("S3_REGION"),
+        S3_PREFIX=os.getenv("S3_PREFIX", ""),
+        S3_PRESIGN_EXPIRES=int(os.getenv("S3_PRESIGN_EXPIRES", "300")),  # s – platnost download URL
+        S3_CACHE_MAX_MB=int(os.getenv("S3_CACHE_MAX_MB", "2048")),  # limit stažených kopií v procesu (0 = bez limitu)
+
+        # Analytika délek testů (počítá se při uploadu běhu)
+        DURATION_BASELINE_WINDOW=DURATION_BASELINE_WINDOW,            # posledních N běhů v baseline
+        DURATION_REGRESSION_THRESHOLD=DURATION_REGRESSION_THRESHOLD,  # 0.5 = o 50 % pomalejší
+        DURATION_REGRESSION_MIN_MS=DURATION_REGRESSION_MIN_MS,        # a zároveň aspoň o tolik ms
+        SLOWEST_N=SLOWEST_N,
+
+        # Živé běhy (append endpoint + SSE)
+        INGEST_TOKEN=os.getenv("INGEST_TOKEN"),    # Bearer token pro test runnery (jinak admin session)
+        LIVE_BACKLOG=LIVE_BACKLOG,                 # max. událostí v paměti na běh
+        LIVE_POLL_INTERVAL=LIVE_POLL_INTERVAL,     # s – jak často tail čte CSV běhu
+
+        # Hromadný import (`flask reports import`) – nové sekvence se zakládají v této sekci
+        IMPORT_SECTION=os.getenv("IMPORT_SECTION", "Import"),
+
+        # Retence (RetentionPolicy) – mazání po dávkách, soubory s limitem
+        DATA_DIR=DATA_DIR,
+        RETENTION_INTERVAL=RETENTION_INTERVAL,        # s mezi průchody na pozadí (0 = vypnuto)
+        RETENTION_BATCH=RETENTION_BATCH,              # řádků v jedné transakci
+        RETENTION_UNLINK_RATE=RETENTION_UNLINK_RATE,  # smazaných souborů za sekundu (0 = bez limitu)
+
+        # Metriky (GET /metrics, Prometheus) – soubory procesů pro sčítání přes workery
+        METRICS_DIR=METRICS_DIR,
+        METRICS_TOKEN=os.getenv("METRICS_TOKEN"),                # Bearer token pro scrape (jinak veřejné)
+        METRICS_STORAGE_INTERVAL=METRICS_STORAGE_INTERVAL,      # s mezi vzorky velikostí úložiště (0 = vypnuto)
+
+        # Readiness (GET /readyz) – DB, zápis a místo v úložišti, checkpoint WAL
+        READY_CACHE_TTL=READY_CACHE_TTL,      # s – jak dlouho platí výsledek kontrol
+        READY_DB_TIMEOUT=READY_DB_TIMEOUT,    # s – busy timeout dotazu / zámku DB
+        READY_MIN_FREE_MB=READY_MIN_FREE_MB,  # min. volné místo v každém adresáři úložiště
+        READY_WAL_MAX_MB=READY_WAL_MAX_MB,    # max. nezcheckpointovaný objem WAL
+
+        # Single-flight parsování reportů bez sidecaru (v procesu + flock mezi workery)
+        PARSE_CACHE_DIR=PARSE_CACHE_DIR,              # zámky a sdílené výsledky parsování
+        PARSE_WAIT_TIMEOUT=PARSE_WAIT_TIMEOUT,        # s – max. čekání na parse jiného workeru
+        PARSE_CACHE_TTL=PARSE_CACHE_TTL,              # s – po jaké době se sdílený výsledek uklidí
+        PARSE_SHARE_MIN_BYTES=PARSE_SHARE_MIN_BYTES,  # menší soubory se sdílí jen v procesu
+
+        # Statické soubory – otisky v URL, immutable cache, předkomprimované .br/.gz
+        STATIC_FINGERPRINT=STATIC_FINGERPRINT,  # výchozí jen v produkci (CSS se jinak mění bez restartu)
+        STATIC_CACHE_DIR=STATIC_CACHE_DIR,
+
+        # Komprese odpovědí (gzip/brotli) – HTML, JSON, text; soubory a SSE ne
+        COMPRESS_RESPONSES=COMPRESS_RESPONSES,  # vypnout, když komprimuje reverse proxy
+        COMPRESS_MIN_SIZE=COMPRESS_MIN_SIZE,    # B – menší hotová těla beze změny
+        COMPRESS_MIMETYPES=COMPRESS_MIMETYPES,  # čárkami oddělený seznam (jinak výchozí v utils/compression)
+        COMPRESS_GZIP_LEVEL=int(os.getenv("COMPRESS_GZIP_LEVEL", "6")),
+        COMPRESS_BR_LEVEL=int(os.getenv("COMPRESS_BR_LEVEL", "4")),
 
-        # Dev
-        TEMPLATES_AUTO_RELOAD=True,
+        # Profil – v produkci se šablony nekontrolují na změny při každém renderu
+        APP_ENV=APP_ENV,
+        TEMPLATES_AUTO_RELOAD=not PRODUCTION,
     )
 
     if test_config:
@@ -97,16 +188,76 @@ def create_app(test_config=None):
     from .models.suite_model import Suite      # noqa
     from .models.run_model import Run          # noqa
     from .models.pdf_model import PdfReport  # noqa
+    from .models.run_stats_model import RunStats  # noqa
+    from .models.test_baseline_model import TestBaseline  # noqa
+    from .models.run_shard_model import RunShard  # noqa
+    from .models.retention_model import RetentionPolicy  # noqa
+    from .models.suite_health_model import SuiteHealth  # noqa
 
-    # Healthcheck
+    # Index vlastníků storage adresářů (kontrola přístupu k souborům bez DB dotazu)
+    from app.utils.storage_index import StorageIndex
+    app.extensions["storage_index"] = StorageIndex(ttl=app.config["STORAGE_INDEX_TTL"])
+
+    # Úložiště souborů (logos / reports / pdfs) – lokální disk nebo S3
+    from app.utils.storage_backend import make_storage
+    app.extensions["storage"] = make_storage(app.config)
+
+    # Fan-out živých běhů pro SSE (per proces)
+    from app.utils.live_hub import LiveHub
+    app.extensions["live_hub"] = LiveHub(backlog=app.config["LIVE_BACKLOG"],
+                                         poll_interval=app.config["LIVE_POLL_INTERVAL"])
+
+    # Single-flight parsování (souběžné požadavky na stejný report = jeden parse)
+    from app.utils.parse_flight import ParseFlight
+    app.extensions["parse_flight"] = ParseFlight(app.config["PARSE_CACHE_DIR"],
+                                                 wait_timeout=app.config["PARSE_WAIT_TIMEOUT"],
+                                                 ttl=app.config["PARSE_CACHE_TTL"],
+                                                 min_bytes=app.config["PARSE_SHARE_MIN_BYTES"])
+
+    # Retence na pozadí (jen jeden proces – zámek v DATA_DIR); vlákno spustí
+    # až první požadavek, CLI (`flask db`, `flask reports …`) ho nespouští
+    if app.config["RETENTION_INTERVAL"] > 0 and not app.testing:
+        from app.utils.retention import RetentionWorker
+        worker = RetentionWorker(app, app.config["RETENTION_INTERVAL"], os.path.dirname(DB_PATH))
+        app.extensions["retention"] = worker
+        app.before_request(worker.ensure_started)
+
+    # Jinja filtr pro délky v ms ("1:02.345" / "3.210s")
+    from app.utils.csv_report import _ms_fmt
+    app.add_template_filter(_ms_fmt, "ms_fmt")
+    # "před 5 min" (dashboard – čas od posledního běhu)
+    from app.utils.suite_health import time_ago
+    app.add_template_filter(time_ago, "ago")
+
+    # Otiskované statické soubory (url_for('static') → css/x.<hash>.css)
+    from app.utils import static_assets
+    static_assets.init_app(app)
+
+    # Komprese odpovědí pro všechny blueprinty (after_request)
+    from app.utils import compression
+    compression.init_app(app)
+
+    # Healthcheck (liveness) – konstanta, nesahá na DB ani disk
     @app.get("/healthz")
     def healthz():
         return {"ok": True}
 
+    # Readiness – DB, úložiště a WAL, výsledek cachovaný (GET /readyz)
+    from app.utils import health
+    health.init_app(app)
+
+    # Metriky (latence, SQL, parsování, uploady, cache, úložiště) – GET /metrics
+    from app.utils import metrics
+    metrics.init_app(app)
+
     # Blueprinty
     from app.routes import bp
     from app.admin.routes import admin_bp
     app.register_blueprint(bp)
     app.register_blueprint(admin_bp, url_prefix="/admin")
 
+    # CLI (`flask reports ...`)
+    from app.cli import reports_cli
+    app.cli.add_command(reports_cli)
+
     return app
@@ -1,73 +1,92 @@
 from __future__ import annotations
 from flask import (
     Blueprint, render_template, request, redirect, url_for, session,
-    flash, current_app, send_from_directory
+    flash, current_app
 )
 from app.forms.project_form import ProjectCreateForm
-from werkzeug.security import check_password_hash, safe_join
+from werkzeug.security import check_password_hash
 from app.models.project_model import Project
 from werkzeug.utils import secure_filename
 from app.models.run_model import Run
+from app.models.run_shard_model import RunShard
+from app.models.run_stats_model import RunStats
 from app.models.suite_model import Suite
 from app.forms.suite_form import SuiteForm
 from app import db, csrf
-from uuid import uuid4
+import csv
+import hmac
+import io
 import os
-import shutil
+import uuid
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from app.models.pdf_model import PdfReport
-from app.utils.csv_report import parse_report_csv
+from app.utils.report_archive import is_archived, remove_member, report_exists
+from app.utils.report_sidecar import SUFFIX as SIDECAR_SUFFIX, load_report_summary, write_sidecar
+from app.utils.logo_images import logo_files, save_logo
+from app.utils.pdf_linearize import linearize_pdf
+from app.utils.pdf_preview import (
+    META_SUFFIX, THUMB_SUFFIX, load_pdf_previews, remove_pdf_preview, submit_pdf_preview,
+)
+from app.utils.csv_report import _ms_fmt
+from app.utils.report_columns import read_report_columns
+from app.utils.report_parsers import allowed_report, detect_parser
+from app.utils.report_import import file_hash
+from app.utils.duration_analytics import (
+    add_shard_analytics, analytics_options, record_run_analytics_from_config,
+)
+from app.utils.run_shards import load_shard_reports
+from app.utils.live_hub import DONE_SUFFIX as LIVE_DONE_SUFFIX, clear_finished, mark_finished, normalize_status
+from app.utils.metrics import observe_upload
+from app.utils.slugs import save_with_unique_slugs
+from app.utils.storage_backend import KIND_LOGOS, get_storage
+from app.utils.storage_index import KIND_PDFS, KIND_REPORTS
+from app.utils.suite_health import dashboard as health_dashboard, refresh_suite_health
 
 # =============================================================================
 # ADMIN BLUEPRINT
 # =============================================================================
 admin_bp = Blueprint("admin", __name__, template_folder="templates")
 
-ALLOWED = {"csv"}
-
 def _allowed_csv(name: str) -> bool:
-    return "." in name and name.rsplit(".", 1)[1].lower() in ALLOWED
+    # CSV + další formáty z registru parserů (JUnit XML, Playwright/Mocha JSON)
+    return allowed_report(name)
 
-# ---------- FS helpery (bezpečné mazání v REPORTS_DIR) ----------
+# ---------- Úložiště (lokální disk nebo S3 – viz app/utils/storage_backend.py) ----------
 
-def _reports_base() -> str:
-    return current_app.config["REPORTS_DIR"]
+def _reports_store():
+    return get_storage(KIND_REPORTS)
 
-def _pdfs_base():
-    return current_app.config.get("PDFS_DIR", os.path.join(current_app.instance_path, "pdfs"))
+def _pdfs_store():
+    return get_storage(KIND_PDFS)
 
 def _allowed_pdf(name: str) -> bool:
     return os.path.splitext(name)[1].lower() == ".pdf"
 
-def _rm_tree_safe(abs_path: str) -> None:
-    """Smaže celý strom, jen pokud leží uvnitř REPORTS_DIR."""
-    base = os.path.realpath(_reports_base())
-    target = os.path.realpath(abs_path)
-    if os.path.commonpath([base, target]) != base:
-        return
+def _rm_tree_safe(rel_dir: str) -> None:
+    """Smaže celý strom reportů pod `rel_dir` (jen uvnitř úložiště reportů)."""
     try:
-        shutil.rmtree(target)
-    except FileNotFoundError:
-        pass
-    except OSError:
-        # nechceme blokovat transakci kvůli FS chybě
-        pass
+        _reports_store().delete_prefix(rel_dir)
+    except Exception:
+        # nechceme blokovat transakci kvůli chybě úložiště
+        current_app.logger.warning("Report storage cleanup failed for %s", rel_dir, exc_info=True)
 
 def _rm_file_safe(rel_path: str) -> None:
-    """Smaže soubor podle relativní cesty v REPORTS_DIR."""
+    """Smaže report podle relativní cesty v úložišti reportů."""
     if not rel_path:
         return
-    base = _reports_base()
-    abs_path = safe_join(base, rel_path.lstrip("/\\"))
-    if not abs_path:
+    store = _reports_store()
+    if is_archived(rel_path):
+        abs_path = store.local_path(rel_path.lstrip("/\\"))
+        if abs_path:
+            remove_member(abs_path)  # člen archivu – jen vyřadit z indexu
         return
     try:
-        os.remove(abs_path)
-    except FileNotFoundError:
-        pass
-    except OSError:
+        store.delete(rel_path.lstrip("/\\"))
+    except Exception:
         pass
 
 def _prune_empty_dirs(rel_path: str, stop_at: str | None = None) -> None:
@@ -76,24 +95,35 @@ def _prune_empty_dirs(rel_path: str, stop_at: str | None = None) -> None:
     (relativně vůči REPORTS_DIR). V našem layoutu dává smysl stopnout na
     '<project_slug>' nebo '<project_slug>/<suite_slug>'.
     """
-    base = _reports_base()
-    cur = safe_join(base, rel_path.strip("/"))
-    if not cur:
+    _reports_store().prune_dirs(rel_path, stop_at=stop_at)
+
+def _publish_report(rel_path: str, abs_path: str) -> None:
+    """Report zapsaný do local_path(create=True) + jeho sidecar → úložiště."""
+    store = _reports_store()
+    store.put_file(rel_path, abs_path, content_type="text/csv" if rel_path.endswith(".csv") else None)
+    if os.path.isfile(abs_path + SIDECAR_SUFFIX):
+        store.put_file(rel_path + SIDECAR_SUFFIX, abs_path + SIDECAR_SUFFIX,
+                       content_type="application/octet-stream")
+
+def _save_logo(file):
+    """Uloží logo (varianty) do UPLOAD_DIR a publikuje je do úložiště log."""
+    store = get_storage(KIND_LOGOS)
+    fname = save_logo(file, current_app.config["UPLOAD_DIR"])
+    for name in logo_files(fname):
+        path = os.path.join(current_app.config["UPLOAD_DIR"], name)
+        if os.path.isfile(path):
+            store.put_file(name, path)
+    return fname
+
+def _remove_project_logo(p: Project) -> None:
+    """Smaže logo projektu (všechny varianty), pokud ho nesdílí jiný projekt se stejným obsahem."""
+    if not p.logo_path:
         return
-    base_real = os.path.realpath(base)
-    stop_abs = safe_join(base, (stop_at or "").strip("/")) if stop_at else base
-
-    try:
-        while True:
-            if not cur or os.path.realpath(cur) in (base_real, os.path.realpath(stop_abs)):
-                break
-            try:
-                os.rmdir(cur)  # smaže jen pokud je prázdná
-            except OSError:
-                break
-            cur = os.path.dirname(cur)
-    except Exception:
-        pass
+    shared = Project.query.filter(Project.logo_path == p.logo_path, Project.id != p.id).first()
+    if not shared:
+        store = get_storage(KIND_LOGOS)
+        for name in logo_files(p.logo_path):
+            store.delete(name)
 
 @admin_bp.get("/projects/<int:project_id>/open")
 def project_open(project_id: int):
@@ -107,7 +137,9 @@ def project_open(project_id: int):
 # --------- Ochrana: vše pod /admin kromě /login vyžaduje přihlášení ----------
 @admin_bp.before_request
 def _require_admin():
-    allowed = {"admin.login"}
+    # ingest živých běhů a upload reportů mají vlastní auth (Bearer token nebo admin) – viz _ingest_auth
+    allowed = {"admin.login", "admin.runs_upload",
+               "admin.runs_live_start", "admin.runs_live_append", "admin.runs_live_finish"}
     if request.endpoint in allowed:
         return
     if not session.get("is_admin"):
@@ -176,16 +208,12 @@ def projects_new():
 
         file = request.files.get("logo")
         if file and file.filename:
-            ext = file.filename.rsplit(".", 1)[-1].lower()
-            if ext in {"png","jpg","jpeg","webp","svg"}:
-                fname = f"{uuid4().hex}.{ext}"
-                path = os.path.join(current_app.config["UPLOAD_DIR"], secure_filename(fname))
-                os.makedirs(os.path.dirname(path), exist_ok=True)
-                file.save(path)
+            # zmenšené WebP varianty + PNG fallback, jména s hashem obsahu
+            fname = _save_logo(file)
+            if fname:
                 p.logo_path = fname
 
-        p.ensure_unique_slug()
-        db.session.add(p)
+        save_with_unique_slugs([p])
         db.session.commit()
         flash("Projekt vytvořen.", "success")
         return redirect(url_for("admin.projects"))
@@ -213,20 +241,12 @@ def projects_edit(project_id: int):
 
         file = request.files.get("logo")
         if file and file.filename:
-            ext = file.filename.rsplit(".", 1)[-1].lower()
-            if ext in {"png","jpg","jpeg","webp","svg"}:
-                fname = f"{uuid4().hex}.{ext}"
-                path = os.path.join(current_app.config["UPLOAD_DIR"], secure_filename(fname))
-                os.makedirs(os.path.dirname(path), exist_ok=True)
-                file.save(path)
-                if p.logo_path:
-                    try:
-                        os.remove(os.path.join(current_app.config["UPLOAD_DIR"], os.path.basename(p.logo_path)))
-                    except OSError:
-                        pass
+            fname = _save_logo(file)
+            if fname and fname != p.logo_path:
+                _remove_project_logo(p)
                 p.logo_path = fname
 
-        p.ensure_unique_slug()
+        save_with_unique_slugs([p])
         db.session.commit()
         flash("Projekt upraven.", "success")
         return redirect(url_for("admin.projects"))
@@ -239,16 +259,11 @@ def projects_delete(project_id: int):
     p = Project.query.get_or_404(project_id)
 
     # 1) Logo
-    if p.logo_path:
-        try:
-            os.remove(os.path.join(current_app.config["UPLOAD_DIR"], os.path.basename(p.logo_path)))
-        except OSError:
-            pass
+    _remove_project_logo(p)
 
     # 2) Smazání všech složek s reporty pro daný projekt:
     #    Nespoléháme jen na aktuální slug – projdeme běhy a sebereme top-level adresáře,
     #    protože slug se mohl v minulosti měnit.
-    base = _reports_base()
     top_dirs = set()
     for run in p.runs:
         rel = (run.csv_path or "").lstrip("/\\")
@@ -261,9 +276,7 @@ def projects_delete(project_id: int):
         top_dirs.add(p.slug)
 
     for top in top_dirs:
-        abs_dir = safe_join(base, top)
-        if abs_dir:
-            _rm_tree_safe(abs_dir)
+        _rm_tree_safe(top)
 
     # 3) DB delete (CASCADE smaže suites i runs)
     db.session.delete(p)
@@ -272,6 +285,14 @@ def projects_delete(project_id: int):
     flash("Projekt smazán.", "success")
     return redirect(url_for("admin.projects"))
 
+# --------- Dashboard: stav všech projektů a sekvencí (materializovaný suite_health) ----------
+@admin_bp.get("/dashboard")
+def dashboard():
+    q = (request.args.get("q") or "").strip()
+    failing = bool(request.args.get("failing"))
+    projects = health_dashboard(q=q, failing_only=failing)
+    return render_template("admin/dashboard.html", projects=projects, q=q, failing=failing)
+
 ######################### SUITES ROUTES #########################################
 
 @admin_bp.get("/projects/<int:project_id>")
@@ -353,8 +374,7 @@ def suites_new(project_id: int):
             order_index=form.order_index.data or 0,
             is_active=bool(form.is_active.data),
         )
-        s.ensure_unique_slug()
-        db.session.add(s)
+        save_with_unique_slugs([s])
         db.session.commit()
         flash("Sada vytvořena.", "success")
         return redirect(url_for("admin.suites", project_id=project.id))
@@ -390,7 +410,7 @@ def suites_edit(project_id: int, suite_id: int):
         s.order_index = form.order_index.data or 0
         s.is_active   = bool(form.is_active.data)
         s.parent_id   = parent_id
-        s.ensure_unique_slug()
+        save_with_unique_slugs([s])
         db.session.commit()
         flash("Uloženo.", "success")
         return redirect(url_for("admin.suites", project_id=project.id))
@@ -403,8 +423,6 @@ def suites_delete(project_id: int, suite_id: int):
     project = Project.query.get_or_404(project_id)
     s = Suite.query.filter_by(project_id=project.id, id=suite_id).first_or_404()
 
-    base = _reports_base()
-
     # 1) Které sady mazat na disku: tahle + všechny její přímé děti (u tebe je hloubka max 1)
     suites_to_wipe = [s] + list(s.children)
 
@@ -425,10 +443,8 @@ def suites_delete(project_id: int, suite_id: int):
 
     # 3) Smazat tyto adresáře a vyčistit prázdné rodiče až k <project>
     for rel_dir in dirs:
-        abs_dir = safe_join(base, rel_dir)
-        if abs_dir:
-            _rm_tree_safe(abs_dir)
-            _prune_empty_dirs(rel_dir, stop_at=project.slug)  # ostatní sekvence v projektu zůstanou
+        _rm_tree_safe(rel_dir)
+        _prune_empty_dirs(rel_dir, stop_at=project.slug)  # ostatní sekvence v projektu zůstanou
 
     # 4) DB – CASCADE odstraní děti i jejich runs
     db.session.delete(s)
@@ -440,9 +456,8 @@ def suites_delete(project_id: int, suite_id: int):
 
 @admin_bp.route("/storage/reports/<path:filename>")
 def storage_reports(filename):
-    base_dir = _reports_base()
-    # safe_join chrání proti traversal
-    return send_from_directory(base_dir, filename, conditional=True)
+    # backend chrání proti traversal (safe_join / klíč v bucketu)
+    return _reports_store().send(filename)
 
 @admin_bp.get("/projects/<int:project_id>/suites/<int:suite_id>/runs")
 def runs_list(project_id: int, suite_id: int):
@@ -452,28 +467,68 @@ def runs_list(project_id: int, suite_id: int):
     project = Project.query.get_or_404(project_id)
     suite   = Suite.query.filter_by(id=suite_id, project_id=project_id).first_or_404()
     runs    = (Run.query
+                  .options(selectinload(Run.stats_row), selectinload(Run.shards))
                   .filter_by(project_id=project.id, suite_id=suite.id)
                   .order_by(Run.created_at.desc())
                   .all())
 
-    base_dir = _reports_base()
+    store = _reports_store()
     for r in runs:
         r.stats = None
+        if r.is_sharded and r.stats_row is not None:
+            st = r.stats_row
+            r.stats = {"total": st.total, "passed": st.passed, "failed": st.failed,
+                       "skipped": st.skipped, "duration_fmt": _ms_fmt(st.duration_ms)}
+            continue
         try:
             rel = (r.csv_path or "").lstrip("/\\")
-            abs_path = safe_join(base_dir, rel)
-            if abs_path and os.path.isfile(abs_path):
-                rep = parse_report_csv(abs_path)
-                r.stats = rep.get("summary") or {}
+            abs_path = store.local_path(rel, companions=(SIDECAR_SUFFIX,))
+            if abs_path and report_exists(abs_path):
+                r.stats = load_report_summary(abs_path)
         except Exception:
             r.stats = None
 
     return render_template("admin/runs_list.html", project=project, suite=suite, runs=runs)
 
+def _shard_run(project: Project, suite: Suite, label: str, rel_path: str) -> Run:
+    """Běh shardů s daným labelem; první shard ho založí (souběžně bezpečně – unikátní index)."""
+    q = Run.query.filter_by(suite_id=suite.id, shard_label=label)
+    run = q.first()
+    if run is not None:
+        return run
+    run = Run(project_id=project.id, suite_id=suite.id, label=label,
+              shard_label=label, csv_path=rel_path)
+    try:
+        with db.session.begin_nested():
+            db.session.add(run)
+            db.session.flush()
+            db.session.add(RunStats(run_id=run.id, suite_id=suite.id, duration_hist={}))
+    except IntegrityError:
+        # stejný label právě založil jiný upload
+        return q.one()
+    return run
+
+def _ensure_run_stats(run: Run) -> None:
+    """Prázdný RunStats pro běh, který ho nemá (shard nahraný přes run_id)."""
+    if RunStats.query.filter_by(run_id=run.id).first() is not None:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(RunStats(run_id=run.id, suite_id=run.suite_id))
+    except IntegrityError:
+        pass
+
 @admin_bp.post("/projects/<int:project_id>/suites/<int:suite_id>/runs")
+@csrf.exempt
 def runs_upload(project_id: int, suite_id: int):
-    if not session.get("is_admin"):
+    # formulář v adminu (session + CSRF) nebo CI s Bearer INGEST_TOKEN (odpověď JSON)
+    api = request.headers.get("Authorization", "").startswith("Bearer ")
+    if not api and not session.get("is_admin"):
         return redirect(url_for("admin.login", next=request.path))
+    denied = _ingest_auth()
+    if denied:
+        return denied
+    api = api or request.accept_mimetypes.best == "application/json"
 
     project = Project.query.get_or_404(project_id)
     suite   = Suite.query.filter_by(id=suite_id, project_id=project_id).first_or_404()
@@ -482,35 +537,110 @@ def runs_upload(project_id: int, suite_id: int):
         nxt = request.form.get("next") or request.referrer or url_for("admin.projects")
         return redirect(nxt, code=303)  # 303 = See Other, nevyvolá znovu POST po F5
 
+    def _reply(message: str, category: str, status: int = 200, **data):
+        if api:
+            return {"ok": category == "success", "message": message, **data}, status
+        flash(message, category)
+        return _back()
+
     f = request.files.get("csv")
     label = (request.form.get("label") or "").strip()
 
     if not f or not f.filename:
-        flash("Vyber CSV soubor.", "error")
-        return _back()
+        return _reply("Vyber CSV soubor.", "error", 400)
     if not _allowed_csv(f.filename):
-        flash("Povolené jsou jen .csv soubory.", "error")
-        return _back()
+        return _reply("Povolené jsou jen reporty .csv, .xml (JUnit) a .json (Playwright, Mocha).", "error", 400)
+
+    # CI shardy: `shard` (např. "3/20") + cílový běh přes `run_id`,
+    # nebo stejný `label` – shardy se stejným labelem patří do jednoho běhu
+    shard_key = (request.form.get("shard") or "").strip()[:80]
+    run = None
+    if shard_key:
+        run_id = request.form.get("run_id", type=int)
+        if run_id:
+            run = Run.query.filter_by(id=run_id, project_id=project.id, suite_id=suite.id).first_or_404()
 
     ts   = datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
     safe = secure_filename(f.filename) or "report.csv"
+    if shard_key:
+        # shardy mívají stejné jméno souboru a přicházejí ve stejnou sekundu;
+        # náhodná část – ani opakovaný upload téhož shardu nepřepíše přijatý soubor
+        key = secure_filename(shard_key.replace('/', '-of-')) or 'x'
+        safe = f"shard-{key}-{uuid.uuid4().hex[:8]}-{safe}"
 
     rel_dir  = f"{project.slug}/{suite.slug}"
-    abs_dir  = os.path.join(_reports_base(), rel_dir)
-    os.makedirs(abs_dir, exist_ok=True)
-
     rel_path = f"{rel_dir}/{ts}-{safe}"
-    abs_path = os.path.join(_reports_base(), rel_path)
+    abs_path = _reports_store().local_path(rel_path, create=True)
     f.save(abs_path)
+    observe_upload("report", os.path.getsize(abs_path))
 
-    run = Run(project_id=project.id, suite_id=suite.id,
-              label=label or os.path.splitext(safe)[0],
-              csv_path=rel_path)
-    db.session.add(run)
+    if detect_parser(abs_path) is None:
+        os.remove(abs_path)
+        return _reply("Nerozpoznaný formát reportu.", "error", 400)
+
+    # report rozparsujeme jednou: binární sidecar (další zobrazení už CSV neparsují)
+    # + analytika délek (percentily, nejpomalejší testy, regrese proti baseline)
+    try:
+        rep = read_report_columns(abs_path)
+        write_sidecar(abs_path, rep)
+    except Exception as e:
+        rep = None
+        current_app.logger.warning("Report sidecar failed for %s: %s", abs_path, e)
+
+    if not shard_key:
+        _publish_report(rel_path, abs_path)
+        run = Run(project_id=project.id, suite_id=suite.id,
+                  label=label or os.path.splitext(safe)[0],
+                  csv_path=rel_path)
+        db.session.add(run)
+        # obsah pro `reports import --dedupe hash` (shardovaný běh nemá jeden soubor)
+        run.content_hash = file_hash(abs_path)
+        if rep is not None:
+            db.session.flush()  # run.id pro RunStats
+            record_run_analytics_from_config(run, rep, current_app.config)
+        refresh_suite_health([suite.id])
+        db.session.commit()
+        return _reply("CSV nahráno.", "success", 201, run_id=run.id)
+
+    if run is None:
+        if label:
+            run = _shard_run(project, suite, label, rel_path)
+        else:
+            run = Run(project_id=project.id, suite_id=suite.id,
+                      label=os.path.splitext(safe)[0], csv_path=rel_path)
+            db.session.add(run)
+            db.session.flush()
+            db.session.add(RunStats(run_id=run.id, suite_id=suite.id, duration_hist={}))
+    _ensure_run_stats(run)
+
+    summary = rep.summary() if rep is not None else {}
+    try:
+        # unikátní (run_id, shard_key) hlídá DB – i dva souběžné uploady téhož shardu
+        with db.session.begin_nested():
+            db.session.add(RunShard(
+                run_id=run.id, shard_key=shard_key, csv_path=rel_path,
+                total=summary.get("total", 0), passed=summary.get("passed", 0),
+                failed=summary.get("failed", 0), skipped=summary.get("skipped", 0),
+                duration_ms=summary.get("duration_ms", 0),
+            ))
+    except IntegrityError:
+        db.session.commit()  # případně založený běh zůstane pro ostatní shardy
+        _rm_file_safe(rel_path)
+        _rm_file_safe(rel_path + SIDECAR_SUFFIX)
+        return _reply(f"Shard {shard_key} už je v běhu nahraný.", "error", 409, run_id=run.id)
+    _publish_report(rel_path, abs_path)
+
+    if rep is not None:
+        # čítače se přičtou v SQL, percentily z histogramu délek běhu
+        store = _reports_store()
+        add_shard_analytics(run, rep, lambda: load_shard_reports(run, store, skip_key=shard_key),
+                            **analytics_options(current_app.config))
+    refresh_suite_health([suite.id])
     db.session.commit()
 
-    flash("CSV nahráno.", "success")
-    return _back()
+    count = RunShard.query.filter_by(run_id=run.id).count()
+    return _reply(f"Shard {shard_key} nahrán ({count} v běhu).", "success", 201,
+                  run_id=run.id, shards=count)
 
 
 @admin_bp.post("/projects/<int:project_id>/suites/<int:suite_id>/runs/<int:run_id>/delete")
@@ -520,9 +650,12 @@ def runs_delete(project_id: int, suite_id: int, run_id: int):
 
     run = Run.query.filter_by(id=run_id, project_id=project_id, suite_id=suite_id).first_or_404()
 
-    # 1) Smazat soubor
+    # 1) Smazat soubor (u shardovaného běhu všechny shardy)
     rel = (run.csv_path or "").lstrip("/\\")
-    _rm_file_safe(rel)
+    for path in {rel, *((sh.csv_path or "").lstrip("/\\") for sh in run.shards)}:
+        _rm_file_safe(path)
+        _rm_file_safe(path + SIDECAR_SUFFIX)
+        _rm_file_safe(path + LIVE_DONE_SUFFIX)
 
     # 2) Zkus vyčistit prázdné složky až k '<project>/<suite>'
     #    z rel cesty vezmeme první dva segmenty
@@ -532,11 +665,168 @@ def runs_delete(project_id: int, suite_id: int, run_id: int):
         _prune_empty_dirs(rel, stop_at=stop_at)
 
     db.session.delete(run)
+    refresh_suite_health([suite_id])
     db.session.commit()
 
     flash("Běh smazán.", "success")
     return redirect(url_for("admin.runs_list", project_id=project_id, suite_id=suite_id))
 
+# ---------- Živé běhy (append řádků během běhu testů) ----------
+
+LIVE_COLUMNS = ("describe", "test", "status", "duration", "timestamp", "timestampLocal")
+
+
+def _ingest_auth():
+    """Bearer INGEST_TOKEN (test runner) nebo admin session s CSRF tokenem. None = OK."""
+    token = current_app.config.get("INGEST_TOKEN")
+    auth = request.headers.get("Authorization", "")
+    if token and auth.startswith("Bearer ") and hmac.compare_digest(auth[7:].strip(), token):
+        return None
+    if session.get("is_admin"):
+        if current_app.config.get("WTF_CSRF_ENABLED", True):
+            csrf.protect()
+        return None
+    return {"ok": False, "error": "unauthorized"}, 401
+
+
+def _live_rows_payload() -> list:
+    """Řádky z JSON ({"rows": [...]} / [...]) nebo z text/csv (bez hlavičky, pořadí LIVE_COLUMNS)."""
+    if request.is_json:
+        data = request.get_json(silent=True)
+        rows = data.get("rows") if isinstance(data, dict) else data
+        return [r for r in (rows or []) if isinstance(r, dict)]
+    text = request.get_data(as_text=True)
+    return [dict(zip(LIVE_COLUMNS, rec)) for rec in csv.reader(io.StringIO(text)) if rec]
+
+
+@admin_bp.post("/projects/<int:project_id>/suites/<int:suite_id>/runs/live")
+@csrf.exempt
+def runs_live_start(project_id: int, suite_id: int):
+    denied = _ingest_auth()
+    if denied:
+        return denied
+    project = Project.query.get_or_404(project_id)
+    suite   = Suite.query.filter_by(id=suite_id, project_id=project_id).first_or_404()
+
+    payload = request.get_json(silent=True) or {}
+    label = (payload.get("label") or request.form.get("label") or "").strip()
+    ts = datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
+
+    # živý běh se appenduje do lokálního souboru, do úložiště jde až při finish
+    # náhodná přípona – dva starty stejné suity v jedné sekundě nesmí kolidovat
+    while True:
+        rel_path = f"{project.slug}/{suite.slug}/{ts}-live-{uuid.uuid4().hex[:8]}.csv"
+        try:
+            with open(_reports_store().local_path(rel_path, create=True), "x", encoding="utf-8", newline="") as fh:
+                csv.writer(fh).writerow(LIVE_COLUMNS)
+            break
+        except FileExistsError:
+            continue
+
+    run = Run(project_id=project.id, suite_id=suite.id, label=label or f"live {ts}",
+              csv_path=rel_path, live=True)
+    db.session.add(run)
+    db.session.flush()
+    db.session.add(RunStats(run_id=run.id, suite_id=suite.id))
+    refresh_suite_health([suite.id])
+    db.session.commit()
+
+    return {
+        "ok": True, "run_id": run.id, "csv_path": rel_path,
+        "append_url": url_for("admin.runs_live_append", run_id=run.id),
+        "finish_url": url_for("admin.runs_live_finish", run_id=run.id),
+        "events_url": url_for("bp.run_events", run_id=run.id),
+    }, 201
+
+
+@admin_bp.post("/runs/<int:run_id>/rows")
+@csrf.exempt
+def runs_live_append(run_id: int):
+    denied = _ingest_auth()
+    if denied:
+        return denied
+    run = Run.query.get_or_404(run_id)
+    if not run.live:
+        return {"ok": False, "error": "run is finished"}, 409
+
+    rows = _live_rows_payload()
+    if not rows:
+        return {"ok": True, "appended": 0}
+
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    counts = {"total": 0, "passed": 0, "failed": 0, "skipped": 0, "duration_ms": 0}
+    for r in rows:
+        rec = [str(r.get(c) if r.get(c) is not None else "") for c in LIVE_COLUMNS]
+        w.writerow(rec)
+        try:
+            dur = int(float(rec[3] or 0))
+        except ValueError:
+            dur = 0
+        status = normalize_status(rec[2])
+        counts["total"] += 1
+        counts["duration_ms"] += dur
+        if status in counts:
+            counts[status] += 1
+
+    # jeden write s O_APPEND – souběžné appendy se neproloží uvnitř dávky
+    abs_path = _reports_store().local_path(run.csv_path, create=True)
+    data = buf.getvalue().encode("utf-8")
+    fd = os.open(abs_path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    observe_upload("live", len(data))
+
+    # čítače atomicky v SQL (žádné read-modify-write mezi workery)
+    RunStats.query.filter_by(run_id=run.id).update(
+        {getattr(RunStats, k): getattr(RunStats, k) + v for k, v in counts.items()},
+        synchronize_session=False,
+    )
+    refresh_suite_health([run.suite_id])
+    db.session.commit()
+    current_app.extensions["live_hub"].poke(run.id)
+    return {"ok": True, "appended": counts["total"]}
+
+
+@admin_bp.post("/runs/<int:run_id>/finish")
+@csrf.exempt
+def runs_live_finish(run_id: int):
+    denied = _ingest_auth()
+    if denied:
+        return denied
+    run = Run.query.get_or_404(run_id)
+    if not run.live:
+        return {"ok": True, "already": True}
+
+    # finální analytika jako u běžného uploadu (percentily, top-N, baseline)
+    abs_path = _reports_store().local_path(run.csv_path, create=True)
+    rep = read_report_columns(abs_path)
+    if run.stats_row is not None:
+        db.session.delete(run.stats_row)
+        db.session.flush()
+    record_run_analytics_from_config(run, rep, current_app.config)
+    run.live = False
+    run.content_hash = file_hash(abs_path)
+    refresh_suite_health([run.suite_id])
+    db.session.commit()
+
+    # značka = signál pro tail vlákna ve všech procesech, že běh skončil;
+    # nezávisí na tom, jestli se povede sidecar
+    try:
+        mark_finished(abs_path)
+    except OSError as e:
+        current_app.logger.warning("Live finish marker failed for %s: %s", abs_path, e)
+    try:
+        write_sidecar(abs_path, rep)
+        clear_finished(abs_path)
+    except Exception as e:
+        current_app.logger.warning("Report sidecar failed for %s: %s", abs_path, e)
+    _publish_report(run.csv_path, abs_path)
+    current_app.extensions["live_hub"].poke(run.id)
+    return {"ok": True, "summary": rep.summary()}
+
 # =============================================================================
 # PUBLIC BLUEPRINT – projektový zámek (heslo)
 # =============================================================================
@@ -610,7 +900,8 @@ def web_pdf_list(project_id: int):
             .order_by(PdfReport.created_at.desc())
             .all())
 
-    return render_template("admin/web_pdf_list.html", project=project, pdfs=pdfs)
+    return render_template("admin/web_pdf_list.html", project=project, pdfs=pdfs,
+                           previews=load_pdf_previews(pdfs, _pdfs_store()))
 
 
 @admin_bp.post("/projects/<int:project_id>/pdfs")
@@ -636,17 +927,25 @@ def web_pdf_upload(project_id: int):
     ts   = datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
     safe = secure_filename(f.filename) or "report.pdf"
 
-    rel_dir  = f"{project.slug}"
-    abs_dir  = os.path.join(current_app.config["PDFS_DIR"], rel_dir)
-    os.makedirs(abs_dir, exist_ok=True)
-
-    rel_path = f"{rel_dir}/{ts}-{safe}"
-    abs_path = os.path.join(current_app.config["PDFS_DIR"], rel_path)
+    store    = _pdfs_store()
+    rel_path = f"{project.slug}/{ts}-{safe}"
+    abs_path = store.local_path(rel_path, create=True)
 
     f.save(abs_path)
+
+    # volitelně linearizace ("Fast Web View") – viewer ukáže 1. stranu hned
+    if current_app.config.get("PDF_LINEARIZE") or request.form.get("linearize"):
+        try:
+            linearize_pdf(abs_path)
+        except Exception as e:
+            current_app.logger.warning("PDF linearize failed for %s: %s", abs_path, e)
+
     size = None
     try: size = os.path.getsize(abs_path)
     except: pass
+    if size is not None:
+        observe_upload("pdf", size)
+    store.put_file(rel_path, abs_path, content_type="application/pdf")
 
     db.session.add(PdfReport(
         project_id=project.id,
@@ -656,6 +955,13 @@ def web_pdf_upload(project_id: int):
     ))
     db.session.commit()
 
+    # náhled + metadata na pozadí (thumbnail, počet stran, úryvek)
+    def _publish_preview(meta):
+        if meta.get("thumb"):
+            store.put_file(rel_path + THUMB_SUFFIX, abs_path + THUMB_SUFFIX, content_type="image/png")
+        store.put_file(rel_path + META_SUFFIX, abs_path + META_SUFFIX, content_type="application/json")
+    submit_pdf_preview(abs_path, current_app.logger, on_done=_publish_preview)
+
     flash("PDF nahráno.", "success")
     return back()
 
@@ -668,10 +974,13 @@ def web_pdf_delete(project_id: int, pdf_id: int):
     project = Project.query.get_or_404(project_id)
     doc = PdfReport.query.filter_by(id=pdf_id, project_id=project.id).first_or_404()
 
-    abs_path = os.path.join(current_app.config["PDFS_DIR"], doc.pdf_path)
+    store = _pdfs_store()
     try:
-        if os.path.exists(abs_path):
-            os.remove(abs_path)
+        for key in (doc.pdf_path, doc.pdf_path + THUMB_SUFFIX, doc.pdf_path + META_SUFFIX):
+            store.delete(key)
+        abs_path = store.local_path(doc.pdf_path)
+        if abs_path:
+            remove_pdf_preview(abs_path)  # lokální cache náhledu
     finally:
         db.session.delete(doc)
         db.session.commit()
@@ -0,0 +1,213 @@
+# app/asgi.py
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from werkzeug.wsgi import FileWrapper
+
+# ASGI vstup pro stávající Flask aplikaci (blueprinty beze změny).
+#
+# Rozdíl proti WSGI workerům: spojení drží event loop, ne vlákno.
+#   - view (DB, parsování reportů, šablony) běží v omezeném thread poolu,
+#   - tělo odpovědi se posílá po kusech: každý read() souboru/generátoru
+#     je krátký úkol v poolu, čekání na pomalého klienta (await send)
+#     žádné vlákno nedrží,
+#   - SSE stream živého běhu (LiveEventStream) má `__aiter__` a běží čistě
+#     v event loopu – tisíce otevřených streamů nestojí tisíce vláken.
+#
+# Spuštění:  uvicorn asgi:app --workers 2
+
+BODY_SPOOL = 1024 * 1024   # větší request body jde na disk
+READ_CHUNK = 64 * 1024
+
+
+class FlaskASGI:
+    def __init__(self, wsgi_app, threads: Optional[int] = None):
+        self.wsgi_app = wsgi_app
+        self.threads = threads or int(os.getenv("ASGI_THREADS", "32"))
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="asgi-wsgi")
+        return self._pool
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        else:  # websocket – aplikace je nepoužívá
+            await send({"type": "websocket.close", "code": 1000})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ---------- request ----------
+
+    async def _read_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL)
+        while True:
+            msg = await receive()
+            if msg["type"] == "http.disconnect":
+                body.close()
+                return None
+            body.write(msg.get("body", b""))
+            if not msg.get("more_body"):
+                break
+        body.seek(0)
+        return body
+
+    @staticmethod
+    def _environ(scope, body) -> dict:
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        path = scope.get("path", "/")
+        root = scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root):]
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": root.encode("utf-8").decode("latin-1"),
+            "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": str(server[0]),
+            "SERVER_PORT": str(server[1] or 80),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": client[0],
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+        }
+        for raw_name, raw_value in scope.get("headers", []):
+            name = raw_name.decode("latin-1").upper().replace("-", "_")
+            value = raw_value.decode("latin-1")
+            if name == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif name == "CONTENT_LENGTH":
+                environ["CONTENT_LENGTH"] = value
+            else:
+                key = f"HTTP_{name}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _call_wsgi(self, environ):
+        """Běží v poolu: view + start_response, tělo se neiteruje."""
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+            return lambda data: started.setdefault("early", []).append(data)
+
+        app_iter = self.wsgi_app(environ, start_response)
+        return started, app_iter
+
+    # ---------- response ----------
+
+    async def _http(self, scope, receive, send):
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        try:
+            started, app_iter = await self._run(self._call_wsgi, self._environ(scope, body))
+        except BaseException:
+            body.close()
+            raise
+
+        await send({"type": "http.response.start", "status": started["status"],
+                    "headers": started["headers"]})
+
+        # po odeslání hlavičky už request body nepotřebujeme – jen hlídáme odpojení
+        disconnected = asyncio.Event()
+
+        async def _watch():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        watcher = asyncio.ensure_future(_watch())
+        try:
+            for data in started.get("early", ()):
+                await send({"type": "http.response.body", "body": data, "more_body": True})
+            if scope["method"] != "HEAD":
+                await self._send_body(app_iter, send, disconnected)
+            if not disconnected.is_set():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError:
+            pass  # klient odešel uprostřed odpovědi
+        finally:
+            watcher.cancel()
+            body.close()
+            close = getattr(app_iter, "close", None)
+            if close is not None:
+                await self._run(close)
+
+    async def _send_body(self, app_iter, send, disconnected: asyncio.Event):
+        if hasattr(app_iter, "__aiter__"):
+            # SSE – čistě async, žádné vlákno
+            agen = app_iter.__aiter__()
+            pending = ()
+            try:
+                while not disconnected.is_set():
+                    nxt = asyncio.ensure_future(agen.__anext__())
+                    stop = asyncio.ensure_future(disconnected.wait())
+                    pending = (nxt, stop)
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    if nxt not in done:
+                        break
+                    stop.cancel()
+                    try:
+                        chunk = nxt.result()
+                    except StopAsyncIteration:
+                        break
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            finally:
+                # zrušený __anext__ ještě běží – aclose() by hodil RuntimeError,
+                # dokud task opravdu neskončí
+                for t in pending:
+                    t.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                await agen.aclose()
+            return
+
+        if isinstance(app_iter, FileWrapper):
+            # send_file – čteme po blocích v poolu, mezi bloky vlákno nedržíme
+            read = app_iter.file.read
+            size = max(app_iter.buffer_size, READ_CHUNK)
+            while not disconnected.is_set():
+                chunk = await self._run(read, size)
+                if not chunk:
+                    break
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            return
+
+        it = iter(app_iter)
+        sentinel = object()
+        while not disconnected.is_set():
+            chunk = await self._run(next, it, sentinel)
+            if chunk is sentinel:
+                break
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
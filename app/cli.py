@@ -0,0 +1,342 @@
+# app/cli.py
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.orm import selectinload
+
+from app.models.pdf_model import PdfReport
+from app import db
+from app.models.project_model import Project
+from app.models.retention_model import RetentionPolicy
+from app.models.run_model import Run
+from app.models.run_stats_model import RunStats
+from app.models.suite_model import Suite
+from app.utils.duration_analytics import analytics_options, record_run_analytics_from_config
+from app.utils.pdf_preview import META_SUFFIX, THUMB_SUFFIX, generate_pdf_preview, meta_path, thumb_path
+from app.utils.fsck import REPAIR_MISSING, REPAIR_ORPHANS, REPAIR_SIZES, fsck_pdfs, fsck_reports
+from app.utils.project_sync import SyncError, sync_file
+from app.utils.report_import import DEDUPE_HASH, DEDUPE_PATH, ImportTreeError, TreeImporter
+from app.utils.report_archive import ARCHIVE_DIR, archive_ref, archive_rel_for, is_archived, pack_files, report_exists
+from app.utils.report_sidecar import (SUFFIX as SIDECAR_SUFFIX, load_report_columns, read_sidecar_header,
+                                      sidecar_path, write_sidecar)
+from app.utils.retention import enforce_retention
+from app.utils.storage_index import KIND_PDFS, KIND_REPORTS
+from app.utils.storage_backend import get_storage
+from app.utils.suite_health import rebuild_suite_health, refresh_suite_health
+
+# `flask reports <příkaz>` – údržbové příkazy nad úložištěm reportů
+reports_cli = AppGroup("reports", help="Údržba reportů a úložiště.")
+
+
+@reports_cli.command("pdf-previews")
+@click.option("--force", is_flag=True, help="Přegenerovat i existující náhledy.")
+def pdf_previews(force: bool):
+    """Backfill náhledů (thumbnail, počet stran, úryvek) pro všechna PDF."""
+    store = get_storage(KIND_PDFS)
+    done = skipped = missing = 0
+    q = PdfReport.query.with_entities(PdfReport.id, PdfReport.pdf_path).order_by(PdfReport.id)
+    for _id, rel in q.yield_per(500):
+        rel = (rel or "").lstrip("/\\")
+        abs_path = store.local_path(rel, companions=(META_SUFFIX, THUMB_SUFFIX))
+        if not abs_path or not os.path.isfile(abs_path):
+            missing += 1
+            continue
+        had_meta = os.path.isfile(meta_path(abs_path))
+        meta = generate_pdf_preview(abs_path, force=force)
+        if meta and (force or not had_meta):
+            # nově vygenerovaný náhled → úložiště (u lokálního no-op)
+            if meta.get("thumb"):
+                store.put_file(rel + THUMB_SUFFIX, thumb_path(abs_path), content_type="image/png")
+            store.put_file(rel + META_SUFFIX, meta_path(abs_path), content_type="application/json")
+        if meta and meta.get("thumb"):
+            done += 1
+        else:
+            skipped += 1
+    click.echo(f"Náhledy: {done} s obrázkem, {skipped} bez obrázku, {missing} chybějících PDF.")
+
+
+@reports_cli.command("sidecars")
+@click.option("--force", is_flag=True, help="Přepsat i čerstvé sidecary.")
+def sidecars(force: bool):
+    """Backfill binárních sidecarů (<csv>.rcol) pro všechny běhy."""
+    store = get_storage(KIND_REPORTS)
+    written = fresh = missing = failed = 0
+    q = Run.query.with_entities(Run.id, Run.csv_path).order_by(Run.id)
+    for _id, rel in q.yield_per(1000):
+        rel = (rel or "").lstrip("/\\")
+        if is_archived(rel):
+            fresh += 1  # sidecar je zabalený v archivu
+            continue
+        abs_path = store.local_path(rel, companions=(SIDECAR_SUFFIX,))
+        if not abs_path or not os.path.isfile(abs_path):
+            missing += 1
+            continue
+        if not force and read_sidecar_header(abs_path) is not None:
+            fresh += 1
+            continue
+        try:
+            write_sidecar(abs_path)
+            store.put_file(rel + SIDECAR_SUFFIX, sidecar_path(abs_path), content_type="application/octet-stream")
+            written += 1
+        except Exception as e:
+            failed += 1
+            click.echo(f"! {rel}: {e}", err=True)
+    click.echo(f"Sidecary: {written} zapsáno, {fresh} aktuálních, {missing} chybějících CSV, {failed} chyb.")
+
+
+
+@reports_cli.command("duration-stats")
+@click.option("--batch", default=200, show_default=True, help="Commit po N bězích.")
+def duration_stats(batch: int):
+    """Backfill RunStats/baseline pro běhy bez statistik (chronologicky, jako při uploadu)."""
+    store = get_storage(KIND_REPORTS)
+    done = missing = failed = 0
+    touched = set()
+    pending = [r for (r,) in (db.session.query(Run.id)
+                              .outerjoin(RunStats, RunStats.run_id == Run.id)
+                              .filter(RunStats.run_id.is_(None))
+                              .order_by(Run.created_at, Run.id)
+                              .all())]
+    for i, run_id in enumerate(pending, 1):
+        run = db.session.get(Run, run_id)
+        abs_path = store.local_path((run.csv_path or "").lstrip("/\\"), companions=(SIDECAR_SUFFIX,))
+        if not abs_path or not report_exists(abs_path):
+            missing += 1
+            continue
+        try:
+            record_run_analytics_from_config(run, load_report_columns(abs_path), current_app.config)
+            touched.add(run.suite_id)
+            done += 1
+        except Exception as e:
+            failed += 1
+            click.echo(f"! {run.csv_path}: {e}", err=True)
+        if i % batch == 0:
+            refresh_suite_health(touched)
+            touched.clear()
+            db.session.commit()
+    refresh_suite_health(touched)
+    db.session.commit()
+    click.echo(f"Statistiky délek: {done} běhů, {missing} chybějících CSV, {failed} chyb.")
+
+
+def _resolve_scope(project_slug: str, suite_path: str | None):
+    """'projekt' + volitelně 'sekce' nebo 'sekce/sekvence' → (Project, Suite|None)."""
+    project = Project.query.filter_by(slug=project_slug).first()
+    if project is None:
+        raise click.UsageError(f"Projekt '{project_slug}' neexistuje.")
+    suite = None
+    parent_id = None
+    for part in (suite_path or "").strip("/").split("/") if suite_path else []:
+        suite = Suite.query.filter_by(project_id=project.id, parent_id=parent_id, slug=part).first()
+        if suite is None:
+            raise click.UsageError(f"Sada '{suite_path}' v projektu '{project_slug}' neexistuje.")
+        parent_id = suite.id
+    return project, suite
+
+
+@reports_cli.command("retention-set")
+@click.argument("project")
+@click.option("--suite", default=None, help="Sekce nebo 'sekce/sekvence' (bez = celý projekt).")
+@click.option("--keep-last", type=int, default=None, help="Ponechat posledních N běhů.")
+@click.option("--keep-days", type=int, default=None, help="Ponechat běhy mladší než X dní.")
+@click.option("--keep-failing/--no-keep-failing", default=True, show_default=True,
+              help="Vždy ponechat poslední běh s chybou.")
+@click.option("--remove", is_flag=True, help="Pravidlo smazat.")
+def retention_set(project, suite, keep_last, keep_days, keep_failing, remove):
+    """Nastaví (nebo smaže) pravidlo retence pro projekt / sadu."""
+    proj, s = _resolve_scope(project, suite)
+    pol = RetentionPolicy.query.filter_by(project_id=proj.id, suite_id=s.id if s else None).first()
+    if remove:
+        if pol is not None:
+            db.session.delete(pol)
+            db.session.commit()
+        click.echo("Pravidlo smazáno.")
+        return
+    if not keep_last and not keep_days:
+        raise click.UsageError("Zadej --keep-last a/nebo --keep-days.")
+    if pol is None:
+        pol = RetentionPolicy(project_id=proj.id, suite_id=s.id if s else None)
+        db.session.add(pol)
+    pol.keep_last, pol.keep_days, pol.keep_last_failing = keep_last, keep_days, keep_failing
+    db.session.commit()
+    click.echo(f"{proj.slug}{'/' + (suite or '').strip('/') if s else ''}: {pol.describe()}")
+
+
+@reports_cli.command("retention-list")
+def retention_list():
+    """Vypíše pravidla retence."""
+    for pol in RetentionPolicy.query.order_by(RetentionPolicy.project_id, RetentionPolicy.suite_id):
+        scope = pol.project.slug + (f" / {pol.suite.name}" if pol.suite else "")
+        click.echo(f"{scope}: {pol.describe()}")
+
+
+@reports_cli.command("retention")
+@click.option("--dry-run", is_flag=True, help="Jen spočítat, co by se smazalo.")
+@click.option("--batch", type=int, default=None, help="Řádků v jedné transakci (RETENTION_BATCH).")
+@click.option("--rate", type=float, default=None, help="Max. smazaných souborů/s (RETENTION_UNLINK_RATE, 0 = bez limitu).")
+def retention(dry_run: bool, batch, rate):
+    """Uplatní pravidla retence – maže běhy a PDF po dávkách."""
+    res = enforce_retention(current_app.config, dry_run=dry_run, batch=batch, unlink_rate=rate,
+                            log=None if dry_run else click.echo)
+    if dry_run:
+        click.echo(f"K smazání: {res.runs} běhů, {res.pdfs} PDF.")
+    else:
+        click.echo(f"Smazáno: {res.runs} běhů, {res.pdfs} PDF, {res.files} souborů ({res.bytes} B).")
+
+
+@reports_cli.command("archive")
+@click.option("--older-than", default=90, show_default=True, help="Archivovat běhy starší než N dní.")
+@click.option("--batch", default=500, show_default=True, help="Běhů v jedné dávce (append + commit).")
+@click.option("--dry-run", is_flag=True, help="Jen vypsat, co by se kam zabalilo.")
+def archive(older_than: int, batch: int, dry_run: bool):
+    """Sbalí staré reporty do měsíčních archivů sad (<suite>/_archive/YYYY-MM.tar)."""
+    base = current_app.config["REPORTS_DIR"]
+    cutoff = datetime.utcnow() - timedelta(days=older_than)
+    rows = (db.session.query(Run.id, Run.csv_path, Run.created_at)
+            .filter(Run.created_at < cutoff, Run.live.is_(False),
+                    ~Run.csv_path.contains(f"/{ARCHIVE_DIR}/"))
+            .order_by(Run.created_at, Run.id)
+            .all())
+    groups: dict[str, list[int]] = {}
+    for run_id, rel, created in rows:
+        rel_dir = os.path.dirname((rel or "").lstrip("/\\"))
+        if rel_dir:
+            groups.setdefault(archive_rel_for(rel_dir, created), []).append(run_id)
+
+    if dry_run:
+        for archive_rel, ids in groups.items():
+            click.echo(f"{archive_rel}: {len(ids)} běhů")
+        click.echo(f"K archivaci: {sum(len(v) for v in groups.values())} běhů do {len(groups)} archivů.")
+        return
+
+    packed = files = freed = 0
+    for archive_rel, ids in groups.items():
+        tar_abs = os.path.join(base, archive_rel)
+        for start in range(0, len(ids), batch):
+            runs = (Run.query.options(selectinload(Run.shards))
+                    .filter(Run.id.in_(ids[start:start + batch])).all())
+            sources = []
+            for run in runs:
+                for rel in {run.csv_path, *(sh.csv_path for sh in run.shards)}:
+                    abs_path = os.path.join(base, rel.lstrip("/\\"))
+                    if not os.path.isfile(abs_path):
+                        continue
+                    if read_sidecar_header(abs_path) is None:
+                        try:
+                            write_sidecar(abs_path)  # v archivu se čte jen sidecar
+                        except Exception as e:
+                            click.echo(f"! {rel}: sidecar: {e}", err=True)
+                    sources.append(abs_path)
+            if not sources:
+                continue
+            members = pack_files(tar_abs, [(src, os.path.basename(src)) for src in sources])
+
+            def ref(rel: str) -> str:
+                member = members.get(os.path.join(base, rel.lstrip("/\\")))
+                return archive_ref(archive_rel, member) if member else rel
+
+            for run in runs:
+                run.csv_path = ref(run.csv_path)
+                for sh in run.shards:
+                    sh.csv_path = ref(sh.csv_path)
+            db.session.commit()
+            packed += len(runs)
+
+            # originály pryč až po commitu (DB už ukazuje do archivu)
+            for src in sources:
+                for p in (src, sidecar_path(src)):
+                    try:
+                        freed += os.path.getsize(p)
+                        os.remove(p)
+                        files += 1
+                    except OSError:
+                        pass
+        click.echo(f"{archive_rel}: hotovo")
+    click.echo(f"Archivováno: {packed} běhů, {files} souborů nahrazeno {len(groups)} archivy ({freed} B).")
+
+
+@reports_cli.command("sync")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dry-run", is_flag=True, help="Jen vypsat diff, nic neměnit.")
+def sync(path: str, dry_run: bool):
+    """Srovná projekty a sady s deklarativním stromem (YAML/JSON)."""
+    try:
+        plan, applied = sync_file(path, dry_run=dry_run)
+    except SyncError as e:
+        raise click.UsageError(str(e)) from e
+    for line in plan.lines:
+        click.echo(line)
+    if plan.empty:
+        click.echo("Beze změn.")
+    else:
+        click.echo(("Provedeno – " if applied else "Náhled – ") + plan.summary())
+
+
+def _echo_fsck(rep, verbose: bool) -> None:
+    click.echo(f"[{rep.kind}] souborů {rep.files}, řádků v DB {rep.db_rows}: "
+               f"osiřelých {rep.orphans} ({rep.orphan_bytes} B), chybějících {rep.missing}, "
+               f"nesoulad velikosti {rep.size_mismatch}, čerstvých (přeskočeno) {rep.young}")
+    if verbose:
+        for what, items in rep.samples.items():
+            for item in items:
+                click.echo(f"  {what}: {item}")
+    if rep.repaired:
+        click.echo("  opraveno: " + ", ".join(f"{k} {v}" for k, v in rep.repaired.items()))
+
+
+@reports_cli.command("fsck")
+@click.option("--repair", "repair", multiple=True,
+              type=click.Choice([REPAIR_ORPHANS, REPAIR_MISSING, REPAIR_SIZES, "all"]),
+              help="Co opravit (lze opakovat): smazat osiřelé soubory, smazat řádky bez souboru, opravit PdfReport.size.")
+@click.option("--grace", default=3600.0, show_default=True, help="s – mladší soubory nejsou osiřelé (probíhající upload).")
+@click.option("--workers", default=min(32, (os.cpu_count() or 1) * 4), show_default=True, help="Vláken pro scandir.")
+@click.option("--batch", default=5000, show_default=True, help="Řádků DB v jedné dávce.")
+@click.option("-v", "--verbose", is_flag=True, help="Vypsat ukázky nálezů.")
+def fsck(repair, grace: float, workers: int, batch: int, verbose: bool):
+    """Porovná úložiště reportů a PDF s DB (osiřelé / chybějící soubory, velikosti PDF)."""
+    if current_app.config.get("STORAGE_BACKEND", "local") != "local":
+        raise click.UsageError("fsck kontroluje lokální úložiště (STORAGE_BACKEND=local).")
+    repair = {REPAIR_ORPHANS, REPAIR_MISSING, REPAIR_SIZES} if "all" in repair else set(repair)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fsck") as pool:
+        for check, base in ((fsck_reports, current_app.config["REPORTS_DIR"]),
+                            (fsck_pdfs, current_app.config["PDFS_DIR"])):
+            _echo_fsck(check(base, pool, grace=grace, repair=repair, batch=batch), verbose)
+
+
+@reports_cli.command("import")
+@click.argument("root", type=click.Path(exists=True, file_okay=False))
+@click.option("--dedupe", type=click.Choice([DEDUPE_PATH, DEDUPE_HASH]), default=DEDUPE_PATH,
+              show_default=True, help="Přeskočit soubory podle cesty, nebo i podle obsahu (SHA-256).")
+@click.option("--workers", default=os.cpu_count() or 1, show_default=True, help="Procesů pro parsování.")
+@click.option("--batch", default=500, show_default=True, help="Běhů v jednom INSERT/commitu.")
+@click.option("--dry-run", is_flag=True, help="Jen spočítat nové soubory, nic neměnit.")
+def import_tree(root: str, dedupe: str, workers: int, batch: int, dry_run: bool):
+    """Import stromu <projekt>/<sada>/<report> – chybějící projekty, sady a běhy se statistikami."""
+    def _progress(st):
+        click.echo(f"… importováno {st.imported}, známých {st.known + st.duplicates}")
+
+    try:
+        importer = TreeImporter(root, current_app.config["REPORTS_DIR"], get_storage(KIND_REPORTS),
+                                workers=workers, dedupe=dedupe, batch=batch, dry_run=dry_run,
+                                analytics=analytics_options(current_app.config),
+                                section_name=current_app.config["IMPORT_SECTION"], progress=_progress)
+    except ImportTreeError as e:
+        raise click.UsageError(str(e)) from e
+    stats = importer.run()
+    for err in stats.errors:
+        click.echo(f"! {err}", err=True)
+    click.echo(("Náhled (nic nezměněno) – " if dry_run else "Import – ") + stats.summary())
+
+
+@reports_cli.command("health-rebuild")
+def health_rebuild():
+    """Přepočítá materializovaný stav sekvencí (dashboard) ze všech běhů."""
+    n = rebuild_suite_health()
+    db.session.commit()
+    click.echo(f"Stav sekvencí přepočítán: {n} sad s běhy.")
@@ -7,6 +7,7 @@ from datetime import datetime
 from app import db  # tvůj SQLAlchemy instance
 from app.models.project_model import Project, ProjectType, Visibility
 from app.models.suite_model import Suite
+from app.utils.slugs import save_with_unique_slugs
 
 from flask import Flask
 
@@ -119,7 +120,7 @@ def get_or_create_project(name: str) -> Project:
         p.visibility = Visibility.public
         if not p.description:
             p.description = "Veřejný E2E projekt s kompletním coverage účetních a DMS scénářů."
-        p.ensure_unique_slug()
+        save_with_unique_slugs([p])
         db.session.commit()
         return p
 
@@ -130,37 +131,43 @@ def get_or_create_project(name: str) -> Project:
         description="Veřejný E2E projekt s kompletním coverage účetních a DMS scénářů.",
     )
     # žádné heslo – public; kdybys chtěl zamknout: p.set_passphrase("tajneheslo")
-    p.ensure_unique_slug()
-    db.session.add(p)
+    save_with_unique_slugs([p])
     db.session.commit()
     return p
 
 
-def get_or_create_suite(project_id: int, name: str, parent_id: Optional[int], desc: Optional[str], order_index: int) -> Suite:
-    # Slug je unikátní v rámci (project_id, parent_id), proto hledáme podle těchto hodnot + jména.
-    # Pokud už existuje stejná kombinace (název/sluggish), vrátíme ji; jinak vytvoříme.
-    existing = Suite.query.filter_by(project_id=project_id, parent_id=parent_id, name=name).first()
-    if existing:
-        # drobná údržba
-        existing.description = existing.description or desc
-        if existing.order_index != order_index:
-            existing.order_index = order_index
-        existing.ensure_unique_slug()
-        db.session.commit()
-        return existing
-
-    s = Suite(
-        project_id=project_id,
-        parent_id=parent_id,
-        name=name,
-        description=desc,
-        order_index=order_index,
-        is_active=True,
-    )
-    s.ensure_unique_slug()
-    db.session.add(s)
+def upsert_suites(project: Project, seed: List[DataDef]) -> List[Suite]:
+    """
+    Sekce + sekvence ze SEEDu hromadně: existující sady jedním dotazem,
+    nové dostanou slugy jedním průchodem (app/utils/slugs.py), jeden commit.
+    Slug je unikátní v rámci (project_id, parent_id), hledáme podle těchto hodnot + jména.
+    """
+    existing = {(s.parent_id, s.name): s for s in Suite.query.filter_by(project_id=project.id)}
+    touched: List[Suite] = []
+
+    def _upsert(name: str, parent: Optional[Suite], desc: Optional[str], order_index: int) -> Suite:
+        # nová sekce (ještě bez id) nemá v DB žádné děti
+        s = existing.get((parent.id if parent is not None else None, name)) \
+            if parent is None or parent.id else None
+        if s is not None:
+            # drobná údržba
+            s.description = s.description or desc
+            if s.order_index != order_index:
+                s.order_index = order_index
+            return s
+        s = Suite(project_id=project.id, parent=parent, name=name, description=desc,
+                  order_index=order_index, is_active=True)
+        touched.append(s)
+        return s
+
+    for sec in seed:
+        section = _upsert(str(sec["name"]), None, str(sec.get("desc") or ""), int(sec.get("order") or 0))
+        for child in sec.get("children") or []:  # type: ignore
+            _upsert(str(child["name"]), section, str(child.get("desc") or ""), int(child.get("order") or 0))
+
+    save_with_unique_slugs(touched)
     db.session.commit()
-    return s
+    return touched
 
 
 def seed() -> None:
@@ -168,24 +175,7 @@ def seed() -> None:
         project = get_or_create_project("dokladujto")
 
         # Sekce + děti
-        for sec in SEED:
-            section = get_or_create_suite(
-                project_id=project.id,
-                name=str(sec["name"]),
-                parent_id=None,
-                desc=str(sec.get("desc") or ""),
-                order_index=int(sec.get("order") or 0),
-            )
-
-            children = sec.get("children") or []
-            for child in children:  # type: ignore
-                get_or_create_suite(
-                    project_id=project.id,
-                    name=str(child["name"]),
-                    parent_id=section.id,
-                    desc=str(child.get("desc") or ""),
-                    order_index=int(child.get("order") or 0),
-                )
+        upsert_suites(project, SEED)
 
         print("✅ Seed hotový.")
         print(f"Projekt: {project.name} (slug: {project.slug}, visibility: {project.visibility.value})")
@@ -9,6 +9,7 @@ from slugify import slugify
 from passlib.hash import bcrypt
 
 from app import db
+from app.utils.slugs import allocate_slugs, chunked_bases, slug_clause
 
 # --- ENUMy, které fungují i na SQLite (native_enum=False) ---
 class ProjectType(enum.Enum):
@@ -85,14 +86,27 @@ class Project(db.Model):
         # fallback kdyby bylo prázdné
         return base or "project"
 
+    # ---- slug (viz app/utils/slugs.py) ----
+    SLUG_SCOPE_COLUMNS = ()  # slug projektu je globálně unikátní
+
+    def slug_base(self) -> str:
+        return self.slug or self.make_slug(self.name)
+
+    def slug_scope(self):
+        return None
+
+    @classmethod
+    def taken_slugs(cls, objs, bases) -> dict:
+        """{None: obsazené slugy} pro všechny báze – jeden dotaz na dávku bází."""
+        own = {o.id for o in objs if o.id}
+        taken = set()
+        for chunk in chunked_bases(bases):
+            q = db.session.query(cls.id, cls.slug).filter(slug_clause(cls.slug, chunk))
+            taken.update(slug for pid, slug in q if pid not in own)
+        return {None: taken}
+
     def ensure_unique_slug(self):
-        base = self.slug or self.make_slug(self.name)
-        slug = base
-        n = 2
-        while Project.query.filter(Project.slug == slug, Project.id != (self.id or 0)).first():
-            slug = f"{base}-{n}"
-            n += 1
-        self.slug = slug
+        allocate_slugs([self])
 
     @property
     def logo_abspath(self) -> Optional[str]:
@@ -103,5 +117,11 @@ class Project(db.Model):
             return f"{self.logo_path}"
         return f"{current_app.config.get('UPLOAD_DIR','storage/logos').rstrip('/')}/{self.logo_path}"
 
+    @property
+    def logo_variants(self):
+        """WebP varianty loga [(soubor, šířka), …] pro srcset; u starých log prázdné."""
+        from app.utils.logo_images import logo_variants
+        return logo_variants(self.logo_path)
+
     def __repr__(self) -> str:
         return f"<Project {self.id} {self.slug} ({self.type.value})>"
\ No newline at end of file
@@ -0,0 +1,43 @@
+# app/models/retention_model.py
+from datetime import datetime
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import relationship
+from app import db
+
+class RetentionPolicy(db.Model):
+    """
+    Pravidlo retence běhů / PDF.
+      - suite_id NULL  → platí pro celý projekt (a jeho PDF)
+      - suite_id sekce → pro sekvence sekce, které nemají vlastní pravidlo
+      - suite_id sekvence → jen pro tu sekvenci
+    Běh se ponechá, když je mezi posledními `keep_last` NEBO mladší než
+    `keep_days` dní. Poslední běh s chybou se (volitelně) nemaže nikdy.
+    """
+    __tablename__ = "retention_policies"
+
+    id         = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    suite_id   = db.Column(db.Integer, db.ForeignKey("suites.id", ondelete="CASCADE"), nullable=True, index=True)
+
+    keep_last = db.Column(db.Integer, nullable=True)   # posledních N běhů
+    keep_days = db.Column(db.Integer, nullable=True)   # běhy mladší než X dní
+    keep_last_failing = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("project_id", "suite_id", name="uq_retention_scope"),
+    )
+
+    project = relationship("Project")
+    suite   = relationship("Suite")
+
+    def describe(self) -> str:
+        parts = []
+        if self.keep_last:
+            parts.append(f"posledních {self.keep_last}")
+        if self.keep_days:
+            parts.append(f"mladší než {self.keep_days} d")
+        rule = " nebo ".join(parts) or "vše"
+        return rule + (" + poslední chybový" if self.keep_last_failing else "")
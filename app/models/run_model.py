@@ -14,10 +14,36 @@ class Run(db.Model):
     label      = db.Column(db.String(200), nullable=True)
 
     # relativní cesta v REPORTS_DIR, např.: "my-proj/sekvence/2025-09-13_170805-report.csv"
-    csv_path   = db.Column(db.String(500), nullable=False)
+    csv_path   = db.Column(db.String(500), nullable=False, index=True)
+
+    # SHA-256 obsahu reportu – vyplňuje hromadný import (`flask reports import`),
+    # při opakovaném importu se podle něj poznají přejmenované/přesunuté soubory
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    # živý běh – řádky přibývají přes append endpoint, dokud ho runner neuzavře
+    live       = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    # label, pod kterým CI nahrává shardy jednoho běhu (v sadě unikátní –
+    # souběžné první shardy se tak sejdou v jednom běhu)
+    shard_label = db.Column(db.String(200), nullable=True)
+
+    # "posledních N běhů sady" (seznam, retence) = průchod indexem
+    __table_args__ = (
+        db.Index("ix_runs_suite_created", "suite_id", "created_at"),
+        db.Index("uq_runs_suite_shard_label", "suite_id", "shard_label", unique=True),
+    )
+
     # relace
     project = relationship("Project", back_populates="runs")
-    suite   = relationship("Suite",   back_populates="runs")
\ No newline at end of file
+    suite   = relationship("Suite",   back_populates="runs")
+    stats_row = relationship("RunStats", back_populates="run", uselist=False,
+                             cascade="all, delete-orphan", passive_deletes=True)
+    # CI shardy – běh může vlastnit víc souborů (csv_path pak ukazuje na první z nich)
+    shards = relationship("RunShard", back_populates="run", cascade="all, delete-orphan",
+                          passive_deletes=True, order_by="RunShard.id")
+
+    @property
+    def is_sharded(self) -> bool:
+        return bool(self.shards)
\ No newline at end of file
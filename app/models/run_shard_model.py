@@ -0,0 +1,35 @@
+# app/models/run_shard_model.py
+from datetime import datetime
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import relationship
+from app import db
+
+class RunShard(db.Model):
+    """
+    Jeden soubor (shard) běhu rozděleného v CI na paralelní části.
+    Souhrn shardu se ukládá při uploadu – souhrn běhu se z nich jen sčítá.
+    """
+    __tablename__ = "run_shards"
+
+    id     = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey("runs.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # označení shardu z CI, např. "3/20" (v rámci běhu unikátní)
+    shard_key = db.Column(db.String(80), nullable=False)
+
+    # relativní cesta v REPORTS_DIR (stejná struktura jako Run.csv_path)
+    csv_path  = db.Column(db.String(500), nullable=False, index=True)
+
+    total       = db.Column(db.Integer, nullable=False, default=0)
+    passed      = db.Column(db.Integer, nullable=False, default=0)
+    failed      = db.Column(db.Integer, nullable=False, default=0)
+    skipped     = db.Column(db.Integer, nullable=False, default=0)
+    duration_ms = db.Column(db.BigInteger, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("run_id", "shard_key", name="uq_run_shard_key"),
+    )
+
+    run = relationship("Run", back_populates="shards")
@@ -0,0 +1,36 @@
+# app/models/run_stats_model.py
+from datetime import datetime
+from sqlalchemy.orm import relationship
+from app import db
+
+class RunStats(db.Model):
+    """
+    Souhrn a statistiky délek jednoho běhu – počítá se jednou při ingestu,
+    seznamy/pohledy pak nemusí číst CSV.
+    """
+    __tablename__ = "run_stats"
+
+    run_id     = db.Column(db.Integer, db.ForeignKey("runs.id", ondelete="CASCADE"), primary_key=True)
+    suite_id   = db.Column(db.Integer, db.ForeignKey("suites.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    total       = db.Column(db.Integer, nullable=False, default=0)
+    passed      = db.Column(db.Integer, nullable=False, default=0)
+    failed      = db.Column(db.Integer, nullable=False, default=0)
+    skipped     = db.Column(db.Integer, nullable=False, default=0)
+    duration_ms = db.Column(db.BigInteger, nullable=False, default=0)
+
+    # percentily délek jednotlivých testů (ms)
+    p50_ms = db.Column(db.Integer, nullable=True)
+    p90_ms = db.Column(db.Integer, nullable=True)
+    p99_ms = db.Column(db.Integer, nullable=True)
+
+    # [{describe, test, duration_ms}, ...] – top-N nejpomalejších testů
+    slowest     = db.Column(db.JSON, nullable=True)
+    # [{key, describe, test, duration_ms, baseline_ms, ratio}, ...] – regrese proti baseline sady
+    regressions = db.Column(db.JSON, nullable=True)
+    # {"ms": počet} – histogram délek shardovaného běhu; další shard se jen přičte
+    duration_hist = db.Column(db.JSON, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    run = relationship("Run", back_populates="stats_row")
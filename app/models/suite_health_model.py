@@ -0,0 +1,25 @@
+# app/models/suite_health_model.py
+from datetime import datetime
+from app import db
+
+class SuiteHealth(db.Model):
+    """
+    Materializovaný stav sekvence pro dashboard – poslední běh a jeho čítače.
+    Přepočítává se při ingestu a mazání běhů (app/utils/suite_health.py),
+    dashboard je pak jeden dotaz bez agregací přes runs.
+    """
+    __tablename__ = "suite_health"
+
+    suite_id    = db.Column(db.Integer, db.ForeignKey("suites.id", ondelete="CASCADE"), primary_key=True)
+    last_run_id = db.Column(db.Integer, db.ForeignKey("runs.id", ondelete="SET NULL"), nullable=True)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+    live        = db.Column(db.Boolean, nullable=False, default=False)
+
+    # čítače posledního běhu (NULL = běh bez RunStats)
+    total       = db.Column(db.Integer, nullable=True)
+    passed      = db.Column(db.Integer, nullable=True)
+    failed      = db.Column(db.Integer, nullable=True)
+    skipped     = db.Column(db.Integer, nullable=True)
+    duration_ms = db.Column(db.BigInteger, nullable=True)
+
+    updated_at  = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -6,6 +6,7 @@ from datetime import datetime
 from sqlalchemy import UniqueConstraint
 from sqlalchemy.orm import relationship
 from app import db
+from app.utils.slugs import allocate_slugs, chunked_bases, slug_clause
 
 def _slugify(name: str) -> str:
     s = re.sub(r'[^a-zA-Z0-9]+', '-', (name or '').strip()).strip('-').lower()
@@ -36,6 +37,10 @@ class Suite(db.Model):
     __table_args__ = (
         # ve stejném projektu + stejném parentu musí být slug unikátní
         UniqueConstraint("project_id", "parent_id", "slug", name="uq_suite_slug_per_parent"),
+        # sekce mají parent_id NULL a NULL jsou pro UNIQUE různé – bez tohoto
+        # indexu by dva souběžné zápisy prošly se stejným slugem sekce
+        db.Index("uq_suite_section_slug", "project_id", "slug", unique=True,
+                 sqlite_where=db.text("parent_id IS NULL")),
     )
 
     # vztahy
@@ -53,20 +58,38 @@ class Suite(db.Model):
     def is_sequence(self) -> bool:
         return self.parent_id is not None
 
+    # ---- slug (viz app/utils/slugs.py) ----
+    SLUG_SCOPE_COLUMNS = ("project_id", "parent_id")
+
+    def slug_base(self) -> str:
+        # explicitní slug (sync soubor, existující sada) má přednost – jako u Project
+        return self.slug or _slugify(self.name)
+
+    def slug_scope(self):
+        """(projekt, rodič) – projekt/rodič ještě bez id (hromadné vytvoření) podle identity objektu."""
+        project_id = self.project_id
+        if project_id is None and self.project is not None:
+            project_id = self.project.id or ("new", id(self.project))
+        parent_id = self.parent_id
+        if parent_id is None and self.parent is not None:
+            parent_id = self.parent.id or ("new", id(self.parent))
+        return project_id, parent_id
+
+    @classmethod
+    def taken_slugs(cls, objs, bases) -> dict:
+        """{(projekt, rodič): obsazené slugy} – jeden dotaz přes všechny projekty dávky."""
+        own = {o.id for o in objs if o.id}
+        project_ids = {pid for pid, _ in (o.slug_scope() for o in objs) if isinstance(pid, int)}
+        taken: dict = {}
+        if not project_ids:
+            return taken
+        for chunk in chunked_bases(bases):
+            q = (db.session.query(cls.id, cls.project_id, cls.parent_id, cls.slug)
+                 .filter(cls.project_id.in_(project_ids), slug_clause(cls.slug, chunk)))
+            for sid, project_id, parent_id, slug in q:
+                if sid not in own:
+                    taken.setdefault((project_id, parent_id), set()).add(slug)
+        return taken
+
     def ensure_unique_slug(self):
-        base = _slugify(self.name)
-        slug = base
-        i = 2
-
-        q = Suite.query.filter_by(project_id=self.project_id, parent_id=self.parent_id, slug=slug)
-        if self.id:
-            q = q.filter(Suite.id != self.id)
-
-        while q.first():
-            slug = f"{base}-{i}"
-            i += 1
-            q = Suite.query.filter_by(project_id=self.project_id, parent_id=self.parent_id, slug=slug)
-            if self.id:
-                q = q.filter(Suite.id != self.id)
-
-        self.slug = slug
\ No newline at end of file
+        allocate_slugs([self])
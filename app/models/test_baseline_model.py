@@ -0,0 +1,28 @@
+# app/models/test_baseline_model.py
+from datetime import datetime
+from sqlalchemy import UniqueConstraint
+from app import db
+
+class TestBaseline(db.Model):
+    """
+    Klouzavá baseline délky jednoho testu v rámci sady (sekvence):
+    posledních N naměřených hodnot + jejich medián. Aktualizuje se
+    inkrementálně při každém novém běhu – historie se znovu neprochází.
+    """
+    __tablename__ = "test_baselines"
+
+    id       = db.Column(db.Integer, primary_key=True)
+    suite_id = db.Column(db.Integer, db.ForeignKey("suites.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # "<describe>::<test>"
+    test_key = db.Column(db.String(500), nullable=False)
+
+    window      = db.Column(db.JSON, nullable=False, default=list)  # posledních N délek (ms), nejstarší první
+    baseline_ms = db.Column(db.Integer, nullable=True)              # medián okna
+    last_ms     = db.Column(db.Integer, nullable=True)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("suite_id", "test_key", name="uq_test_baseline_suite_key"),
+    )
@@ -5,13 +5,23 @@ from urllib.parse import urlparse
 
 from flask import request, abort, session, redirect, url_for, flash
 from werkzeug.security import check_password_hash, generate_password_hash
-from werkzeug.utils import safe_join
+from sqlalchemy.orm import selectinload
 
 from app import db
 from app.models.run_model import Run
 from app.utils.auth import verify_and_upgrade_project_passphrase
-from app.utils.csv_report import parse_report_csv
-from flask import Blueprint, render_template, send_from_directory, current_app
+from app.utils.csv_report import _ms_fmt
+from app.utils.duration_analytics import suite_duration_overview
+from app.utils.run_shards import load_shard_reports, merged_report
+from app.utils.http_range import send_multi_range
+from app.utils.logo_images import is_hashed_logo
+from app.utils.report_archive import is_archived, report_exists, send_member
+from app.utils.report_sidecar import SUFFIX as SIDECAR_SUFFIX, load_report_columns, load_report_summary, read_sidecar_header
+from app.utils.live_hub import LiveEventStream, sse_event
+from app.utils.pdf_preview import load_pdf_previews, thumb_path
+from app.utils.storage_backend import KIND_LOGOS, LocalStorage, get_storage
+from app.utils.storage_index import KIND_PDFS, KIND_REPORTS
+from flask import Blueprint, Response, render_template, current_app
 from app.models.project_model import Project
 from app.models.suite_model import Suite
 from app.models.pdf_model import PdfReport
@@ -26,9 +36,11 @@ def _ext_allowed(filename: str) -> bool:
 @bp.route("/storage/logos/<path:filename>")
 def storage_logos(filename):
     safe_name = os.path.basename(filename)
-    return send_from_directory(
-        current_app.config["UPLOAD_DIR"], safe_name, conditional=True
-    )
+    store = get_storage(KIND_LOGOS)
+    if not is_hashed_logo(safe_name):
+        return store.send(safe_name)
+    # jméno nese hash obsahu → soubor se nikdy nezmění
+    return store.send(safe_name, max_age=365 * 24 * 3600, immutable=True)
 
 def _safe_next(default):
     nxt = request.args.get("next") or default
@@ -50,12 +62,51 @@ def _require_or_redirect(project: Project):
         return redirect(url_for("bp.project_access", slug=project.slug, next=request.full_path))
     return None
 
+def _report_file(rel: str):
+    """Lokální cesta reportu i se sidecarem (u S3 z cache); None = mimo úložiště."""
+    return get_storage(KIND_REPORTS).local_path((rel or "").lstrip("/\\"), companions=(SIDECAR_SUFFIX,))
+
+def _require_storage_access(kind: str, rel_path: str):
+    """
+    Gate pro soubory v úložišti – vlastníka bereme z in-memory indexu
+    (top-level adresář -> projekt), takže download nestojí dotaz do DB.
+    """
+    owner = current_app.extensions["storage_index"].owner(kind, rel_path)
+    if owner is None:
+        abort(404)
+    if owner.locked and not session.get("is_admin") \
+            and not session.get("proj_access", {}).get(str(owner.project_id)):
+        return redirect(url_for("bp.project_access", slug=owner.slug, next=request.full_path))
+    return None
+
 @bp.get("/storage/pdfs/<path:filename>")
 def storage_pdfs(filename: str):
     safe = os.path.normpath(filename).lstrip("/\\")
     if safe.startswith(("..", "/", "\\")):
         abort(404)
-    return send_from_directory(current_app.config["PDFS_DIR"], safe, conditional=True)
+    gate = _require_storage_access(KIND_PDFS, safe)
+    if gate:
+        return gate
+    store = get_storage(KIND_PDFS)
+    if isinstance(store, LocalStorage):
+        # víc rozsahů najednou (pdf.js u velkých PDF) – multipart/byteranges
+        abs_path = store.local_path(safe)
+        if abs_path and os.path.isfile(abs_path):
+            multi = send_multi_range(abs_path, "application/pdf")
+            if multi is not None:
+                return multi
+    return store.send(safe)
+
+@bp.get("/storage/pdf-thumbs/<path:filename>")
+def storage_pdf_thumbs(filename: str):
+    """Náhled první stránky PDF – URL nese ?v=<čas generování>, takže může být cachován dlouho."""
+    safe = os.path.normpath(filename).lstrip("/\\")
+    if safe.startswith(("..", "/", "\\")):
+        abort(404)
+    gate = _require_storage_access(KIND_PDFS, safe)
+    if gate:
+        return gate
+    return get_storage(KIND_PDFS).send(thumb_path(safe), max_age=365 * 24 * 3600, immutable=True)
 
 @bp.route("/")
 def home():
@@ -134,20 +185,25 @@ def runs_list(project_id: int, suite_id: int):
         abort(404)
 
     runs = (Run.query
+              .options(selectinload(Run.stats_row), selectinload(Run.shards))
               .filter_by(project_id=project_id, suite_id=suite_id)
               .order_by(Run.created_at.desc())
               .all())
 
-    # pro každý běh spočti summary z CSV
-    base = current_app.config["REPORTS_DIR"]
+    # pro každý běh summary – z RunStats (spočteno při uploadu), jinak z CSV
     for r in runs:
         r.stats = None
-        rel = (r.csv_path or "").lstrip("/\\")
-        abs_path = safe_join(base, rel)
-        if abs_path and os.path.isfile(abs_path):
+        if r.stats_row is not None:
+            st = r.stats_row
+            r.stats = {
+                "total": st.total, "passed": st.passed, "failed": st.failed,
+                "skipped": st.skipped, "duration_fmt": _ms_fmt(st.duration_ms),
+            }
+            continue
+        abs_path = _report_file(r.csv_path)
+        if abs_path and report_exists(abs_path):
             try:
-                rep = parse_report_csv(abs_path)
-                s = rep.get("summary", {})
+                s = load_report_summary(abs_path)
                 r.stats = {
                     "total":        s.get("total"),
                     "passed":       s.get("passed"),
@@ -166,12 +222,44 @@ def runs_list(project_id: int, suite_id: int):
         runs=runs,
     )
 
+@bp.get("/projects/<int:project_id>/suites/<int:suite_id>/durations")
+def suite_durations(project_id: int, suite_id: int):
+    """Percentily délek posledních běhů, nejpomalejší testy a regrese proti baseline."""
+    project = Project.query.get_or_404(project_id)
+
+    gate = _require_or_redirect(project)
+    if gate:
+        return gate
+
+    suite = Suite.query.filter_by(id=suite_id, project_id=project_id).first_or_404()
+    if suite.parent_id is None:
+        abort(404)
+
+    overview = suite_duration_overview(suite.id)
+    return render_template(
+        "suite_durations.html",
+        project=project,
+        suite=suite,
+        threshold=current_app.config.get("DURATION_REGRESSION_THRESHOLD", 0.5),
+        **overview,
+    )
+
 @bp.route("/storage/reports/<path:filename>")
 def storage_reports(filename):
     safe = os.path.normpath(filename).lstrip("/\\")
     if safe.startswith(("..", "/", "\\")):
         abort(404)
-    return send_from_directory(current_app.config["REPORTS_DIR"], safe, conditional=True)
+    gate = _require_storage_access(KIND_REPORTS, safe)
+    if gate:
+        return gate
+    store = get_storage(KIND_REPORTS)
+    if is_archived(safe):
+        # člen archivu – offset z indexu taru, nic se nerozbaluje
+        resp = send_member(store.local_path(safe) or "")
+        if resp is None:
+            abort(404)
+        return resp
+    return store.send(safe)
 
 
 @bp.get("/report")
@@ -179,21 +267,74 @@ def report_view():
     """
     /report?file=<relativni/cesta.csv>
     Soubor se hledá v REPORTS_DIR, cestu sanitizujeme proti path traversal.
+    /report?run=<id> – spojený pohled přes všechny shardy běhu.
     """
+    run_id = request.args.get("run", type=int)
+    if run_id:
+        run = Run.query.get_or_404(run_id)
+        gate = None if session.get("is_admin") else _require_or_redirect(run.project)
+        if gate:
+            return gate
+        if not run.is_sharded:
+            return redirect(url_for("bp.report_view", file=run.csv_path))
+        reports = load_shard_reports(run, get_storage(KIND_REPORTS))
+        report = merged_report(reports, file_name=run.label or f"Běh #{run.id}")
+        return render_template("report_view.html", rel_path=None, report=report,
+                               shards=run.shards)
+
     rel = (request.args.get("file") or "").strip()
     if not rel:
         abort(400, description="Missing ?file")
 
-    # vyčisti cestu
-    rel = rel.lstrip("/\\")
-    abs_path = safe_join(current_app.config["REPORTS_DIR"], rel)
-    if not abs_path or not os.path.isfile(abs_path):
+    # vyčisti cestu – gate nad normalizovanou cestou a ještě před existencí souboru
+    # (`veřejný/../zamčený/x.csv` ani 404 nesmí prozradit nic o zamčeném projektu)
+    rel = os.path.normpath(rel).lstrip("/\\")
+    if rel.startswith(("..", "/", "\\")):
         abort(404)
+    gate = _require_storage_access(KIND_REPORTS, rel)
+    if gate:
+        return gate
+    abs_path = _report_file(rel)
+    if not abs_path or not report_exists(abs_path):
+        abort(404)
+
+    # živý běh nemá sidecar – jen tehdy se ptáme DB, jestli ještě běží
+    live_run = None
+    if not is_archived(rel) and read_sidecar_header(abs_path) is None:
+        live_run = Run.query.filter_by(csv_path=rel, live=True).first()
 
-    report = parse_report_csv(abs_path)
+    # sloupcový model (z mmap sidecaru, pokud existuje) – duration_fmt až při renderu
+    report = load_report_columns(abs_path).to_report()
     # volitelně můžeš doplnit project/suite do breadcrumbs z rel path:
     # crumbs = rel.split("/")[:-1]
-    return render_template("report_view.html", rel_path=rel, report=report)
+    return render_template("report_view.html", rel_path=rel, report=report, live_run=live_run)
+
+@bp.get("/runs/<int:run_id>/events")
+def run_events(run_id: int):
+    """SSE stream živého běhu: nové řádky + čítače (fan-out přes LiveHub, bez DB na klienta)."""
+    run = Run.query.get_or_404(run_id)
+    gate = None if session.get("is_admin") else _require_or_redirect(run.project)
+    if gate:
+        return gate
+
+    if not run.live:
+        # hotový běh – klient jen dostane konec streamu
+        body = sse_event("done", {})
+        return Response(body, mimetype="text/event-stream")
+
+    abs_path = get_storage(KIND_REPORTS).local_path((run.csv_path or "").lstrip("/\\"))
+    if not abs_path or not os.path.isfile(abs_path):
+        abort(404)
+    channel = current_app.extensions["live_hub"].channel(run.id, abs_path)
+    last_id = request.headers.get("Last-Event-ID", type=int) or 0
+    db.session.remove()  # spojení do DB nedržíme po celou dobu streamu
+
+    # direct_passthrough: tělo dojde k serveru beze změny (ASGI adaptér ho streamuje async)
+    resp = Response(LiveEventStream(channel, last_id), mimetype="text/event-stream",
+                    direct_passthrough=True)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx: nebufferovat
+    return resp
 
 @bp.route("/projects/<slug>/access", methods=["GET", "POST"])
 def project_access(slug):
@@ -237,4 +378,5 @@ def web_pdf_list(project_id: int):
             .order_by(PdfReport.created_at.desc())
             .all())
 
-    return render_template("web_pdf_list.html", project=project, pdfs=pdfs)
+    return render_template("web_pdf_list.html", project=project, pdfs=pdfs,
+                           previews=load_pdf_previews(pdfs, get_storage(KIND_PDFS)))
@@ -0,0 +1,124 @@
+# app/utils/compression.py
+from __future__ import annotations
+
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import current_app, request
+
+try:  # volitelné – bez balíčku jen gzip
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Komprese odpovědí (gzip / brotli) pro všechny blueprinty a JSON API:
+#
+#   - jen typy z COMPRESS_MIMETYPES (HTML, JSON, text…), ne soubory
+#     (send_file / Range = direct_passthrough) ani SSE,
+#   - hotové tělo pod COMPRESS_MIN_SIZE se posílá beze změny,
+#   - streamované tělo (generátor) se komprimuje po kusech – velikost
+#     předem neznáme, takže práh se na něj nevztahuje,
+#   - brotli má přednost při stejné q v Accept-Encoding; úroveň je
+#     nastavená na rychlost (dynamický obsah), ne na maximální poměr.
+
+DEFAULT_MIMETYPES = (
+    "text/html", "text/plain", "text/css", "text/csv", "text/xml", "text/javascript",
+    "application/json", "application/javascript", "application/xml", "image/svg+xml",
+)
+_SKIP_STATUS = {204, 206, 304}
+
+
+class _Compressor:
+    __slots__ = ("_c", "_brotli")
+
+    def __init__(self, encoding: str, level: int):
+        self._brotli = encoding == "br"
+        if self._brotli:
+            self._c = brotli.Compressor(quality=level)
+        else:
+            self._c = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip obálka
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data) if self._brotli else self._c.compress(data)
+
+    def finish(self) -> bytes:
+        return self._c.finish() if self._brotli else self._c.flush()
+
+
+def choose_encoding(accept) -> Optional[str]:
+    """Nejlepší podporované kódování podle Accept-Encoding (None = bez komprese)."""
+    best, best_q = None, 0.0
+    for enc in ("br", "gzip"):
+        if enc == "br" and brotli is None:
+            continue
+        q = accept[enc]
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress_bytes(data: bytes, encoding: str, level: int) -> bytes:
+    c = _Compressor(encoding, level)
+    return c.compress(data) + c.finish()
+
+
+def compress_iter(body: Iterable, encoding: str, level: int, charset: str = "utf-8") -> Iterator[bytes]:
+    """Streamovaná komprese; zavření generátoru zavře i původní tělo."""
+    c = _Compressor(encoding, level)
+    try:
+        for chunk in body:
+            if isinstance(chunk, str):
+                chunk = chunk.encode(charset)
+            out = c.compress(chunk)
+            if out:
+                yield out
+        yield c.finish()
+    finally:
+        close = getattr(body, "close", None)
+        if close is not None:
+            close()
+
+
+def _eligible(resp, mimetypes) -> bool:
+    if request.method == "HEAD" or resp.status_code < 200 or resp.status_code in _SKIP_STATUS:
+        return False
+    if resp.direct_passthrough or "Content-Encoding" in resp.headers:
+        return False
+    if resp.mimetype not in mimetypes:
+        return False
+    return not resp.cache_control.no_transform
+
+
+def compress_response(resp):
+    cfg = current_app.config
+    if not _eligible(resp, cfg["COMPRESS_MIMETYPES"]):
+        return resp
+    if not resp.is_streamed and (resp.content_length or 0) < cfg["COMPRESS_MIN_SIZE"]:
+        return resp
+    resp.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return resp
+    level = cfg["COMPRESS_BR_LEVEL"] if encoding == "br" else cfg["COMPRESS_GZIP_LEVEL"]
+
+    if resp.is_streamed:
+        resp.response = compress_iter(resp.response, encoding, level)
+        resp.headers.pop("Content-Length", None)
+    else:
+        resp.set_data(compress_bytes(resp.get_data(), encoding, level))
+    resp.headers["Content-Encoding"] = encoding
+    # jiná reprezentace = jiný ETag (cache by jinak míchaly varianty)
+    etag, weak = resp.get_etag()
+    if etag:
+        resp.set_etag(f"{etag}-{encoding}", weak)
+    return resp
+
+
+def init_app(app) -> None:
+    if not app.config.get("COMPRESS_RESPONSES"):
+        return
+    types = app.config.get("COMPRESS_MIMETYPES") or DEFAULT_MIMETYPES
+    if isinstance(types, str):
+        types = [t.strip() for t in types.split(",") if t.strip()]
+    app.config["COMPRESS_MIMETYPES"] = frozenset(types)
+    app.after_request(compress_response)
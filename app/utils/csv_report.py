@@ -1,6 +1,6 @@
 # app/utils/csv_report.py
 from __future__ import annotations
-import csv, io, os
+import os
 from datetime import datetime
 
 STATUSES_OK = {"passed", "ok", "success"}
@@ -20,16 +20,10 @@ def _ms_fmt(ms: int) -> str:
         return f"{m:d}:{s:02d}.{rem_ms:03d}"
     return f"{s:d}.{rem_ms:03d}s"
 
-def parse_report_csv(abs_path: str) -> dict:
+def read_report_lines(abs_path: str) -> tuple[str | None, list[str]]:
     """
-    Vrátí:
-      {
-        'file_name': '2025_09_11_14_47.csv',
-        'header_note': 'Text poznámky z hlavičky CSV nebo None',
-        'rows': [ {describe, test, status, duration_ms, duration_fmt, timestamp, timestampLocal}, ... ],
-        'groups': [...],
-        'summary': {...},
-      }
+    Načte CSV report a vrátí (header_note, datové řádky bez komentářů).
+    Používá CSV parser sloupcového modelu (report_columns).
     """
     if not os.path.exists(abs_path):
         raise FileNotFoundError(abs_path)
@@ -68,77 +62,19 @@ def parse_report_csv(abs_path: str) -> dict:
     # Poznámku už máme z horní části; pro CSV data chceme jen řádky bez komentářů.
     lines = [ln for ln in orig_lines if not ln.strip().startswith("#")]
 
-    rdr = csv.DictReader(io.StringIO("\n".join(lines)))
-
-    rows = []
-    total = passed = failed = skipped = 0
-    total_ms = 0
-    for r in rdr:
-        desc = (r.get("describe") or "").strip()
-        test = (r.get("test") or "").strip()
-        status_raw = (r.get("status") or "").strip().lower()
-        dur = r.get("duration") or "0"
-        try:
-            dur_ms = int(float(dur))
-        except Exception:
-            dur_ms = 0
-        ts = (r.get("timestamp") or "").strip()
-        tsl = (r.get("timestampLocal") or "").strip()
-
-        total += 1
-        total_ms += dur_ms
-        if status_raw in STATUSES_OK:
-            passed += 1
-            status_norm = "passed"
-        elif status_raw in STATUSES_FAIL:
-            failed += 1
-            status_norm = "failed"
-        elif status_raw in STATUSES_SKIP:
-            skipped += 1
-            status_norm = "skipped"
-        else:
-            status_norm = status_raw or "unknown"
-
-        rows.append({
-            "describe": desc,
-            "test": test,
-            "status": status_norm,
-            "duration_ms": dur_ms,
-            "duration_fmt": _ms_fmt(dur_ms),
-            "timestamp": ts,
-            "timestampLocal": tsl,
-        })
-
-    pass_rate = round((passed / total * 100.0), 1) if total else 0.0
+    return header_note, lines
 
-    # Seskupení podle "describe"
-    groups_map = {}
-    for r in rows:
-        g = groups_map.setdefault(r["describe"] or "—", {
-            "describe": r["describe"] or "—",
-            "total": 0, "passed": 0, "failed": 0, "skipped": 0,
-            "duration_ms": 0, "tests": []
-        })
-        g["tests"].append(r)
-        g["total"] += 1
-        g["duration_ms"] += r["duration_ms"]
-        if r["status"] == "passed": g["passed"] += 1
-        elif r["status"] == "failed": g["failed"] += 1
-        elif r["status"] == "skipped": g["skipped"] += 1
-
-    groups = []
-    for g in groups_map.values():
-        g["duration_fmt"] = _ms_fmt(g["duration_ms"])
-        groups.append(g)
-
-    return {
-        "file_name": os.path.basename(abs_path),
-        "header_note": header_note,   # ← NOVÉ
-        "rows": rows,
-        "groups": groups,
-        "summary": {
-            "total": total, "passed": passed, "failed": failed, "skipped": skipped,
-            "pass_rate": pass_rate,
-            "duration_ms": total_ms, "duration_fmt": _ms_fmt(total_ms),
-        }
-    }
+def parse_report_csv(abs_path: str) -> dict:
+    """
+    Vrátí:
+      {
+        'file_name': '2025_09_11_14_47.csv',
+        'header_note': 'Text poznámky z hlavičky CSV nebo None',
+        'rows': [ {describe, test, status, duration_ms, duration_fmt, timestamp, timestampLocal}, ... ],
+        'groups': [...],
+        'summary': {...},
+      }
+    Čerstvý sidecar (<csv>.rcol), jinak parser podle formátu – viz report_sidecar.
+    """
+    from app.utils.report_sidecar import load_report_columns
+    return load_report_columns(abs_path).to_report()
@@ -0,0 +1,244 @@
+# app/utils/duration_analytics.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app import db
+from app.models.run_stats_model import RunStats
+from app.models.test_baseline_model import TestBaseline
+from app.utils.report_columns import ColumnarReport
+from app.utils.run_shards import duration_histogram, histogram_percentiles, merge_histograms
+
+# Analytika délek se počítá jednou při ingestu běhu:
+#   - RunStats: summary, p50/p90/p99 a top-N nejpomalejších testů
+#   - TestBaseline: klouzavé okno posledních N délek každého testu v sadě;
+#     nový běh okno jen posune (žádný rescan historie) a testy, které jsou
+#     výrazně pomalejší než medián okna, se uloží jako regrese do RunStats.
+
+DEFAULT_WINDOW = 10
+DEFAULT_THRESHOLD = 0.5     # +50 % proti baseline
+DEFAULT_MIN_DELTA_MS = 500  # a zároveň aspoň o 0,5 s
+DEFAULT_SLOWEST_N = 10
+MIN_SAMPLES = 3             # baseline z méně běhů je moc "nervózní"
+KEY_SEP = "::"
+
+
+def test_key(describe: str, test: str) -> str:
+    return f"{describe}{KEY_SEP}{test}"
+
+
+def _split_key(key: str) -> tuple[str, str]:
+    describe, _, test = key.partition(KEY_SEP)
+    return describe, test
+
+
+def _per_test_durations(rep: ColumnarReport) -> Dict[str, int]:
+    """Délka každého testu v běhu; duplicitní klíč (retry) = nejdelší pokus."""
+    out: Dict[str, int] = {}
+    raw, codes, tests, durs = rep.describe_raw, rep.describe_codes, rep.tests, rep.durations
+    for i in range(len(rep)):
+        key = test_key(raw[codes[i]], tests[i])
+        d = int(durs[i])
+        if d > out.get(key, -1):
+            out[key] = d
+    return out
+
+
+def _median(values: List[int]) -> int:
+    # okno má jednotky hodnot – sorted je výrazně levnější než np.median (stejný výsledek)
+    s = sorted(values)
+    n = len(s)
+    if not n:
+        return 0
+    mid = n // 2
+    return int(s[mid] if n % 2 else (s[mid - 1] + s[mid]) / 2)
+
+
+def load_baselines(suite_id: int) -> Dict[str, TestBaseline]:
+    """Baseline všech testů sady – jeden dotaz (ne dotaz na test)."""
+    return {b.test_key: b for b in TestBaseline.query.filter_by(suite_id=suite_id)}
+
+
+def _new_baseline(suite_id: int, key: str) -> TestBaseline:
+    b = TestBaseline(suite_id=suite_id, test_key=key, window=[])
+    db.session.add(b)
+    return b
+
+
+def advance_baselines(baselines: Dict[str, TestBaseline], suite_id: int, current: Dict[str, int],
+                      window: int = DEFAULT_WINDOW, threshold: float = DEFAULT_THRESHOLD,
+                      min_delta_ms: int = DEFAULT_MIN_DELTA_MS,
+                      new: Callable[[int, str], object] = _new_baseline) -> List[dict]:
+    """
+    Posune načtené baseline (`load_baselines`) o jeden běh s délkami
+    `current` a vrátí nalezené regrese. Chybějící testy založí `new`
+    (výchozí = TestBaseline v session) a přidá je do slovníku.
+    """
+    regressions = []
+    now = datetime.utcnow()
+    for key, dur in current.items():
+        b = baselines.get(key)
+        if b is None:
+            b = baselines[key] = new(suite_id, key)
+        hist = list(b.window or [])
+
+        if len(hist) >= MIN_SAMPLES and b.baseline_ms is not None:
+            base = b.baseline_ms
+            if dur > base * (1.0 + threshold) and dur - base >= min_delta_ms:
+                describe, test = _split_key(key)
+                regressions.append({
+                    "key": key, "describe": describe, "test": test,
+                    "duration_ms": dur, "baseline_ms": base,
+                    "ratio": round(dur / base, 2) if base else None,
+                })
+
+        hist.append(dur)
+        hist = hist[-window:]
+        b.window = hist  # nový list → SQLAlchemy změnu JSON sloupce zaregistruje
+        b.baseline_ms = _median(hist)
+        b.last_ms = dur
+        b.updated_at = now
+    return regressions
+
+
+def update_baselines(suite_id: int, rep: ColumnarReport, window: int = DEFAULT_WINDOW,
+                     threshold: float = DEFAULT_THRESHOLD,
+                     min_delta_ms: int = DEFAULT_MIN_DELTA_MS) -> List[dict]:
+    """Posune baseline testů z `rep` o jeden běh a vrátí nalezené regrese."""
+    return advance_baselines(load_baselines(suite_id), suite_id, _per_test_durations(rep),
+                             window, threshold, min_delta_ms)
+
+
+def _slowest_entries(rep: ColumnarReport, n: int) -> List[dict]:
+    return [{"describe": r["describe"], "test": r["test"], "duration_ms": r["duration_ms"]}
+            for r in rep.slowest(n)]
+
+
+def _sort_regressions(regressions: List[dict]) -> List[dict]:
+    return sorted(regressions, key=lambda r: r["duration_ms"] - r["baseline_ms"], reverse=True)
+
+
+def report_digest(rep: ColumnarReport, slowest_n: int = DEFAULT_SLOWEST_N) -> dict:
+    """
+    Vše, co analytika běhu z reportu potřebuje, v čistých typech
+    (hromadný import ho počítá v pracovních procesech a posílá zpět).
+    """
+    return {
+        "summary": rep.summary(),
+        "percentiles": rep.percentiles((50, 90, 99)),
+        "slowest": _slowest_entries(rep, slowest_n),
+        "tests": _per_test_durations(rep),
+    }
+
+
+def stats_values(run_id: int, suite_id: int, digest: dict, regressions: List[dict]) -> dict:
+    """Sloupce RunStats z `report_digest` a regresí (ORM i hromadný INSERT)."""
+    summary, pct = digest["summary"], digest["percentiles"]
+    return {
+        "run_id": run_id, "suite_id": suite_id,
+        "total": summary["total"], "passed": summary["passed"],
+        "failed": summary["failed"], "skipped": summary["skipped"],
+        "duration_ms": summary["duration_ms"],
+        "p50_ms": pct["p50"], "p90_ms": pct["p90"], "p99_ms": pct["p99"],
+        "slowest": digest["slowest"], "regressions": _sort_regressions(regressions),
+    }
+
+
+def record_run_analytics(run, rep: ColumnarReport, window: int = DEFAULT_WINDOW,
+                         threshold: float = DEFAULT_THRESHOLD,
+                         min_delta_ms: int = DEFAULT_MIN_DELTA_MS,
+                         slowest_n: int = DEFAULT_SLOWEST_N) -> RunStats:
+    """
+    Spočítá RunStats pro nový běh a posune baseline jeho sady.
+    `run` musí mít id (po flush). Necommituje – to dělá volající.
+    """
+    digest = report_digest(rep, slowest_n)
+    regressions = advance_baselines(load_baselines(run.suite_id), run.suite_id, digest["tests"],
+                                    window, threshold, min_delta_ms)
+    stats = RunStats(**stats_values(run.id, run.suite_id, digest, regressions))
+    db.session.add(stats)
+    return stats
+
+
+def add_shard_analytics(run, rep: ColumnarReport,
+                        earlier: Optional[Callable[[], List[ColumnarReport]]] = None,
+                        window: int = DEFAULT_WINDOW, threshold: float = DEFAULT_THRESHOLD,
+                        min_delta_ms: int = DEFAULT_MIN_DELTA_MS,
+                        slowest_n: int = DEFAULT_SLOWEST_N) -> RunStats:
+    """
+    Přičte další shard k RunStats běhu (řádek už musí existovat): čítače
+    atomicky v SQL, histogram délek, top-N a regrese se sloučí s tím, co
+    v řádku je. `earlier` vrátí reporty dřívějších shardů – volá se jen pro
+    běh bez histogramu (nahraný před jeho zavedením). Necommituje.
+    """
+    summary = rep.summary()
+    # UPDATE zároveň zamkne řádek – JSON sloupce níž se čtou až po něm,
+    # souběžný shard tak nepřepíše sloučení jiného
+    RunStats.query.filter_by(run_id=run.id).update(
+        {getattr(RunStats, k): getattr(RunStats, k) + summary[k]
+         for k in ("total", "passed", "failed", "skipped", "duration_ms")},
+        synchronize_session=False,
+    )
+    stats = db.session.get(RunStats, run.id, populate_existing=True)
+
+    hist = stats.duration_hist
+    if hist is None and earlier is not None:
+        hist = merge_histograms(*(duration_histogram(r) for r in earlier()))
+    hist = merge_histograms(hist, duration_histogram(rep))
+    stats.duration_hist = hist
+    stats.p50_ms, stats.p90_ms, stats.p99_ms = (histogram_percentiles(hist)[k] for k in ("p50", "p90", "p99"))
+
+    merged = (stats.slowest or []) + _slowest_entries(rep, slowest_n)
+    stats.slowest = sorted(merged, key=lambda r: r["duration_ms"], reverse=True)[:slowest_n]
+    new_regs = update_baselines(run.suite_id, rep, window, threshold, min_delta_ms)
+    stats.regressions = _sort_regressions((stats.regressions or []) + new_regs)
+    return stats
+
+
+def restat_shards(stats: RunStats, reports: List[ColumnarReport],
+                  slowest_n: int = DEFAULT_SLOWEST_N) -> RunStats:
+    """
+    Histogram, percentily a top-N běhu znovu ze zbylých shardů (po odebrání
+    shardu). Čítače a regrese nechává na volajícím. Necommituje.
+    """
+    hist = merge_histograms(*(duration_histogram(r) for r in reports))
+    stats.duration_hist = hist
+    stats.p50_ms, stats.p90_ms, stats.p99_ms = (histogram_percentiles(hist)[k] for k in ("p50", "p90", "p99"))
+    merged = [e for r in reports for e in _slowest_entries(r, slowest_n)]
+    stats.slowest = sorted(merged, key=lambda r: r["duration_ms"], reverse=True)[:slowest_n]
+    return stats
+
+
+def analytics_options(config) -> dict:
+    """Parametry analytiky z app.config (DURATION_* / SLOWEST_N)."""
+    return {
+        "window": config.get("DURATION_BASELINE_WINDOW", DEFAULT_WINDOW),
+        "threshold": config.get("DURATION_REGRESSION_THRESHOLD", DEFAULT_THRESHOLD),
+        "min_delta_ms": config.get("DURATION_REGRESSION_MIN_MS", DEFAULT_MIN_DELTA_MS),
+        "slowest_n": config.get("SLOWEST_N", DEFAULT_SLOWEST_N),
+    }
+
+
+def record_run_analytics_from_config(run, rep: ColumnarReport, config) -> RunStats:
+    """Varianta s parametry z app.config."""
+    return record_run_analytics(run, rep, **analytics_options(config))
+
+
+def suite_duration_overview(suite_id: int, limit: int = 30) -> dict:
+    """Data pro pohled sady: posledních `limit` běhů se statistikami, od nejnovějšího."""
+    from app.models.run_model import Run
+
+    rows = (db.session.query(Run, RunStats)
+            .join(RunStats, RunStats.run_id == Run.id)
+            .filter(Run.suite_id == suite_id)
+            .order_by(Run.created_at.desc(), Run.id.desc())
+            .limit(limit)
+            .all())
+    latest: Optional[RunStats] = rows[0][1] if rows else None
+    return {
+        "runs": rows,
+        "latest": latest,
+        "slowest": (latest.slowest or []) if latest else [],
+        "regressions": (latest.regressions or []) if latest else [],
+    }
@@ -0,0 +1,381 @@
+# app/utils/fsck.py
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, literal, select, union_all, update
+
+from app import db
+from app.models.pdf_model import PdfReport
+from app.models.run_model import Run
+from app.models.run_shard_model import RunShard
+from app.models.run_stats_model import RunStats
+from app.utils.duration_analytics import DEFAULT_SLOWEST_N, restat_shards
+from app.utils.live_hub import DONE_SUFFIX as LIVE_DONE_SUFFIX
+from app.utils.pdf_preview import META_SUFFIX, THUMB_SUFFIX
+from app.utils.report_archive import ARCHIVE_DIR, ARCHIVE_EXT, INDEX_SUFFIX, report_exists, split_archive_path
+from app.utils.report_sidecar import SUFFIX as SIDECAR_SUFFIX, load_report_columns
+from app.utils.storage_index import invalidate_index
+from app.utils.suite_health import refresh_suite_health, suites_of_runs
+
+# Kontrola konzistence úložiště a DB (`flask reports fsck`).
+#
+# Obě strany se čtou jako seřazené proudy a porovnají merge-joinem:
+#   - disk: DFS přes os.scandir, adresáře se listují dopředu v thread poolu
+#     (okno `window` adresářů), v paměti je jen zásobník aktuální cesty,
+#   - DB:   cesty po dávkách (yield_per) seřazené stejně jako průchod disku –
+#           po komponentách cesty, tj. ORDER BY replace(path, '/', char(1)).
+# Paměť tak neroste s počtem souborů, jen s velikostí největšího adresáře.
+#
+# Výsledek: osiřelé soubory (na disku, ne v DB), chybějící soubory (v DB,
+# ne na disku) a u PDF nesoulad PdfReport.size. Doprovodné soubory (.rcol
+# sidecar, náhledy PDF) patří k hlavnímu souboru; soubory mladší než
+# `grace` se za osiřelé nepovažují (upload, který ještě necommitnul).
+
+DEFAULT_GRACE = 3600.0
+DEFAULT_WINDOW = 64
+DB_BATCH = 5000
+SAMPLE = 20
+
+REPAIR_ORPHANS = "orphans"
+REPAIR_MISSING = "missing"
+REPAIR_SIZES = "sizes"
+
+SHARD_COUNTERS = ("total", "passed", "failed", "skipped", "duration_ms")
+
+
+@dataclass
+class FsEntry:
+    rel: str
+    size: int
+    mtime: float
+    companions: List[str] = field(default_factory=list)  # relativní cesty
+
+
+@dataclass
+class DbEntry:
+    kind: str       # "run" | "shard" | "pdf"
+    id: int
+    rel: str
+    size: Optional[int] = None
+
+
+@dataclass
+class FsckReport:
+    kind: str
+    files: int = 0
+    db_rows: int = 0
+    orphans: int = 0
+    orphan_bytes: int = 0
+    missing: int = 0
+    size_mismatch: int = 0
+    young: int = 0
+    samples: dict = field(default_factory=lambda: {"orphans": [], "missing": [], "sizes": []})
+    # k opravě po průchodu (jen id, ne objekty)
+    missing_ids: dict = field(default_factory=lambda: {"run": [], "shard": [], "pdf": []})
+    size_fixes: List[Tuple[int, int]] = field(default_factory=list)
+    repaired: dict = field(default_factory=dict)
+
+    def sample(self, what: str, text: str) -> None:
+        if len(self.samples[what]) < SAMPLE:
+            self.samples[what].append(text)
+
+
+def path_key(rel: str) -> Tuple[str, ...]:
+    """Pořadí průchodu disku = pořadí n-tic komponent cesty."""
+    return tuple(rel.lstrip("/\\").split("/"))
+
+
+# ---------- disk ----------
+
+def _list_dir(root: str, rel_dir: str, companion_suffixes: Sequence[str]):
+    """
+    Jeden adresář: seřazené položky ('f', FsEntry) / ('d', rel). Doprovodné
+    soubory se přilepí k hlavnímu souboru ve stejném adresáři; bez něj
+    zůstanou jako samostatné (osiřelé) položky.
+    """
+    path = os.path.join(root, rel_dir) if rel_dir else root
+    files, dirs = {}, []
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                rel = f"{rel_dir}/{e.name}" if rel_dir else e.name
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        dirs.append((e.name, rel))
+                    elif e.is_file(follow_symlinks=False):
+                        st = e.stat(follow_symlinks=False)
+                        files[e.name] = FsEntry(rel, st.st_size, st.st_mtime)
+                except OSError:
+                    continue
+    except OSError:
+        return []
+
+    for name in list(files):
+        for suffix in companion_suffixes:
+            owner = name[:-len(suffix)] if name.endswith(suffix) else None
+            if owner and owner in files:
+                files[owner].companions.append(files.pop(name).rel)
+                break
+    items = [(name, "f", entry) for name, entry in files.items()] + [(name, "d", rel) for name, rel in dirs]
+    items.sort(key=lambda x: x[0])
+    return [(kind, val) for _name, kind, val in items]
+
+
+def scan_tree(root: str, pool: ThreadPoolExecutor, companion_suffixes: Sequence[str] = (),
+              window: int = DEFAULT_WINDOW) -> Iterator[FsEntry]:
+    """Soubory pod `root` v pořadí `path_key`; scandir nejbližších `window` adresářů běží v poolu."""
+    stack: list = [["d", "", None]]  # [druh, hodnota, future]
+
+    def _prime():
+        pending = 0
+        for item in reversed(stack):
+            if item[0] != "d":
+                continue
+            if item[2] is None:
+                item[2] = pool.submit(_list_dir, root, item[1], companion_suffixes)
+            pending += 1
+            if pending >= window:
+                break
+
+    while stack:
+        kind, val, fut = stack.pop()
+        if kind == "f":
+            yield val
+            continue
+        if fut is None:
+            fut = pool.submit(_list_dir, root, val, companion_suffixes)
+        children = fut.result()
+        stack.extend([k, v, None] for k, v in reversed(children))
+        _prime()
+
+
+# ---------- DB ----------
+
+_ARCHIVE_LIKE = "%/" + ARCHIVE_DIR.replace("_", "\\_") + "/%"
+
+
+def _archive_like(col):
+    return col.like(_ARCHIVE_LIKE, escape="\\")
+
+
+def _sort_key(col):
+    # řazení po komponentách cesty (viz path_key): '/' → char(1), menší než každý znak jména
+    return func.replace(col, "/", func.char(1))
+
+
+def _report_paths(archived: bool):
+    runs = select(literal("run").label("kind"), Run.id.label("id"), Run.csv_path.label("path"))
+    shards = select(literal("shard").label("kind"), RunShard.id.label("id"), RunShard.csv_path.label("path"))
+    cond = _archive_like if archived else (lambda c: ~_archive_like(c))
+    u = union_all(runs.where(cond(Run.csv_path)), shards.where(cond(RunShard.csv_path))).subquery()
+    return select(u.c.kind, u.c.id, u.c.path).order_by(_sort_key(u.c.path), u.c.kind, u.c.id)
+
+
+def _stream(stmt, batch: int) -> Iterator[tuple]:
+    # vlastní spojení jen pro čtení – session mezitím může mazat / commitovat
+    with db.engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch).execute(stmt)
+        for row in result:
+            yield row
+
+
+def report_db_entries(batch: int = DB_BATCH) -> Iterator[DbEntry]:
+    for kind, id_, path in _stream(_report_paths(archived=False), batch):
+        yield DbEntry(kind, id_, (path or "").lstrip("/\\"))
+
+
+def pdf_db_entries(batch: int = DB_BATCH) -> Iterator[DbEntry]:
+    stmt = (select(PdfReport.id, PdfReport.pdf_path, PdfReport.size)
+            .order_by(_sort_key(PdfReport.pdf_path), PdfReport.id))
+    for id_, path, size in _stream(stmt, batch):
+        yield DbEntry("pdf", id_, (path or "").lstrip("/\\"), size)
+
+
+# ---------- porovnání ----------
+
+def merge_join(fs: Iterable[FsEntry], dbe: Iterable[DbEntry],
+               on_orphan: Callable[[FsEntry], None],
+               on_missing: Callable[[DbEntry], None],
+               on_match: Callable[[FsEntry, DbEntry], None]) -> None:
+    """Merge-join dvou proudů seřazených podle `path_key` (víc řádků DB na jeden soubor je OK)."""
+    fs_it, db_it = iter(fs), iter(dbe)
+    f = next(fs_it, None)
+    d = next(db_it, None)
+    f_matched = False
+    while f is not None or d is not None:
+        if d is None or (f is not None and path_key(f.rel) < path_key(d.rel)):
+            if not f_matched:
+                on_orphan(f)
+            f, f_matched = next(fs_it, None), False
+        elif f is None or path_key(d.rel) < path_key(f.rel):
+            on_missing(d)
+            d = next(db_it, None)
+        else:
+            on_match(f, d)
+            f_matched = True
+            d = next(db_it, None)
+
+
+def _remove(root: str, rels: Iterable[str]) -> int:
+    freed = 0
+    for rel in rels:
+        p = os.path.join(root, rel)
+        try:
+            size = os.path.getsize(p)
+            os.remove(p)
+            freed += size
+        except OSError:
+            pass
+    return freed
+
+
+def _check(root: str, fs: Iterator[FsEntry], dbe: Iterator[DbEntry], report: FsckReport,
+           grace: float, repair: set, is_referenced: Callable[[str], bool] = lambda rel: False) -> None:
+    cutoff = time.time() - grace
+    fix_orphans = REPAIR_ORPHANS in repair
+
+    def on_orphan(f: FsEntry):
+        if is_referenced(f.rel):
+            return
+        if f.mtime > cutoff:
+            report.young += 1
+            return
+        report.orphans += 1
+        report.orphan_bytes += f.size
+        report.sample("orphans", f.rel)
+        if fix_orphans:
+            _remove(root, [f.rel, *f.companions])
+            report.repaired["orphans"] = report.repaired.get("orphans", 0) + 1
+
+    def on_missing(d: DbEntry):
+        report.db_rows += 1
+        report.missing += 1
+        report.missing_ids[d.kind].append(d.id)
+        report.sample("missing", f"{d.kind} #{d.id}: {d.rel}")
+
+    def on_match(f: FsEntry, d: DbEntry):
+        report.db_rows += 1
+        if d.kind == "pdf" and d.size != f.size:
+            report.size_mismatch += 1
+            report.size_fixes.append((d.id, f.size))
+            report.sample("sizes", f"pdf #{d.id}: {d.rel} (DB {d.size}, disk {f.size})")
+
+    def counted(it):
+        for f in it:
+            report.files += 1
+            yield f
+
+    merge_join(counted(fs), dbe, on_orphan, on_missing, on_match)
+
+
+def _check_archived(reports_dir: str, report: FsckReport, batch: int) -> set:
+    """Odkazy do archivů: člen musí být v indexu. Vrátí množinu odkazovaných tarů."""
+    tars = set()
+    for kind, id_, path in _stream(_report_paths(archived=True), batch):
+        rel = (path or "").lstrip("/\\")
+        report.db_rows += 1
+        parts = split_archive_path(rel)
+        if parts is not None:
+            tars.add(parts[0])
+        if parts is None or not report_exists(os.path.join(reports_dir, rel)):
+            report.missing += 1
+            report.missing_ids[kind].append(id_)
+            report.sample("missing", f"{kind} #{id_}: {rel}")
+    return tars
+
+
+def fsck_reports(reports_dir: str, pool: ThreadPoolExecutor, grace: float = DEFAULT_GRACE,
+                 repair: Iterable[str] = (), batch: int = DB_BATCH, window: int = DEFAULT_WINDOW) -> FsckReport:
+    report = FsckReport("reports")
+    repair = set(repair)
+    tars = _check_archived(reports_dir, report, batch)
+
+    def is_referenced(rel: str) -> bool:
+        # tar archivu (a jeho .idx) patří běhům, které do něj ukazují
+        if f"/{ARCHIVE_DIR}/" not in f"/{rel}":
+            return False
+        tar = rel[:-len(INDEX_SUFFIX)] if rel.endswith(ARCHIVE_EXT + INDEX_SUFFIX) else rel
+        return tar in tars
+
+    fs = scan_tree(reports_dir, pool, (SIDECAR_SUFFIX, LIVE_DONE_SUFFIX), window)
+    _check(reports_dir, fs, report_db_entries(batch), report, grace, repair, is_referenced)
+    _repair_db(report, repair, batch, reports_dir)
+    return report
+
+
+def fsck_pdfs(pdfs_dir: str, pool: ThreadPoolExecutor, grace: float = DEFAULT_GRACE,
+              repair: Iterable[str] = (), batch: int = DB_BATCH, window: int = DEFAULT_WINDOW) -> FsckReport:
+    report = FsckReport("pdfs")
+    repair = set(repair)
+    fs = scan_tree(pdfs_dir, pool, (THUMB_SUFFIX, META_SUFFIX), window)
+    _check(pdfs_dir, fs, pdf_db_entries(batch), report, grace, repair)
+    _repair_db(report, repair, batch)
+    return report
+
+
+# ---------- opravy v DB ----------
+
+def _chunks(ids: Sequence[int], size: int) -> Iterator[Sequence[int]]:
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def _drop_missing_shards(ids: Sequence[int], reports_dir: str, batch: int) -> int:
+    """
+    Smaže shardy bez souboru. Čítače běhu = součet zbylých shardů,
+    percentily a top-N se přepočtou ze zbylých souborů.
+    """
+    n = 0
+    for chunk in _chunks(ids, batch):
+        # shardy smazaných běhů už vzal ON DELETE CASCADE
+        run_ids = [rid for (rid,) in db.session.execute(
+            select(RunShard.run_id).where(RunShard.id.in_(chunk)).distinct())]
+        n += db.session.execute(delete(RunShard).where(RunShard.id.in_(chunk))).rowcount
+        for run_id in run_ids:
+            stats = db.session.get(RunStats, run_id, populate_existing=True)
+            if stats is None:
+                continue
+            sums = db.session.execute(
+                select(*(func.coalesce(func.sum(getattr(RunShard, k)), 0) for k in SHARD_COUNTERS))
+                .where(RunShard.run_id == run_id)).one()
+            for k, v in zip(SHARD_COUNTERS, sums):
+                setattr(stats, k, v)
+            reports = []
+            for (path,) in db.session.execute(select(RunShard.csv_path).where(RunShard.run_id == run_id)):
+                abs_path = os.path.join(reports_dir, (path or "").lstrip("/\\"))
+                if report_exists(abs_path):
+                    reports.append(load_report_columns(abs_path))
+            # top-N v délce, jakou běh měl (SLOWEST_N z doby ingestu)
+            restat_shards(stats, reports, len(stats.slowest or []) or DEFAULT_SLOWEST_N)
+        refresh_suite_health(suites_of_runs(run_ids))
+        db.session.commit()
+    return n
+
+
+def _repair_db(report: FsckReport, repair: set, batch: int, reports_dir: Optional[str] = None) -> None:
+    if REPAIR_MISSING in repair:
+        n = 0
+        # živé běhy se nemažou (soubor může vznikat právě teď)
+        for chunk in _chunks(report.missing_ids["run"], batch):
+            suites = suites_of_runs(chunk)
+            n += db.session.execute(delete(Run).where(Run.id.in_(chunk), Run.live.is_(False))).rowcount
+            refresh_suite_health(suites)
+            db.session.commit()
+        if reports_dir is not None:
+            n += _drop_missing_shards(report.missing_ids["shard"], reports_dir, batch)
+        for chunk in _chunks(report.missing_ids["pdf"], batch):
+            n += db.session.execute(delete(PdfReport).where(PdfReport.id.in_(chunk))).rowcount
+            db.session.commit()
+        report.repaired["missing"] = n
+        invalidate_index()
+    if REPAIR_SIZES in repair and report.size_fixes:
+        for i in range(0, len(report.size_fixes), batch):
+            rows = [{"id": id_, "size": size} for id_, size in report.size_fixes[i:i + batch]]
+            db.session.execute(update(PdfReport), rows)
+            db.session.commit()
+        report.repaired["sizes"] = len(report.size_fixes)
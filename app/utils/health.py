@@ -0,0 +1,173 @@
+# app/utils/health.py
+from __future__ import annotations
+
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, jsonify
+
+# Readiness (`GET /readyz`) – na rozdíl od /healthz (liveness, konstanta)
+# sahá na SQLite a úložiště:
+#
+#   db       – SELECT přes vlastní read-only spojení s busy timeoutem
+#              (sonda nebere zámek pro zápis – nesoupeří s ingestem)
+#   storage  – REPORTS_DIR / PDFS_DIR / UPLOAD_DIR: zápis dočasného souboru
+#              a volné místo aspoň READY_MIN_FREE_MB
+#   wal      – nezcheckpointované stránky WAL (mxFrame − nBackfill z hlavičky
+#              wal-indexu v `<db>-shm`, bez zámků a bez checkpointu)
+#
+# Výsledek se v procesu cachuje READY_CACHE_TTL sekund a počítá ho vždy jen
+# jedno vlákno – časté sondy load balanceru DB ani disk nezatíží.
+
+_SHM_MX_FRAME = 16      # WalIndexHdr.mxFrame (u32, nativní pořadí bajtů)
+_SHM_PAGE_SIZE = 14     # WalIndexHdr.szPage (u16; 1 = 65536)
+_SHM_BACKFILL = 96      # WalCkptInfo.nBackfill – za dvěma kopiemi 48B hlavičky
+_WAL_FRAME_HDR = 24
+
+
+def sqlite_path(config) -> Optional[str]:
+    uri = config.get("SQLALCHEMY_DATABASE_URI", "")
+    return uri[len("sqlite:///"):] if uri.startswith("sqlite:///") else None
+
+
+def check_db(path: Optional[str], timeout: float) -> Dict:
+    t0 = time.perf_counter()
+    if path is None:
+        from sqlalchemy import text
+        from app import db
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {"ok": True, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=timeout, isolation_level=None)
+    except sqlite3.OperationalError as e:
+        return {"ok": False, "error": str(e), "ms": round((time.perf_counter() - t0) * 1000, 1)}
+    try:
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+    except sqlite3.OperationalError as e:
+        return {"ok": False, "error": str(e), "ms": round((time.perf_counter() - t0) * 1000, 1)}
+    finally:
+        conn.close()
+    return {"ok": True, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+
+def check_dir(path: str, min_free: int) -> Dict:
+    out: Dict = {"ok": False}
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path, prefix=".readyz-")
+        os.close(fd)
+        os.remove(tmp)
+        out["writable"] = True
+    except OSError as e:
+        out["writable"] = False
+        out["error"] = str(e)
+    try:
+        out["free_bytes"] = shutil.disk_usage(path).free
+    except OSError as e:
+        out.setdefault("error", str(e))
+        return out
+    out["ok"] = out["writable"] and out["free_bytes"] >= min_free
+    if out["writable"] and not out["ok"]:
+        out["error"] = f"free space below {min_free} B"
+    return out
+
+
+def wal_lag(db_path: str) -> Tuple[int, int]:
+    """(nezcheckpointované rámce, bajty) podle wal-indexu; bez -shm = 0."""
+    try:
+        with open(db_path + "-shm", "rb") as f:
+            hdr = f.read(_SHM_BACKFILL + 4)
+    except OSError:
+        return 0, 0
+    if len(hdr) < _SHM_BACKFILL + 4:
+        return 0, 0
+    (page,) = struct.unpack_from("=H", hdr, _SHM_PAGE_SIZE)
+    (mx_frame,) = struct.unpack_from("=I", hdr, _SHM_MX_FRAME)
+    (backfill,) = struct.unpack_from("=I", hdr, _SHM_BACKFILL)
+    page = 65536 if page == 1 else page
+    frames = max(0, mx_frame - backfill)
+    return frames, frames * (page + _WAL_FRAME_HDR)
+
+
+def check_wal(db_path: Optional[str], max_bytes: int) -> Dict:
+    if db_path is None:
+        return {"ok": True}
+    frames, lag = wal_lag(db_path)
+    out = {"ok": lag <= max_bytes, "frames": frames, "bytes": lag}
+    if not out["ok"]:
+        out["error"] = f"checkpoint lag above {max_bytes} B"
+    return out
+
+
+class ReadinessProbe:
+    """Výsledek všech kontrol s cache; počítá ho jedno vlákno s celkovým timeoutem."""
+
+    def __init__(self, config, ttl: float = 5.0, timeout: float = 1.0):
+        self.config = config
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[float, bool, Dict]] = None
+        # jedno vlákno: zaseknutá kontrola (NFS, zámek) nenarůstá do dalších vláken
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readyz")
+
+    def _run(self, app) -> Dict:
+        cfg = self.config
+        db_path = sqlite_path(cfg)
+        min_free = int(cfg.get("READY_MIN_FREE_MB", 100)) * 1024 * 1024
+        with app.app_context():
+            checks: Dict = {"db": check_db(db_path, self.timeout)}
+        checks["storage"] = {name: check_dir(cfg[key], min_free)
+                             for name, key in (("reports", "REPORTS_DIR"), ("pdfs", "PDFS_DIR"),
+                                               ("logos", "UPLOAD_DIR"))}
+        checks["wal"] = check_wal(db_path, int(cfg.get("READY_WAL_MAX_MB", 64)) * 1024 * 1024)
+        return checks
+
+    def result(self, app) -> Tuple[bool, Dict, float]:
+        """(ready, kontroly, stáří výsledku v s)."""
+        cached = self._cached
+        if cached is None or time.monotonic() - cached[0] >= self.ttl:
+            with self._lock:
+                cached = self._cached
+                if cached is None or time.monotonic() - cached[0] >= self.ttl:
+                    cached = self._cached = self._evaluate(app)
+        return cached[1], cached[2], round(time.monotonic() - cached[0], 3)
+
+    def _evaluate(self, app) -> Tuple[float, bool, Dict]:
+        fut = self._pool.submit(self._run, app)
+        try:
+            checks = fut.result(timeout=self.timeout * 2 + 1)
+        except FutureTimeout:
+            checks = {"error": "checks timed out"}
+        except Exception as e:
+            checks = {"error": f"{type(e).__name__}: {e}"}
+        return time.monotonic(), _all_ok(checks), checks
+
+
+def _all_ok(checks: Dict) -> bool:
+    if "error" in checks:
+        return False
+    return (checks["db"]["ok"] and checks["wal"]["ok"]
+            and all(c["ok"] for c in checks["storage"].values()))
+
+
+def readyz_view():
+    app = current_app._get_current_object()
+    ready, checks, age = app.extensions["readiness"].result(app)
+    resp = jsonify({"ok": ready, "age": age, "checks": checks})
+    resp.status_code = 200 if ready else 503
+    resp.cache_control.no_store = True
+    return resp
+
+
+def init_app(app) -> None:
+    app.extensions["readiness"] = ReadinessProbe(app.config, ttl=app.config["READY_CACHE_TTL"],
+                                                 timeout=app.config["READY_DB_TIMEOUT"])
+    app.add_url_rule("/readyz", "readyz", readyz_view, methods=["GET"])
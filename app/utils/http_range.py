@@ -0,0 +1,121 @@
+# app/utils/http_range.py
+from __future__ import annotations
+
+import mimetypes
+import os
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from uuid import uuid4
+from zlib import adler32
+
+from flask import Response, request, send_file
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.http import is_resource_modified, parse_range_header
+
+# Werkzeug (send_file) umí jen jeden rozsah – víc rozsahů končí 416.
+# PDF viewery (pdf.js, Acrobat) ale u linearizovaných PDF žádají víc rozsahů
+# najednou, tak je obsloužíme jako multipart/byteranges.
+
+MAX_RANGES = 32
+CHUNK = 64 * 1024
+
+
+def _file_etag(abs_path: str, st: os.stat_result) -> str:
+    # stejný tvar jako werkzeug.utils.send_file, aby If-Range sedělo i na ETag z 200
+    check = adler32(abs_path.encode()) & 0xFFFFFFFF
+    return f"{st.st_mtime}-{st.st_size}-{check}"
+
+
+def _resolve(ranges, size: int) -> List[Tuple[int, int]]:
+    """(start, stop) z hlavičky -> seřazené, sloučené intervaly [start, stop)."""
+    out = []
+    for start, stop in ranges:
+        if start < 0:
+            s, e = max(size + start, 0), size
+        else:
+            s, e = start, min(stop if stop is not None else size, size)
+        if s < e:
+            out.append((s, e))
+    out.sort()
+    merged: List[Tuple[int, int]] = []
+    for s, e in out:
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def send_multi_range(abs_path: str, mimetype: Optional[str] = None) -> Optional[Response]:
+    """
+    Vrátí 206 multipart/byteranges, pokud request žádá víc rozsahů
+    (nad MAX_RANGES celý soubor jako 200). Jinak None – volající pokračuje přes send_from_directory (200 / 206 / 304).
+    """
+    parsed = parse_range_header(request.headers.get("Range"))
+    if parsed is None or parsed.units != "bytes" or len(parsed.ranges) < 2:
+        return None
+
+    st = os.stat(abs_path)
+    size = st.st_size
+    etag = _file_etag(abs_path, st)
+    mtime = datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)
+    if "If-Range" in request.headers and is_resource_modified(
+        request.environ, etag=etag, last_modified=mtime, ignore_if_range=False
+    ):
+        return None  # soubor se změnil → celý soubor (200)
+
+    ranges = _resolve(parsed.ranges, size)
+    if not ranges:
+        raise RequestedRangeNotSatisfiable(length=size)
+    mimetype = mimetype or mimetypes.guess_type(abs_path)[0] or "application/octet-stream"
+    if len(ranges) > MAX_RANGES:
+        # RFC 7233 dovoluje Range ignorovat – ale explicitně celým souborem (200);
+        # send_from_directory(conditional=True) by víc rozsahů odmítl 416
+        resp = send_file(abs_path, mimetype=mimetype, conditional=False, etag=etag,
+                         last_modified=mtime)
+        resp.headers["Accept-Ranges"] = "bytes"
+        resp.cache_control.no_cache = True
+        return resp
+
+    if len(ranges) == 1:
+        # po sloučení zbyl jeden interval → obyčejná single-part odpověď
+        parts_head = boundary = None
+        length = ranges[0][1] - ranges[0][0]
+    else:
+        boundary = uuid4().hex
+        parts_head = [
+            (f"\r\n--{boundary}\r\nContent-Type: {mimetype}\r\n"
+             f"Content-Range: bytes {s}-{e - 1}/{size}\r\n\r\n").encode("ascii")
+            for s, e in ranges
+        ]
+        tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+        length = sum(len(h) for h in parts_head) + sum(e - s for s, e in ranges) + len(tail)
+
+    def generate():
+        with open(abs_path, "rb") as f:
+            for i, (s, e) in enumerate(ranges):
+                if parts_head is not None:
+                    yield parts_head[i]
+                f.seek(s)
+                left = e - s
+                while left > 0:
+                    chunk = f.read(min(CHUNK, left))
+                    if not chunk:
+                        return
+                    left -= len(chunk)
+                    yield chunk
+        if parts_head is not None:
+            yield tail
+
+    if parts_head is None:
+        resp = Response(generate(), status=206, mimetype=mimetype, direct_passthrough=True)
+        resp.headers["Content-Range"] = f"bytes {ranges[0][0]}-{ranges[0][1] - 1}/{size}"
+    else:
+        resp = Response(generate(), status=206, direct_passthrough=True,
+                        content_type=f"multipart/byteranges; boundary={boundary}")
+    resp.headers["Content-Length"] = str(length)
+    resp.headers["Accept-Ranges"] = "bytes"
+    resp.set_etag(etag)
+    resp.last_modified = mtime
+    resp.cache_control.no_cache = True  # stejně jako send_file (revalidace přes ETag)
+    return resp
@@ -0,0 +1,318 @@
+# app/utils/live_hub.py
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from app.utils.csv_report import STATUSES_FAIL, STATUSES_OK, STATUSES_SKIP, _ms_fmt
+from app.utils.report_sidecar import sidecar_path
+
+# Živé běhy: test runner průběžně posílá řádky (append endpoint), ty se
+# připisují do CSV běhu a otevřené stránky reportu je dostávají přes SSE.
+#
+# Zdrojem pravdy je samotný CSV soubor – funguje to tak i přes víc
+# gunicorn workerů. V každém procesu běží pro sledovaný běh jedno vlákno
+# ("tail"), které čte nové řádky souboru a rozesílá je všem divákům
+# z jednoho kanálu:
+#   - kanál drží omezený backlog událostí (deque(maxlen)) s pořadovým číslem,
+#   - divák si pamatuje poslední číslo a čeká na Condition – žádné fronty
+#     na klienta, žádné dotazy do DB na klienta,
+#   - kdo zaostane víc než backlog, dostane "reset" (klient si stáhne snapshot),
+#   - hotový běh (značka `.done` nebo sidecar) pošle "done" a kanál se zavře.
+#     Značku zapisuje finish hned po commitu – když pak selže zápis sidecaru,
+#     diváci se o konci běhu stejně dozví; po úspěšném sidecaru se maže.
+
+DEFAULT_BACKLOG = 1000
+DEFAULT_POLL = 0.5        # s – jak často tail kontroluje velikost souboru
+HEARTBEAT = 15.0          # s – SSE komentář, aby proxy nezavřela spojení
+IDLE_CLOSE = 30.0         # s bez diváků → tail skončí
+
+DONE_SUFFIX = ".done"     # značka dokončeného živého běhu vedle CSV
+
+
+def mark_finished(abs_path: str) -> None:
+    with open(abs_path + DONE_SUFFIX, "w", encoding="utf-8"):
+        pass
+
+
+def clear_finished(abs_path: str) -> None:
+    try:
+        os.remove(abs_path + DONE_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+
+def is_finished(abs_path: str) -> bool:
+    return os.path.exists(abs_path + DONE_SUFFIX) or os.path.exists(sidecar_path(abs_path))
+
+
+def normalize_status(raw: str) -> str:
+    s = (raw or "").strip().lower()
+    if s in STATUSES_OK:
+        return "passed"
+    if s in STATUSES_FAIL:
+        return "failed"
+    if s in STATUSES_SKIP:
+        return "skipped"
+    return s or "unknown"
+
+
+def _empty_summary() -> dict:
+    return {"total": 0, "passed": 0, "failed": 0, "skipped": 0, "duration_ms": 0}
+
+
+def sse_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    out = f"id: {event_id}\n" if event_id is not None else ""
+    return out + f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class _Channel:
+    def __init__(self, hub: "LiveHub", key, abs_path: str):
+        self.hub = hub
+        self.key = key
+        self.abs_path = abs_path
+        self.cond = threading.Condition()
+        self.backlog: deque = deque(maxlen=hub.backlog)
+        self.seq = 0
+        self.subscribers = 0
+        self.idle_since = time.monotonic()
+        self.closed = False
+        self.summary = _empty_summary()
+        self._offset = 0
+        self._rest = b""
+        self._header: Optional[List[str]] = None
+        self._wake = threading.Event()
+        self._async_waiters: set = set()
+        self.thread = threading.Thread(target=self._run, name=f"live-tail-{key}", daemon=True)
+
+    # ---------- tail ----------
+
+    def _read_new_rows(self) -> List[dict]:
+        try:
+            with open(self.abs_path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+        except OSError:
+            return []
+        if not chunk:
+            return []
+        self._offset += len(chunk)
+        data = self._rest + chunk
+        # poslední (neukončený) řádek počká na další zápis
+        cut = data.rfind(b"\n") + 1
+        self._rest = data[cut:]
+        text = data[:cut].decode("utf-8-sig", errors="replace")
+
+        rows = []
+        lines = [ln for ln in text.splitlines() if ln.strip() and not ln.lstrip().startswith("#")]
+        for rec in csv.reader(io.StringIO("\n".join(lines))):
+            if self._header is None:
+                self._header = rec
+                continue
+            r = dict(zip(self._header, rec))
+            try:
+                dur = int(float(r.get("duration") or 0))
+            except ValueError:
+                dur = 0
+            status = normalize_status(r.get("status"))
+            rows.append({
+                "describe": (r.get("describe") or "").strip(),
+                "test": (r.get("test") or "").strip(),
+                "status": status,
+                "duration_ms": dur,
+                "duration_fmt": _ms_fmt(dur),
+                "timestamp": (r.get("timestamp") or "").strip(),
+            })
+            s = self.summary
+            s["total"] += 1
+            s["duration_ms"] += dur
+            if status in ("passed", "failed", "skipped"):
+                s[status] += 1
+        return rows
+
+    def _publish(self, event: str, data: dict) -> None:
+        with self.cond:
+            self.seq += 1
+            self.backlog.append((self.seq, event, data))
+            self.cond.notify_all()
+            self._notify_async()
+
+    def _counters(self) -> dict:
+        s = dict(self.summary)
+        s["duration_fmt"] = _ms_fmt(s["duration_ms"])
+        return s
+
+    def _run(self) -> None:
+        # první průchod = stav souboru při otevření kanálu (bez publikace řádků)
+        self._read_new_rows()
+        self._publish("summary", self._counters())
+        while True:
+            self._wake.wait(self.hub.poll_interval)
+            self._wake.clear()
+            rows = self._read_new_rows()
+            if rows:
+                self._publish("rows", {"rows": rows, "summary": self._counters()})
+            if is_finished(self.abs_path):
+                self._publish("done", self._counters())
+                break
+            with self.cond:
+                if self.subscribers == 0 and time.monotonic() - self.idle_since > IDLE_CLOSE:
+                    break
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+            self._notify_async()
+        self.hub._drop(self.key, self)
+
+    def poke(self) -> None:
+        self._wake.set()
+
+    # ---------- diváci ----------
+
+    def _notify_async(self) -> None:
+        # volá se pod self.cond – probudí async diváky (ASGI) v jejich event loopu
+        for loop, ev in list(self._async_waiters):
+            try:
+                loop.call_soon_threadsafe(ev.set)
+            except RuntimeError:  # loop už neběží
+                self._async_waiters.discard((loop, ev))
+
+    def _subscribe(self, last_id: int) -> tuple[int, List[str]]:
+        with self.cond:
+            self.subscribers += 1
+            seq_now, started = self.seq, self.seq > 0
+            oldest = self.backlog[0][0] if self.backlog else seq_now + 1
+        if last_id:
+            if last_id > seq_now or last_id + 1 < oldest:
+                # id z jiného workeru / ze zaniklého kanálu, nebo mimo backlog –
+                # na pozici nejde navázat, divák si načte snapshot
+                return seq_now, [sse_event("reset", self._counters(), seq_now)]
+            return last_id, []
+        # nový divák: stránka už má snapshot, posíláme jen to, co přijde
+        return seq_now, [sse_event("summary", self._counters(), seq_now)] if started else []
+
+    def _unsubscribe(self) -> None:
+        with self.cond:
+            self.subscribers -= 1
+            if self.subscribers == 0:
+                self.idle_since = time.monotonic()
+
+    def _take(self, pos: int) -> tuple[int, List[str], bool]:
+        """Nové události od `pos` -> (nová pozice, SSE zprávy, konec streamu?). Volat pod self.cond."""
+        pending = [e for e in self.backlog if e[0] > pos]
+        oldest = self.backlog[0][0] if self.backlog else 0
+        out: List[str] = []
+        if pos and oldest > pos + 1:
+            # divák zaostal víc než backlog → ať si načte snapshot
+            out.append(sse_event("reset", self._counters(), self.seq))
+            pending = pending[-1:] if pending and pending[-1][1] == "done" else []
+            pos = self.seq
+        for seq, event, data in pending:
+            out.append(sse_event(event, data, seq))
+            pos = seq
+            if event == "done":
+                return pos, out, True
+        return pos, out, self.closed and not pending
+
+    def events(self, last_id: int = 0) -> Iterator[str]:
+        """Synchronní stream (WSGI) – vlákno čeká na Condition."""
+        pos, first = self._subscribe(last_id)
+        try:
+            yield from first
+            while True:
+                with self.cond:
+                    if not self.closed and (not self.backlog or self.backlog[-1][0] <= pos):
+                        self.cond.wait(HEARTBEAT)
+                    pos, out, finished = self._take(pos)
+                if not out and not finished:
+                    out = [": ping\n\n"]
+                yield from out
+                if finished:
+                    return
+        finally:
+            self._unsubscribe()
+
+    async def aevents(self, last_id: int = 0) -> AsyncIterator[str]:
+        """Asynchronní stream (ASGI) – divák nedrží vlákno, jen asyncio.Event."""
+        loop = asyncio.get_running_loop()
+        ev = asyncio.Event()
+        waiter = (loop, ev)
+        pos, first = self._subscribe(last_id)
+        with self.cond:
+            self._async_waiters.add(waiter)
+        try:
+            for msg in first:
+                yield msg
+            while True:
+                ev.clear()
+                with self.cond:
+                    pos, out, finished = self._take(pos)
+                if not out and not finished:
+                    try:
+                        await asyncio.wait_for(ev.wait(), HEARTBEAT)
+                        continue
+                    except asyncio.TimeoutError:
+                        out = [": ping\n\n"]
+                for msg in out:
+                    yield msg
+                if finished:
+                    return
+        finally:
+            with self.cond:
+                self._async_waiters.discard(waiter)
+            self._unsubscribe()
+
+
+class LiveEventStream:
+    """
+    Tělo SSE odpovědi: pod WSGI se iteruje synchronně, ASGI adaptér
+    (app/asgi.py) pozná `__aiter__` a stream obslouží bez vlákna.
+    """
+
+    def __init__(self, channel: _Channel, last_id: int = 0):
+        self.channel = channel
+        self.last_id = last_id
+
+    def __iter__(self) -> Iterator[bytes]:
+        for msg in self.channel.events(self.last_id):
+            yield msg.encode("utf-8")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for msg in self.channel.aevents(self.last_id):
+            yield msg.encode("utf-8")
+
+
+class LiveHub:
+    """Per-proces fan-out živých běhů (jedno tail vlákno na sledovaný běh)."""
+
+    def __init__(self, backlog: int = DEFAULT_BACKLOG, poll_interval: float = DEFAULT_POLL):
+        self.backlog = backlog
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._channels: Dict[object, _Channel] = {}
+
+    def channel(self, key, abs_path: str) -> _Channel:
+        with self._lock:
+            ch = self._channels.get(key)
+            if ch is None or ch.closed:
+                ch = self._channels[key] = _Channel(self, key, abs_path)
+                ch.thread.start()
+            return ch
+
+    def poke(self, key) -> None:
+        """Append v tomto procesu – ať tail nečeká na další interval."""
+        ch = self._channels.get(key)
+        if ch is not None:
+            ch.poke()
+
+    def _drop(self, key, ch: _Channel) -> None:
+        with self._lock:
+            if self._channels.get(key) is ch:
+                del self._channels[key]
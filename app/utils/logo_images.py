@@ -0,0 +1,106 @@
+# app/utils/logo_images.py
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import re
+from typing import List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+ALLOWED_LOGO_EXT = {"png", "jpg", "jpeg", "webp", "svg"}
+
+# Varianty pro <picture>: WebP v několika šířkách + PNG fallback.
+# Loga se v UI zobrazují ~48 px, takže 64/128 pokryje 1x i 2x displeje.
+LOGO_SIZES = (64, 128, 256)
+FALLBACK_SIZE = 128
+MAX_SOURCE_PIXELS = 40_000_000  # ochrana proti "decompression bomb"
+
+# "<hash>-<size>.<ext>" – obsah se pod stejným jménem nikdy nezmění,
+# proto můžeme posílat `Cache-Control: immutable`.
+HASHED_NAME_RE = re.compile(r"^[0-9a-f]{16}(-\d+)?\.(png|jpe?g|webp|svg)$")
+
+
+def is_hashed_logo(filename: str) -> bool:
+    return bool(HASHED_NAME_RE.match(os.path.basename(filename or "")))
+
+
+def _variant_name(digest: str, size: int, ext: str) -> str:
+    return f"{digest}-{size}.{ext}"
+
+
+def logo_variants(logo_path: Optional[str]) -> List[Tuple[str, int]]:
+    """WebP varianty k uloženému logu [(soubor, šířka), …]; staré logo bez variant -> []."""
+    name = os.path.basename(logo_path or "")
+    if not is_hashed_logo(name) or not name.endswith(f"-{FALLBACK_SIZE}.png"):
+        return []
+    digest = name.split("-", 1)[0]
+    return [(_variant_name(digest, s, "webp"), s) for s in LOGO_SIZES]
+
+
+def _save_atomic(path: str, data: bytes) -> None:
+    if os.path.exists(path):
+        return  # stejný hash = stejný obsah
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def save_logo(file, upload_dir: str) -> Optional[str]:
+    """
+    Uloží nahrané logo do UPLOAD_DIR a vrátí hodnotu pro `Project.logo_path`.
+
+    Rastrová loga se zmenší a překódují do WebP variant (LOGO_SIZES) + PNG
+    fallbacku; SVG se uloží beze změny. Názvy souborů nesou hash obsahu.
+    Vrátí None, pokud přípona není povolená nebo obrázek nejde načíst.
+    """
+    ext = (file.filename or "").rsplit(".", 1)[-1].lower()
+    if ext not in ALLOWED_LOGO_EXT:
+        return None
+
+    raw = file.read()
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+    os.makedirs(upload_dir, exist_ok=True)
+
+    if ext == "svg" or Image is None:
+        # vektor (nebo chybí Pillow) – bez variant, jen hashované jméno
+        fname = f"{digest}.{ext}"
+        _save_atomic(os.path.join(upload_dir, fname), raw)
+        return fname
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        if img.width * img.height > MAX_SOURCE_PIXELS:
+            return None
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA")
+    except Exception:
+        return None
+
+    def _resized(size: int):
+        out = img.copy()
+        out.thumbnail((size, size), Image.LANCZOS)  # zachová poměr stran, nezvětšuje
+        return out
+
+    for size in LOGO_SIZES:
+        buf = io.BytesIO()
+        _resized(size).save(buf, format="WEBP", quality=85, method=6)
+        _save_atomic(os.path.join(upload_dir, _variant_name(digest, size, "webp")), buf.getvalue())
+
+    buf = io.BytesIO()
+    _resized(FALLBACK_SIZE).save(buf, format="PNG", optimize=True)
+    fallback = _variant_name(digest, FALLBACK_SIZE, "png")
+    _save_atomic(os.path.join(upload_dir, fallback), buf.getvalue())
+    return fallback
+
+
+def logo_files(logo_path: Optional[str]) -> List[str]:
+    """Všechny soubory loga (hlavní + WebP varianty)."""
+    if not logo_path:
+        return []
+    return [os.path.basename(logo_path)] + [n for n, _ in logo_variants(logo_path)]
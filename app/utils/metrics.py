@@ -0,0 +1,359 @@
+# app/utils/metrics.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus metriky (`GET /metrics`), sčítané přes všechny gunicorn workery.
+#
+# prometheus_client běží v multiprocess režimu: každý proces zapisuje
+# hodnoty do vlastních mmap souborů v METRICS_DIR, scrape je sečte
+# (MultiProcessCollector). Režim se volí při importu prometheus_client –
+# proto se importuje až v `init_app`, po nastavení PROMETHEUS_MULTIPROC_DIR.
+# Úklid adresáře při startu a souborů mrtvých workerů řeší gunicorn.conf.py;
+# bez gunicornu (flask run, uvicorn asgi:app) smaže init_app při startu
+# soubory procesů, které už neběží – jinak by se minulé běhy přičítaly.
+#
+#   reporty_http_request_duration_seconds{endpoint,method,status}   histogram
+#   reporty_db_query_duration_seconds{op}                           histogram (počet = _count)
+#   reporty_report_parse_seconds{parser} + _parsed_bytes_total      parsování reportů
+#   reporty_upload_bytes{kind} + reporty_upload_seconds{kind}       velikost a propustnost uploadů
+#   reporty_cache_requests_total{cache,result} + _cache_hit_ratio   cache (index, sidecar, archivy, S3, parse_flight)
+#   reporty_storage_bytes/_files{dir}                                vzorkuje jeden proces na pozadí
+#   reporty_sqlite_db_bytes / reporty_sqlite_wal_bytes               při scrapu
+#
+# Bez balíčku prometheus_client jsou všechny observe_* no-op a /metrics vrací 503.
+
+_lock = threading.Lock()
+_m: Optional[SimpleNamespace] = None   # metriky (jednou na proces)
+_sql_hooked = False
+
+SAMPLER_LOCK = "metrics-sampler.lock"
+_SQL_OPS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+_BYTES_BUCKETS = (1 << 10, 10 << 10, 100 << 10, 1 << 20, 5 << 20, 10 << 20, 50 << 20, 100 << 20, 500 << 20)
+_PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_SQL_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5)
+
+
+def _create() -> Optional[SimpleNamespace]:
+    try:
+        from prometheus_client import Counter, Gauge, Histogram
+    except ImportError:  # pragma: no cover
+        return None
+    return SimpleNamespace(
+        http=Histogram("reporty_http_request_duration_seconds", "Délka obsluhy požadavku.",
+                       ("endpoint", "method", "status")),
+        sql=Histogram("reporty_db_query_duration_seconds", "Délka SQL dotazu.", ("op",),
+                      buckets=_SQL_BUCKETS),
+        parse=Histogram("reporty_report_parse_seconds", "Parsování reportu.", ("parser",),
+                        buckets=_PARSE_BUCKETS),
+        parsed_bytes=Counter("reporty_report_parsed_bytes", "Rozparsované bajty reportů.", ("parser",)),
+        upload_bytes=Histogram("reporty_upload_bytes", "Velikost nahraného souboru.", ("kind",),
+                               buckets=_BYTES_BUCKETS),
+        upload_seconds=Histogram("reporty_upload_seconds", "Příjem a uložení uploadu.", ("kind",)),
+        cache=Counter("reporty_cache_requests", "Dotazy na cache.", ("cache", "result")),
+        storage_bytes=Gauge("reporty_storage_bytes", "Velikost adresáře úložiště.", ("dir",),
+                            multiprocess_mode="mostrecent"),
+        storage_files=Gauge("reporty_storage_files", "Počet souborů v adresáři úložiště.", ("dir",),
+                            multiprocess_mode="mostrecent"),
+    )
+
+
+# ---------- měření (volají moduly aplikace) ----------
+
+def observe_parse(parser: str, abs_path: str, seconds: float) -> None:
+    if _m is None:
+        return
+    _m.parse.labels(parser).observe(seconds)
+    try:
+        _m.parsed_bytes.labels(parser).inc(os.path.getsize(abs_path))
+    except OSError:
+        pass
+
+
+def observe_upload(kind: str, size: int) -> None:
+    """Po uložení uploadu – čas od začátku požadavku (příjem těla + zápis)."""
+    if _m is None:
+        return
+    _m.upload_bytes.labels(kind).observe(size)
+    t0 = g.get("_metrics_t0")
+    if t0 is not None:
+        _m.upload_seconds.labels(kind).observe(time.perf_counter() - t0)
+
+
+def cache_event(cache: str, hit: bool) -> None:
+    if _m is not None:
+        _m.cache.labels(cache, "hit" if hit else "miss").inc()
+
+
+# ---------- požadavky a SQL ----------
+
+def _before_request():
+    g._metrics_t0 = time.perf_counter()
+
+
+def _observe_request(status) -> None:
+    t0 = g.pop("_metrics_t0", None)
+    if t0 is None or _m is None:
+        return
+    # endpoint, ne URL – 404 na libovolné cestě nesmí rozbít kardinalitu
+    _m.http.labels(request.endpoint or "unmatched", request.method, str(status)).observe(
+        time.perf_counter() - t0)
+
+
+def _after_request(resp):
+    _observe_request(resp.status_code)
+    return resp
+
+
+def _teardown_request(exc):
+    if exc is not None:
+        _observe_request(500)  # after_request se při výjimce nevolá
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get("_metrics_t0")
+    if not stack:
+        return
+    elapsed = time.perf_counter() - stack.pop()
+    if _m is not None:
+        op = statement.lstrip()[:6].upper()
+        _m.sql.labels(op if op in _SQL_OPS else "OTHER").observe(elapsed)
+
+
+# ---------- velikosti úložiště (na pozadí, jeden proces) ----------
+
+def dir_usage(path: str) -> Tuple[int, int]:
+    """(bajty, soubory) stromu – scandir bez následování symlinků."""
+    total = files = 0
+    stack = [path]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.is_file(follow_symlinks=False):
+                        total += e.stat(follow_symlinks=False).st_size
+                        files += 1
+                except OSError:
+                    continue
+    return total, files
+
+
+def storage_dirs(config) -> Dict[str, str]:
+    return {"reports": config["REPORTS_DIR"], "pdfs": config["PDFS_DIR"], "logos": config["UPLOAD_DIR"]}
+
+
+def sample_storage(config) -> Dict[str, Tuple[int, int]]:
+    out = {}
+    for name, path in storage_dirs(config).items():
+        out[name] = dir_usage(path)
+        if _m is not None:
+            _m.storage_bytes.labels(name).set(out[name][0])
+            _m.storage_files.labels(name).set(out[name][1])
+    return out
+
+
+class StorageSampler:
+    """
+    Vzorkování velikostí adresářů ve vlákně. Procházet 500k souborů v každém
+    workeru by bylo zbytečné – vzorkuje jen proces, který drží zámek
+    `METRICS_DIR/metrics-sampler.lock` (drží ho, dokud žije; pak ho převezme jiný).
+    """
+
+    def __init__(self, app, interval: float, lock_dir: str):
+        self.app = app
+        self.interval = interval
+        self.lock_path = os.path.join(lock_dir, SAMPLER_LOCK)
+        self._fh = None
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+
+    def start(self) -> "StorageSampler":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _try_lock(self) -> bool:
+        if self._fh is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:  # Windows – bez koordinace
+            self._fh = open(self.lock_path, "a")
+            return True
+        fh = open(self.lock_path, "a")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        self._fh = fh
+        return True
+
+    def _run(self) -> None:
+        wait = 0.0  # první vzorek hned po startu
+        while not self._stop.wait(wait):
+            wait = self.interval
+            if not self._try_lock():
+                continue
+            try:
+                sample_storage(self.app.config)
+            except Exception as e:
+                self.app.logger.warning("Vzorkování úložiště selhalo: %s", e)
+
+
+# ---------- scrape ----------
+
+def _sqlite_path(app) -> Optional[str]:
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI", "")
+    return uri[len("sqlite:///"):] if uri.startswith("sqlite:///") else None
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _derived_families(app, families: List) -> List:
+    from prometheus_client.core import GaugeMetricFamily
+
+    out = []
+    hits: Dict[str, List[float]] = {}
+    for fam in families:
+        if fam.name != "reporty_cache_requests":
+            continue
+        for s in fam.samples:
+            if s.name.endswith("_total"):
+                pair = hits.setdefault(s.labels["cache"], [0.0, 0.0])
+                pair[0 if s.labels["result"] == "hit" else 1] += s.value
+    ratio = GaugeMetricFamily("reporty_cache_hit_ratio", "Podíl zásahů cache (od startu).",
+                              labels=("cache",))
+    for cache, (hit, miss) in sorted(hits.items()):
+        if hit + miss:
+            ratio.add_metric((cache,), hit / (hit + miss))
+    out.append(ratio)
+
+    db_path = _sqlite_path(app)
+    if db_path:
+        out.append(GaugeMetricFamily("reporty_sqlite_db_bytes", "Velikost SQLite databáze.",
+                                     value=_file_size(db_path)))
+        out.append(GaugeMetricFamily("reporty_sqlite_wal_bytes", "Velikost WAL (necheckpointováno).",
+                                     value=_file_size(db_path + "-wal")))
+    return out
+
+
+class _Families:
+    """Kolektor nad už posbíranými rodinami (jeden průchod souborů procesů)."""
+
+    def __init__(self, families: List):
+        self.families = families
+
+    def collect(self):
+        return iter(self.families)
+
+
+def render_metrics(app) -> Tuple[bytes, str]:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+    from prometheus_client.multiprocess import MultiProcessCollector
+
+    families = list(MultiProcessCollector(None).collect())
+    registry = CollectorRegistry(auto_describe=False)
+    registry.register(_Families(families + _derived_families(app, families)))
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def metrics_view():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        import hmac
+        auth = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(auth, f"Bearer {token}"):
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+    if _m is None:
+        return Response("prometheus_client není nainstalovaný\n", status=503, mimetype="text/plain")
+    body, ctype = render_metrics(current_app._get_current_object())
+    resp = Response(body, mimetype=None, content_type=ctype)
+    resp.cache_control.no_store = True
+    return resp
+
+
+# ---------- registrace ----------
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # běží, jen patří jinému uživateli
+        return True
+    return True
+
+
+def sweep_dead_processes(metrics_dir: str) -> int:
+    """Smaže soubory procesů, které už neběží (`<typ>_<pid>.db`); vrací počet."""
+    removed = 0
+    try:
+        entries = list(os.scandir(metrics_dir))
+    except OSError:
+        return 0
+    for e in entries:
+        stem, ext = os.path.splitext(e.name)
+        pid = stem.rsplit("_", 1)[-1]
+        if ext != ".db" or not pid.isdigit() or _pid_alive(int(pid)):
+            continue
+        try:
+            os.remove(e.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def init_app(app) -> None:
+    """Hooky požadavků, SQL události, /metrics a vzorkování úložiště."""
+    global _m, _sql_hooked
+    metrics_dir = app.config["METRICS_DIR"]
+    os.makedirs(metrics_dir, exist_ok=True)
+    # nastavené dřív (gunicorn.conf.py, prostředí) má přednost – adresář pak
+    # spravuje ten, kdo ho nastavil; jinak ho uklízíme sami (souběžně běžící
+    # procesy, např. uvicorn --workers, zůstanou)
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        sweep_dead_processes(metrics_dir)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+    with _lock:
+        if _m is None:
+            _m = _create()
+        if not _sql_hooked:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            _sql_hooked = True
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
+
+    interval = app.config.get("METRICS_STORAGE_INTERVAL", 0)
+    if _m is not None and interval > 0 and not app.testing:
+        app.extensions["metrics_sampler"] = StorageSampler(app, interval, metrics_dir).start()
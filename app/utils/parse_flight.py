@@ -0,0 +1,151 @@
+# app/utils/parse_flight.py
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from app.utils.metrics import cache_event
+from app.utils.report_columns import ColumnarReport
+from app.utils.report_sidecar import SUFFIX, open_sidecar, write_sidecar
+
+# Single-flight parsování reportů bez čerstvého sidecaru – když odkaz na
+# spadlý běh otevře naráz spousta lidí, parsuje se soubor jen jednou:
+#
+#   v procesu  – první vlákno (leader) parsuje, ostatní čekají na jeho
+#                Event a dostanou stejný ColumnarReport (je jen ke čtení),
+#   mezi procesy – leader drží flock `<PARSE_CACHE_DIR>/<klíč>.lock`
+#                a výsledek uloží jako sidecar `<klíč>.rcol`; leadeři
+#                ostatních workerů počkají na zámek a výsledek jen
+#                namapují (čerstvost = velikost a mtime zdroje jako u sidecaru).
+#
+# Malé soubory (< PARSE_SHARE_MIN_BYTES) a členy archivů se koordinují jen
+# v procesu – parse je levnější než zápis a čtení sdíleného výsledku.
+# Staré výsledky a zámky se mažou po PARSE_CACHE_TTL.
+
+LOCK_SUFFIX = ".lock"
+_LOCK_POLL = 0.02
+_PRUNE_EVERY = 60.0
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[ColumnarReport] = None
+        self.error: Optional[BaseException] = None
+
+
+class ParseFlight:
+    def __init__(self, cache_dir: str, wait_timeout: float = 60.0, ttl: float = 600.0,
+                 min_bytes: int = 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.wait_timeout = wait_timeout
+        self.ttl = ttl
+        self.min_bytes = min_bytes
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._pruned = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def load(self, abs_path: str, parse: Callable[[str], ColumnarReport]) -> ColumnarReport:
+        """`parse(abs_path)`, ale souběžná volání na stejný soubor sdílí jeden výsledek."""
+        key = os.path.abspath(abs_path)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            cache_event("parse_flight", True)
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = self._load_shared(key, parse)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        name = os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest())
+        return name + SUFFIX, name + LOCK_SUFFIX
+
+    def _load_shared(self, abs_path: str, parse: Callable[[str], ColumnarReport]) -> ColumnarReport:
+        try:
+            st = os.stat(abs_path)
+        except OSError:  # člen archivu / chybějící soubor – parser rozhodne
+            st = None
+        if st is None or st.st_size < self.min_bytes:
+            cache_event("parse_flight", False)
+            return parse(abs_path)
+
+        spill, lock_path = self._paths(abs_path)
+        rep = open_sidecar(abs_path, spill)
+        if rep is None:
+            fh = self._acquire(lock_path)
+            try:
+                # mezitím mohl parsovat jiný worker
+                rep = open_sidecar(abs_path, spill)
+                if rep is None:
+                    cache_event("parse_flight", False)
+                    st = os.stat(abs_path)
+                    rep = parse(abs_path)
+                    try:
+                        write_sidecar(abs_path, rep, target=spill, st=st)
+                    except OSError:
+                        pass
+                    self._prune()
+                    return rep
+            finally:
+                if fh is not None:
+                    fh.close()
+        cache_event("parse_flight", True)
+        return rep
+
+    def _acquire(self, lock_path: str):
+        """flock s timeoutem; None = bez koordinace (Windows, timeout, chyba)."""
+        try:
+            import fcntl
+        except ImportError:
+            return None
+        try:
+            fh = open(lock_path, "a")
+        except OSError:
+            return None
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                os.utime(lock_path)  # mtime = poslední použití (pro úklid)
+                return fh
+            except OSError:
+                if time.monotonic() >= deadline:
+                    fh.close()
+                    return None
+                time.sleep(_LOCK_POLL)
+
+    def _prune(self) -> None:
+        now = time.time()
+        if now - self._pruned < _PRUNE_EVERY:
+            return
+        self._pruned = now
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for e in entries:
+            try:
+                if now - e.stat().st_mtime > self.ttl:
+                    os.remove(e.path)
+            except OSError:
+                pass
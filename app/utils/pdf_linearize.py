@@ -0,0 +1,56 @@
+# app/utils/pdf_linearize.py
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+# Linearizované ("Fast Web View") PDF má objekty první stránky na začátku
+# souboru + hint tabulky, takže viewer s Range requesty ukáže stranu 1
+# dřív, než stáhne zbytek. Používáme pikepdf, případně CLI qpdf.
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+
+def is_linearized(abs_path: str) -> bool:
+    """Linearizační slovník musí být první objekt v souboru (prvních ~1 kB)."""
+    try:
+        with open(abs_path, "rb") as f:
+            head = f.read(1024)
+    except OSError:
+        return False
+    return b"/Linearized" in head
+
+
+def linearize_available() -> bool:
+    return pikepdf is not None or shutil.which("qpdf") is not None
+
+
+def linearize_pdf(abs_path: str) -> bool:
+    """
+    Přepíše PDF na linearizovanou verzi (atomicky přes dočasný soubor).
+    Vrátí True, pokud se soubor změnil; při chybě nechá originál beze změny.
+    """
+    if is_linearized(abs_path) or not linearize_available():
+        return False
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(abs_path), prefix=".lin-", suffix=".pdf")
+    os.close(fd)
+    try:
+        if pikepdf is not None:
+            with pikepdf.open(abs_path) as pdf:
+                pdf.save(tmp, linearize=True)
+        else:
+            res = subprocess.run([shutil.which("qpdf"), "--linearize", abs_path, tmp],
+                                 capture_output=True, timeout=300)
+            # qpdf: 0 = OK, 3 = OK s varováními
+            if res.returncode not in (0, 3):
+                raise RuntimeError(res.stderr.decode("utf-8", "replace").strip())
+        os.replace(tmp, abs_path)
+        return True
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,238 @@
+# app/utils/pdf_preview.py
+from __future__ import annotations
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+# Volitelné závislosti – bez nich pipeline jen přeskočí danou část.
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+
+THUMB_SUFFIX = ".thumb.png"
+META_SUFFIX = ".meta.json"
+THUMB_WIDTH = 240
+SNIPPET_CHARS = 280
+
+# jeden worker – generování je CPU/IO náročné a nechceme zahltit web proces
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-preview")
+
+
+def thumb_path(abs_pdf: str) -> str:
+    return abs_pdf + THUMB_SUFFIX
+
+
+def meta_path(abs_pdf: str) -> str:
+    return abs_pdf + META_SUFFIX
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# ---------- Render první stránky (poppler -> PyMuPDF -> první obrázek -> zástupný) ----------
+
+def _thumb_pdftoppm(abs_pdf: str) -> Optional[bytes]:
+    exe = shutil.which("pdftoppm")
+    if not exe:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "thumb")
+        subprocess.run(
+            [exe, "-png", "-f", "1", "-l", "1", "-singlefile",
+             "-scale-to-x", str(THUMB_WIDTH), "-scale-to-y", "-1", abs_pdf, out],
+            check=True, capture_output=True, timeout=60,
+        )
+        with open(out + ".png", "rb") as f:
+            return f.read()
+
+
+def _thumb_pymupdf(abs_pdf: str) -> Optional[bytes]:
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return None
+    with fitz.open(abs_pdf) as doc:
+        if not doc.page_count:
+            return None
+        page = doc[0]
+        zoom = THUMB_WIDTH / max(page.rect.width, 1)
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes("png")
+
+
+def _thumb_first_image(reader) -> Optional[bytes]:
+    """Fallback bez rendereru: zmenšený první obrázek z první stránky."""
+    if Image is None or reader is None or not reader.pages:
+        return None
+    images = reader.pages[0].images
+    if not images:
+        return None
+    img = Image.open(io.BytesIO(images[0].data))
+    img.thumbnail((THUMB_WIDTH, THUMB_WIDTH * 2))
+    buf = io.BytesIO()
+    img.convert("RGB").save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _page_ratio(reader) -> float:
+    try:
+        box = reader.pages[0].mediabox
+        return float(box.height) / float(box.width)
+    except Exception:
+        return 297 / 210  # A4
+
+
+def _thumb_placeholder(reader, meta: dict) -> Optional[bytes]:
+    """
+    Bez rendereru (pdftoppm / PyMuPDF) a bez obrázku na první stránce:
+    zástupná "stránka" s počtem stran a úryvkem textu (jen Pillow).
+    """
+    if Image is None:
+        return None
+    ratio = _page_ratio(reader) if reader is not None and reader.pages else 297 / 210
+    height = min(int(THUMB_WIDTH * ratio), THUMB_WIDTH * 2)
+    img = Image.new("RGB", (THUMB_WIDTH, height), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, THUMB_WIDTH - 1, height - 1), outline=(200, 200, 200))
+    font = ImageFont.load_default()
+    pages = meta.get("pages")
+    draw.text((12, 10), f"PDF · {pages} str." if pages else "PDF", fill=(200, 40, 40), font=font)
+    y, line = 34, ""
+    for word in (meta.get("snippet") or "").split():
+        cand = f"{line} {word}".strip()
+        if draw.textlength(cand, font=font) <= THUMB_WIDTH - 24:
+            line = cand
+            continue
+        draw.text((12, y), line, fill=(90, 90, 90), font=font)
+        y, line = y + 14, word
+        if y > height - 20:
+            line = ""
+            break
+    if line:
+        draw.text((12, y), line, fill=(90, 90, 90), font=font)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def generate_pdf_preview(abs_pdf: str, force: bool = False) -> Optional[dict]:
+    """
+    Vygeneruje vedle PDF `<pdf>.thumb.png` a `<pdf>.meta.json`
+    (počet stran, úryvek textu). Vrátí metadata nebo None, pokud PDF neexistuje.
+    """
+    if not os.path.isfile(abs_pdf):
+        return None
+    if not force:
+        existing = load_pdf_preview(abs_pdf)
+        if existing is not None:
+            return existing
+
+    meta = {"pages": None, "snippet": None, "thumb": False,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+
+    reader = None
+    if PdfReader is not None:
+        try:
+            reader = PdfReader(abs_pdf)
+            meta["pages"] = len(reader.pages)
+            if reader.pages:
+                text = " ".join((reader.pages[0].extract_text() or "").split())
+                meta["snippet"] = text[:SNIPPET_CHARS] or None
+        except Exception:
+            reader = None
+
+    png = None
+    for render in (_thumb_pdftoppm, _thumb_pymupdf):
+        try:
+            png = render(abs_pdf)
+        except Exception:
+            png = None
+        if png:
+            break
+    if not png:
+        try:
+            png = _thumb_first_image(reader)
+        except Exception:
+            png = None
+    if not png:
+        # textové / vektorové PDF bez rendereru – aspoň zástupný náhled
+        try:
+            png = _thumb_placeholder(reader, meta)
+            meta["placeholder"] = bool(png)
+        except Exception:
+            png = None
+
+    if png:
+        _write_atomic(thumb_path(abs_pdf), png)
+        meta["thumb"] = True
+    _write_atomic(meta_path(abs_pdf), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    return meta
+
+
+def submit_pdf_preview(abs_pdf: str, logger=None, on_done=None) -> None:
+    """
+    Naplánuje generování náhledu na pozadí (upload na to nečeká).
+    `on_done(meta)` se zavolá po zapsání souborů (např. publikace do úložiště).
+    """
+    def _job():
+        try:
+            meta = generate_pdf_preview(abs_pdf, force=True)
+            if on_done is not None and meta is not None:
+                on_done(meta)
+        except Exception as e:
+            if logger is not None:
+                logger.warning("PDF preview failed for %s: %s", abs_pdf, e)
+    _executor.submit(_job)
+
+
+def _read_meta(path: Optional[str]) -> Optional[dict]:
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def load_pdf_preview(abs_pdf: str) -> Optional[dict]:
+    return _read_meta(meta_path(abs_pdf))
+
+
+def load_pdf_previews(pdfs, store) -> dict:
+    """
+    Metadata náhledů pro seznam PdfReport (klíč = id), bez čtení samotných PDF.
+    `store` = backend úložiště PDF (u S3 se .meta.json stáhne do lokální cache).
+    """
+    return {d.id: _read_meta(store.local_path(meta_path(d.pdf_path))) for d in pdfs}
+
+
+def remove_pdf_preview(abs_pdf: str) -> None:
+    for p in (thumb_path(abs_pdf), meta_path(abs_pdf)):
+        try:
+            os.remove(p)
+        except OSError:
+            pass
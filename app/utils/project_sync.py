@@ -0,0 +1,326 @@
+# app/utils/project_sync.py
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+
+from app import db
+from app.models.project_model import Project, ProjectType, Visibility
+from app.models.suite_model import Suite
+from app.utils.slugs import save_with_unique_slugs
+
+try:  # volitelné – bez PyYAML jde jen JSON
+    import yaml
+except ImportError:  # pragma: no cover
+    yaml = None
+
+# Deklarativní strom projektů → DB (`flask reports sync <soubor>`).
+#
+#   projects:
+#     - name: dokladujto
+#       type: e2e                # e2e | web
+#       visibility: public       # private | link-only | public
+#       description: …
+#       sections:                # (nebo "children" jako SEED v create_project.py)
+#         - name: DMS
+#           description: …       # (nebo "desc")
+#           order: 10            # bez = pořadí v souboru × 10
+#           active: true
+#           sequences:
+#             - name: Set1
+#
+# Projekty a sady se párují podle `slug` (je-li v souboru), jinak podle
+# jména; slug sady ze souboru se uloží (u spárované podle jména se změní). Diff se počítá v paměti z jednoho načtení (projekty + jejich sady),
+# změny se provedou v jedné transakci: nové řádky hromadně (slugy jedním
+# průchodem), úpravy / pořadí / deaktivace jedním bulk UPDATE.
+#
+# Sady synchronizovaného projektu, které v souboru nejsou, se deaktivují
+# (is_active=False) – běhy a reporty zůstanou. Projekty mimo soubor se nemění.
+
+class SyncError(ValueError):
+    """Neplatný soubor – hláška pro uživatele."""
+
+
+@dataclass
+class SuiteSpec:
+    name: str
+    description: Optional[str]
+    order_index: int
+    is_active: bool
+    slug: Optional[str] = None
+    children: List["SuiteSpec"] = field(default_factory=list)
+
+
+@dataclass
+class ProjectSpec:
+    name: str
+    type: ProjectType
+    visibility: Visibility
+    description: Optional[str]
+    slug: Optional[str] = None
+    sections: List[SuiteSpec] = field(default_factory=list)
+
+
+@dataclass
+class SyncPlan:
+    new_projects: List[Project] = field(default_factory=list)
+    # (nová sada, její projekt, rodič) – FK se doplní po vložení vyšší úrovně
+    new_suites: List[Tuple[Suite, Project, Optional[Suite]]] = field(default_factory=list)
+    project_updates: List[dict] = field(default_factory=list)
+    suite_updates: List[dict] = field(default_factory=list)
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.new_projects or self.new_suites or self.project_updates or self.suite_updates)
+
+    def summary(self) -> str:
+        deact = sum(1 for u in self.suite_updates if u.get("is_active") is False)
+        return (f"projekty: +{len(self.new_projects)} ~{len(self.project_updates)}, "
+                f"sady: +{len(self.new_suites)} ~{len(self.suite_updates) - deact} -{deact}")
+
+
+# ---------- načtení souboru ----------
+
+def load_tree(path: str) -> List[ProjectSpec]:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        if yaml is None:
+            raise SyncError("YAML vyžaduje balíček PyYAML (nebo použij JSON).")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise SyncError(f"Neplatný YAML: {e}") from e
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise SyncError(f"Neplatný JSON: {e}") from e
+    return parse_tree(data)
+
+
+def _enum(cls, value, default, where: str):
+    if value is None:
+        return default
+    try:
+        return cls(str(value))
+    except ValueError:
+        allowed = ", ".join(m.value for m in cls)
+        raise SyncError(f"{where}: neplatná hodnota '{value}' (povoleno: {allowed}).") from None
+
+
+def _int(value, where: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise SyncError(f"{where}: očekávám celé číslo, ne '{value}'.") from None
+
+
+def _suites(items, where: str, depth: int) -> List[SuiteSpec]:
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        raise SyncError(f"{where}: očekávám seznam sad.")
+    out, seen = [], set()
+    for i, raw in enumerate(items):
+        if isinstance(raw, str):
+            raw = {"name": raw}
+        if not isinstance(raw, dict):
+            raise SyncError(f"{where}[{i}]: očekávám jméno nebo objekt sady.")
+        name = str(raw.get("name") or "").strip()
+        if not name:
+            raise SyncError(f"{where}[{i}]: chybí name.")
+        slug = str(raw.get("slug") or "").strip() or None
+        key = slug or name
+        if key in seen:
+            raise SyncError(f"{where}: sada '{name}' je uvedená dvakrát.")
+        seen.add(key)
+        kids = raw.get("sequences", raw.get("children"))
+        if depth > 0 and kids:
+            raise SyncError(f"{where}/{name}: sekvence nemůže mít další úroveň.")
+        out.append(SuiteSpec(
+            name=name,
+            description=(raw.get("description", raw.get("desc")) or None),
+            order_index=_int(raw.get("order", raw.get("order_index", (i + 1) * 10)), f"{where}/{name}: order"),
+            is_active=bool(raw.get("active", raw.get("is_active", True))),
+            slug=slug,
+            children=_suites(kids, f"{where}/{name}", depth + 1) if depth == 0 else [],
+        ))
+    return out
+
+
+def parse_tree(data) -> List[ProjectSpec]:
+    items = data.get("projects") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise SyncError("Soubor musí obsahovat seznam 'projects'.")
+    out, seen = [], set()
+    for i, raw in enumerate(items):
+        if not isinstance(raw, dict):
+            raise SyncError(f"projects[{i}]: očekávám objekt projektu.")
+        name = str(raw.get("name") or "").strip()
+        if not name:
+            raise SyncError(f"projects[{i}]: chybí name.")
+        if name in seen:
+            raise SyncError(f"Projekt '{name}' je uvedený dvakrát.")
+        seen.add(name)
+        out.append(ProjectSpec(
+            name=name,
+            type=_enum(ProjectType, raw.get("type"), ProjectType.e2e, name),
+            visibility=_enum(Visibility, raw.get("visibility"), Visibility.private, name),
+            description=raw.get("description") or None,
+            slug=str(raw.get("slug") or "").strip() or None,
+            sections=_suites(raw.get("sections", raw.get("children")), name, 0),
+        ))
+    return out
+
+
+# ---------- diff ----------
+
+def _fmt(v) -> str:
+    v = getattr(v, "value", v)
+    if isinstance(v, str) and len(v) > 40:
+        v = v[:37] + "…"
+    return repr(v)
+
+
+def _changes(obj, wanted: dict) -> dict:
+    return {k: v for k, v in wanted.items() if getattr(obj, k) != v}
+
+
+def plan_sync(specs: List[ProjectSpec]) -> SyncPlan:
+    """Diff souboru proti DB – dva dotazy (projekty, sady dotčených projektů), zbytek v paměti."""
+    plan = SyncPlan()
+    projects = Project.query.all()
+    by_slug = {p.slug: p for p in projects}
+    by_name = {p.name: p for p in projects}
+    matched = {}
+    for spec in specs:
+        p = by_slug.get(spec.slug) if spec.slug else None
+        matched[spec.name] = p or by_name.get(spec.name)
+
+    suites_by_project: Dict[int, List[Suite]] = {}
+    ids = [p.id for p in matched.values() if p is not None]
+    if ids:
+        for s in Suite.query.filter(Suite.project_id.in_(ids)).order_by(Suite.id):
+            suites_by_project.setdefault(s.project_id, []).append(s)
+
+    for spec in specs:
+        p = matched[spec.name]
+        wanted = {"type": spec.type, "visibility": spec.visibility, "description": spec.description}
+        if p is None:
+            p = Project(name=spec.name, slug=spec.slug, **wanted)
+            plan.new_projects.append(p)
+            plan.lines.append(f"+ projekt {spec.name}")
+            existing: List[Suite] = []
+        else:
+            diff = _changes(p, wanted)
+            if p.name != spec.name:
+                diff["name"] = spec.name
+            if diff:
+                plan.project_updates.append({"id": p.id, **diff})
+                plan.lines.append(f"~ projekt {p.slug}: " + ", ".join(
+                    f"{k} {_fmt(getattr(p, k))} → {_fmt(v)}" for k, v in diff.items()))
+            existing = suites_by_project.get(p.id, [])
+        _plan_suites(plan, p, spec, existing)
+    return plan
+
+
+def _plan_suites(plan: SyncPlan, project: Project, spec: ProjectSpec, existing: List[Suite]) -> None:
+    label = project.slug or spec.name
+    children: Dict[Optional[int], List[Suite]] = {}
+    for s in existing:
+        children.setdefault(s.parent_id, []).append(s)
+    kept = set()
+
+    def _match(pool: List[Suite], ss: SuiteSpec) -> Optional[Suite]:
+        # podle slugu ze souboru, jinak (i když slug v DB zatím jiný) podle jména
+        free = [s for s in pool if s.id not in kept]
+        if ss.slug:
+            found = next((s for s in free if s.slug == ss.slug), None)
+            if found is not None:
+                return found
+        return next((s for s in free if s.name == ss.name), None)
+
+    def _sync(ss: SuiteSpec, parent: Optional[Suite], where: str) -> Suite:
+        # nová sekce (ještě bez id) nemá v DB žádné děti
+        s = _match(children.get(parent.id if parent is not None else None, []), ss) \
+            if parent is None or parent.id else None
+        wanted = {"name": ss.name, "description": ss.description,
+                  "order_index": ss.order_index, "is_active": ss.is_active}
+        if s is None:
+            # jen FK, žádné vztahy: cascade by objekt předčasně vložil do session
+            # a self-referenční vztah by unit of work vkládal po jednom řádku
+            s = Suite(slug=ss.slug, project_id=project.id,
+                      parent_id=parent.id if parent is not None else None, **wanted)
+            plan.new_suites.append((s, project, parent))
+            plan.lines.append(f"+ {where}{ss.name}")
+            return s
+        kept.add(s.id)
+        if ss.slug and s.slug != ss.slug:
+            pool = children.get(s.parent_id, [])
+            if any(o.slug == ss.slug for o in pool if o.id != s.id):
+                raise SyncError(f"{where}{ss.name}: slug '{ss.slug}' už má jiná sada.")
+            wanted["slug"] = ss.slug
+        diff = _changes(s, wanted)
+        if diff:
+            plan.suite_updates.append({"id": s.id, **diff})
+            kind = "pořadí" if set(diff) == {"order_index"} else "úprava"
+            plan.lines.append(f"~ {where}{s.name} ({kind}): " + ", ".join(
+                f"{k} {_fmt(getattr(s, k))} → {_fmt(v)}" for k, v in diff.items()))
+        return s
+
+    for sec_spec in spec.sections:
+        section = _sync(sec_spec, None, f"{label} / ")
+        for seq_spec in sec_spec.children:
+            _sync(seq_spec, section, f"{label} / {sec_spec.name} / ")
+
+    by_id = {s.id: s for s in existing}
+    for s in existing:
+        if s.id in kept or not s.is_active:
+            continue
+        parent = by_id.get(s.parent_id)
+        plan.suite_updates.append({"id": s.id, "is_active": False})
+        where = f"{label} / " + (f"{parent.name} / " if parent is not None else "")
+        plan.lines.append(f"- {where}{s.name} (deaktivace)")
+
+
+# ---------- provedení ----------
+
+def apply_sync(plan: SyncPlan) -> None:
+    """Provede plán v jedné transakci (commit na konci, při chybě rollback)."""
+    try:
+        # nové řádky po úrovních (projekty → sekce → sekvence): každá úroveň
+        # = slugy jedním průchodem + jeden hromadný INSERT; pak bulk UPDATE podle PK
+        if plan.new_projects:
+            save_with_unique_slugs(plan.new_projects, bulk=True)
+        for level in (False, True):
+            batch = []
+            for s, project, parent in plan.new_suites:
+                if (parent is not None) == level:
+                    s.project_id = project.id
+                    s.parent_id = parent.id if parent is not None else None
+                    batch.append(s)
+            if batch:
+                save_with_unique_slugs(batch, bulk=True)
+        if plan.project_updates:
+            db.session.execute(update(Project), plan.project_updates)
+        if plan.suite_updates:
+            db.session.execute(update(Suite), plan.suite_updates)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def sync_file(path: str, dry_run: bool = False) -> Tuple[SyncPlan, bool]:
+    """Načte soubor, spočítá diff a (bez `dry_run`) ho provede. Vrací (plán, provedeno)."""
+    plan = plan_sync(load_tree(path))
+    if dry_run or plan.empty:
+        return plan, False
+    apply_sync(plan)
+    return plan, True
@@ -0,0 +1,344 @@
+# app/utils/report_archive.py
+from __future__ import annotations
+
+import io
+import json
+import mimetypes
+import os
+import tarfile
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.utils.metrics import cache_event
+
+# Studené úložiště: staré reporty jedné sady za jeden měsíc se sbalí do
+# jednoho nekomprimovaného taru vedle sady:
+#
+#   <project>/<suite>/_archive/2025-09.tar        členy = původní soubory + jejich .rcol sidecary
+#   <project>/<suite>/_archive/2025-09.tar.idx    JSON index: člen → offset dat, velikost, mtime
+#
+# Run.csv_path pak ukazuje "dovnitř" archivu:
+#   <project>/<suite>/_archive/2025-09.tar/<soubor.csv>
+# Cesta zůstává pod adresářem projektu (kontrola přístupu přes storage
+# index funguje beze změny) a čtení člena = seek na offset z indexu –
+# nic se nerozbaluje. Sidecar člena se mmapuje přímo z taru.
+#
+# Z taru se nemaže: smazaný člen jen zmizí z indexu; prázdný archiv
+# (bez členů v indexu) se smaže celý.
+
+ARCHIVE_DIR = "_archive"
+ARCHIVE_EXT = ".tar"
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+_CACHE_SIZE = 256
+
+_lock = threading.Lock()
+_index_cache: "OrderedDict[str, Tuple[int, dict]]" = OrderedDict()
+
+
+# ---------- cesty ----------
+
+def archive_ref(archive_rel: str, member: str) -> str:
+    """Relativní odkaz na člen archivu (hodnota Run.csv_path)."""
+    return f"{archive_rel}/{member}"
+
+
+def archive_rel_for(rel_dir: str, when: datetime) -> str:
+    """'<project>/<suite>' + datum běhu → '<project>/<suite>/_archive/YYYY-MM.tar'."""
+    return f"{rel_dir.strip('/')}/{ARCHIVE_DIR}/{when:%Y-%m}{ARCHIVE_EXT}"
+
+
+def split_archive_path(path: str) -> Optional[Tuple[str, str]]:
+    """
+    '…/_archive/2025-09.tar/x.csv' → ('…/_archive/2025-09.tar', 'x.csv').
+    Funguje pro relativní i absolutní cesty; jinak None.
+    """
+    norm = path.replace("\\", "/")
+    marker = f"/{ARCHIVE_DIR}/"
+    i = norm.rfind(marker)
+    if i < 0:
+        return None
+    rest = norm[i + len(marker):]
+    name, sep, member = rest.partition("/")
+    if not sep or not member or "/" in member or not name.endswith(ARCHIVE_EXT):
+        return None
+    cut = len(path) - len(member) - 1
+    return path[:cut], member
+
+
+def is_archived(path: str) -> bool:
+    return split_archive_path(path) is not None
+
+
+def index_path(tar_abs: str) -> str:
+    return tar_abs + INDEX_SUFFIX
+
+
+# ---------- index ----------
+
+def load_index(tar_abs: str) -> Optional[dict]:
+    """Index archivu (cache podle mtime .idx souboru). None = archiv neexistuje."""
+    ipath = index_path(tar_abs)
+    try:
+        mtime_ns = os.stat(ipath).st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        hit = _index_cache.get(tar_abs)
+        if hit is not None and hit[0] == mtime_ns:
+            _index_cache.move_to_end(tar_abs)
+            cache_event("archive_index", True)
+            return hit[1]
+    cache_event("archive_index", False)
+    try:
+        with open(ipath, "r", encoding="utf-8") as f:
+            idx = json.load(f)
+    except (OSError, ValueError):
+        return None
+    with _lock:
+        _index_cache[tar_abs] = (mtime_ns, idx)
+        while len(_index_cache) > _CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return idx
+
+
+def _write_index(tar_abs: str, idx: dict) -> None:
+    target = index_path(tar_abs)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-", suffix=INDEX_SUFFIX)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(idx, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def member_entry(abs_path: str) -> Optional[Tuple[str, dict]]:
+    """(absolutní cesta taru, {offset, size, mtime}) pro odkaz do archivu, jinak None."""
+    parts = split_archive_path(abs_path)
+    if parts is None:
+        return None
+    tar_abs, member = parts
+    idx = load_index(tar_abs)
+    if idx is None:
+        return None
+    entry = idx["members"].get(member)
+    return (tar_abs, entry) if entry is not None else None
+
+
+def report_exists(abs_path: str) -> bool:
+    """Soubor na disku nebo člen archivu."""
+    return os.path.isfile(abs_path) or member_entry(abs_path) is not None
+
+
+# ---------- čtení ----------
+
+class MemberFile(io.RawIOBase):
+    """Read-only okno [offset, offset+size) do taru – seek/read jako běžný soubor."""
+
+    def __init__(self, tar_abs: str, offset: int, size: int):
+        super().__init__()
+        self._f = open(tar_abs, "rb")
+        self._start = offset
+        self._size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self._size
+        self._pos = min(max(pos, 0), self._size)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._size - self._pos)
+        if n <= 0:
+            return 0
+        self._f.seek(self._start + self._pos)
+        got = self._f.readinto(memoryview(b)[:n])
+        self._pos += got
+        return got
+
+    def close(self) -> None:
+        if not self.closed:
+            self._f.close()
+        super().close()
+
+
+def open_member(abs_path: str) -> Optional[Tuple[MemberFile, dict]]:
+    found = member_entry(abs_path)
+    if found is None:
+        return None
+    tar_abs, entry = found
+    return MemberFile(tar_abs, entry["offset"], entry["size"]), entry
+
+
+def read_member(abs_path: str) -> bytes:
+    opened = open_member(abs_path)
+    if opened is None:
+        raise FileNotFoundError(abs_path)
+    f, _entry = opened
+    with f:
+        return f.read()
+
+
+@contextmanager
+def materialized(abs_path: str) -> Iterator[str]:
+    """
+    Dočasná kopie člena pro parsery, které chtějí cestu k souboru.
+    Jen záložní cesta – normálně se čte sidecar přímo z taru.
+    """
+    suffix = os.path.splitext(abs_path)[1]
+    fd, tmp = tempfile.mkstemp(prefix="member-", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(read_member(abs_path))
+        yield tmp
+    finally:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def send_member(abs_path: str, download_name: Optional[str] = None):
+    """Flask odpověď pro člen archivu – ETag, Last-Modified, Range (206) jako send_file."""
+    from flask import Response, request
+    from werkzeug.wsgi import wrap_file
+
+    opened = open_member(abs_path)
+    if opened is None:
+        return None
+    f, entry = opened
+    name = download_name or split_archive_path(abs_path)[1]
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    resp = Response(wrap_file(request.environ, f), mimetype=mimetype, direct_passthrough=True)
+    resp.content_length = entry["size"]
+    resp.last_modified = datetime.fromtimestamp(entry["mtime"], tz=timezone.utc)
+    resp.set_etag(f"{os.path.basename(split_archive_path(abs_path)[0])}-{entry['offset']}-{entry['size']}")
+    resp.headers.set("Content-Disposition", "inline", filename=name)
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request.environ, accept_ranges=True, complete_length=entry["size"])
+
+
+# ---------- zápis ----------
+
+@contextmanager
+def _archive_lock(tar_abs: str) -> Iterator[None]:
+    """Exkluzivní zámek nad adresářem archivů sady (read-modify-write indexu)."""
+    try:
+        import fcntl
+    except ImportError:  # Windows – bez zamykání
+        yield
+        return
+    fd = os.open(os.path.dirname(tar_abs), os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _unique_member(name: str, taken: set) -> str:
+    if name not in taken:
+        return name
+    stem, ext = os.path.splitext(name)
+    i = 2
+    while f"{stem}~{i}{ext}" in taken:
+        i += 1
+    return f"{stem}~{i}{ext}"
+
+
+def pack_files(tar_abs: str, files: Sequence[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Přidá soubory do archivu (append) a aktualizuje index.
+    `files` = [(absolutní zdroj, požadované jméno člena)], sidecar zdroje
+    (<zdroj>.rcol), pokud existuje, jde do archivu hned za něj.
+    Vrátí {absolutní zdroj: skutečné jméno člena}. Zdroje nemaže.
+    """
+    from app.utils.report_sidecar import sidecar_path
+
+    os.makedirs(os.path.dirname(tar_abs), exist_ok=True)
+    with _archive_lock(tar_abs):
+        return _pack_locked(tar_abs, files, sidecar_path)
+
+
+def _pack_locked(tar_abs: str, files, sidecar_path) -> Dict[str, str]:
+    old = load_index(tar_abs)
+    idx = {"version": INDEX_VERSION, "members": dict(old["members"]) if old else {}}
+    taken = set()
+    if os.path.exists(tar_abs):
+        with tarfile.open(tar_abs, "r:") as tf:
+            taken = set(tf.getnames())
+
+    names: Dict[str, str] = {}
+    added: List[str] = []
+    with tarfile.open(tar_abs, "a:", format=tarfile.PAX_FORMAT) as tf:
+        for src, wanted in files:
+            member = _unique_member(wanted, taken)
+            taken.add(member)
+            tf.add(src, arcname=member, recursive=False)
+            added.append(member)
+            side = sidecar_path(src)
+            if os.path.isfile(side):
+                tf.add(side, arcname=sidecar_path(member), recursive=False)
+                added.append(sidecar_path(member))
+            names[src] = member
+        tf.fileobj.flush()
+        os.fsync(tf.fileobj.fileno())
+
+    # offsety dat bereme z hlaviček taru (PAX hlavičky mají proměnnou délku)
+    wanted_names = set(added)
+    with tarfile.open(tar_abs, "r:") as tf:
+        for ti in tf:
+            if ti.name in wanted_names:
+                idx["members"][ti.name] = {"offset": ti.offset_data, "size": ti.size,
+                                           "mtime": int(ti.mtime)}
+    _write_index(tar_abs, idx)
+    return names
+
+
+def remove_member(abs_path: str) -> bool:
+    """Vyřadí člen (a jeho sidecar) z indexu; prázdný archiv smaže. True = byl v archivu."""
+    from app.utils.report_sidecar import sidecar_path
+
+    parts = split_archive_path(abs_path)
+    if parts is None:
+        return False
+    tar_abs, member = parts
+    if not os.path.isdir(os.path.dirname(tar_abs)):
+        return False
+    with _archive_lock(tar_abs):
+        idx = load_index(tar_abs)
+        if idx is None or member not in idx["members"]:
+            return False
+        members = dict(idx["members"])  # objekt z cache neměníme na místě
+        members.pop(member, None)
+        members.pop(sidecar_path(member), None)
+        if members:
+            _write_index(tar_abs, {**idx, "members": members})
+        else:
+            for p in (index_path(tar_abs), tar_abs):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+    return True
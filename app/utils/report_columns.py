@@ -0,0 +1,270 @@
+# app/utils/report_columns.py
+from __future__ import annotations
+
+import csv
+import io
+import os
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.csv_report import (
+    STATUSES_FAIL, STATUSES_OK, STATUSES_SKIP, _ms_fmt, read_report_lines,
+)
+
+# Sloupcová reprezentace reportu: místo dictu na řádek držíme
+#   status    – int16 kód (0 passed, 1 failed, 2 skipped, 3+ ostatní)
+#   duration  – int64 ms
+#   describe  – int32 kód do tabulky jmen (dictionary encoding)
+# Agregace (summary, skupiny, percentily, top-N) jsou pak NumPy operace
+# a formátované řetězce (duration_fmt) vznikají až pro zobrazované řádky.
+
+ST_PASSED, ST_FAILED, ST_SKIPPED = 0, 1, 2
+BASE_STATUS_LABELS = ("passed", "failed", "skipped")
+
+_STATUS_CODES: Dict[str, int] = {}
+for _s in STATUSES_OK:
+    _STATUS_CODES[_s] = ST_PASSED
+for _s in STATUSES_FAIL:
+    _STATUS_CODES[_s] = ST_FAILED
+for _s in STATUSES_SKIP:
+    _STATUS_CODES[_s] = ST_SKIPPED
+
+
+def _durations_ms(raw: List[str]) -> np.ndarray:
+    """Stejná sémantika jako int(float(dur)) v parse_report_csv, nevalidní = 0."""
+    try:
+        arr = np.asarray(raw, dtype=np.float64)
+    except ValueError:
+        arr = np.empty(len(raw), dtype=np.float64)
+        for i, v in enumerate(raw):
+            try:
+                arr[i] = float(v)
+            except ValueError:
+                arr[i] = 0.0
+    arr[~np.isfinite(arr)] = 0.0
+    return np.trunc(arr).astype(np.int64)
+
+
+class ReportRow(Mapping):
+    """Líný pohled na jeden řádek – chová se jako dict z parse_report_csv."""
+
+    __slots__ = ("_rep", "_i")
+    _KEYS = ("describe", "test", "status", "duration_ms", "duration_fmt", "timestamp", "timestampLocal")
+
+    def __init__(self, rep: "ColumnarReport", i: int):
+        self._rep = rep
+        self._i = i
+
+    def __getitem__(self, key):
+        rep, i = self._rep, self._i
+        if key == "describe":
+            return rep.describe_raw[rep.describe_codes[i]]
+        if key == "test":
+            return rep.tests[i]
+        if key == "status":
+            return rep.status_labels[rep.status_codes[i]]
+        if key == "duration_ms":
+            return int(rep.durations[i])
+        if key == "duration_fmt":
+            return _ms_fmt(int(rep.durations[i]))
+        if key == "timestamp":
+            return rep.timestamps[i]
+        if key == "timestampLocal":
+            return rep.timestamps_local[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+
+class ColumnarReport:
+    def __init__(self, file_name: str, header_note: Optional[str],
+                 describe_names: List[str], describe_raw: List[str], describe_codes: np.ndarray,
+                 tests: List[str], status_labels: List[str], status_codes: np.ndarray,
+                 durations: np.ndarray, timestamps: List[str], timestamps_local: List[str]):
+        self.file_name = file_name
+        self.header_note = header_note
+        self.describe_names = describe_names      # jméno skupiny ("—" pro prázdné)
+        self.describe_raw = describe_raw          # původní hodnota sloupce describe
+        self.describe_codes = describe_codes
+        self.tests = tests
+        self.status_labels = status_labels
+        self.status_codes = status_codes
+        self.durations = durations
+        self.timestamps = timestamps
+        self.timestamps_local = timestamps_local
+
+    def __len__(self) -> int:
+        return int(self.durations.shape[0])
+
+    # ---------- agregace ----------
+
+    def summary(self) -> dict:
+        counts = np.bincount(self.status_codes, minlength=3)
+        total = len(self)
+        passed, failed, skipped = (int(c) for c in counts[:3])
+        total_ms = int(self.durations.sum())
+        return {
+            "total": total, "passed": passed, "failed": failed, "skipped": skipped,
+            "pass_rate": round((passed / total * 100.0), 1) if total else 0.0,
+            "duration_ms": total_ms, "duration_fmt": _ms_fmt(total_ms),
+        }
+
+    def group_stats(self) -> List[dict]:
+        """Součty po skupinách (describe) v pořadí prvního výskytu – bez řádků."""
+        n = len(self.describe_names)
+        codes = self.describe_codes
+        totals = np.bincount(codes, minlength=n)
+        per_status = [np.bincount(codes[self.status_codes == st], minlength=n)
+                      for st in (ST_PASSED, ST_FAILED, ST_SKIPPED)]
+        # float64 váhy jsou přesné do 2^53 ms – pro součty délek testů bohatě stačí
+        dur = np.bincount(codes, weights=self.durations, minlength=n).astype(np.int64)
+        return [{
+            "describe": self.describe_names[g],
+            "total": int(totals[g]),
+            "passed": int(per_status[0][g]), "failed": int(per_status[1][g]), "skipped": int(per_status[2][g]),
+            "duration_ms": int(dur[g]), "duration_fmt": _ms_fmt(int(dur[g])),
+        } for g in range(n)]
+
+    def group_indices(self) -> List[np.ndarray]:
+        """Indexy řádků každé skupiny (v původním pořadí)."""
+        n = len(self.describe_names)
+        order = np.argsort(self.describe_codes, kind="stable")
+        bounds = np.cumsum(np.bincount(self.describe_codes, minlength=n))[:-1]
+        return np.split(order, bounds)
+
+    def percentiles(self, qs: Sequence[float] = (50, 90, 99)) -> Dict[str, int]:
+        if not len(self):
+            return {f"p{int(q)}": 0 for q in qs}
+        vals = np.percentile(self.durations, qs, method="nearest")
+        return {f"p{int(q)}": int(v) for q, v in zip(qs, vals)}
+
+    def slowest_indices(self, n: int = 10) -> np.ndarray:
+        d = self.durations
+        if n >= len(d):
+            return np.argsort(-d, kind="stable")
+        top = np.argpartition(-d, n)[:n]
+        return top[np.argsort(-d[top], kind="stable")]
+
+    def slowest(self, n: int = 10) -> List[ReportRow]:
+        return self.rows(self.slowest_indices(n))
+
+    # ---------- řádky (formátování až při zobrazení) ----------
+
+    def rows(self, indices: Optional[Iterable[int]] = None) -> List[ReportRow]:
+        if indices is None:
+            indices = range(len(self))
+        return [ReportRow(self, int(i)) for i in indices]
+
+    def to_report(self) -> dict:
+        """Stejná struktura jako parse_report_csv, řádky jsou líné ReportRow."""
+        groups = self.group_stats()
+        for g, idx in zip(groups, self.group_indices()):
+            g["tests"] = self.rows(idx)
+        return {
+            "file_name": self.file_name,
+            "header_note": self.header_note,
+            "rows": self.rows(),
+            "groups": groups,
+            "summary": self.summary(),
+        }
+
+
+class ColumnarBuilder:
+    """
+    Skládá ColumnarReport řádek po řádku – společný výstup všech parserů
+    (CSV, JUnit XML, Playwright/Mocha JSON, viz report_parsers).
+    """
+
+    def __init__(self):
+        self._describe_map: Dict[str, int] = {}
+        self.describe_names: List[str] = []
+        self.describe_raw: List[str] = []
+        self._status_map = dict(_STATUS_CODES)
+        self.status_labels = list(BASE_STATUS_LABELS)
+        self.desc_codes: List[int] = []
+        self.st_codes: List[int] = []
+        self.durs: list = []
+        self.tests: List[str] = []
+        self.ts_list: List[str] = []
+        self.tsl_list: List[str] = []
+
+    def add(self, describe: str, test: str, status: str, duration, timestamp: str = "",
+            timestamp_local: str = "") -> None:
+        """`status` je surová hodnota (normalizuje se tady), `duration` v ms (str/číslo)."""
+        desc = describe.strip()
+        key = desc or "—"
+        code = self._describe_map.get(key)
+        if code is None:
+            code = self._describe_map[key] = len(self.describe_names)
+            self.describe_names.append(key)
+            self.describe_raw.append(desc)
+        self.desc_codes.append(code)
+
+        status_raw = status.strip().lower()
+        sc = self._status_map.get(status_raw)
+        if sc is None:
+            sc = self._status_map[status_raw] = len(self.status_labels)
+            self.status_labels.append(status_raw or "unknown")
+        self.st_codes.append(sc)
+
+        self.durs.append(duration or "0")
+        self.tests.append(test.strip())
+        self.ts_list.append(timestamp.strip())
+        self.tsl_list.append(timestamp_local.strip())
+
+    def build(self, file_name: str, header_note: Optional[str] = None) -> ColumnarReport:
+        return ColumnarReport(
+            file_name=file_name,
+            header_note=header_note,
+            describe_names=self.describe_names,
+            describe_raw=self.describe_raw,
+            describe_codes=np.asarray(self.desc_codes, dtype=np.int32),
+            tests=self.tests,
+            status_labels=self.status_labels,
+            status_codes=np.asarray(self.st_codes, dtype=np.int16),
+            durations=_durations_ms([str(d) for d in self.durs]),
+            timestamps=self.ts_list,
+            timestamps_local=self.tsl_list,
+        )
+
+
+def read_csv_columns(abs_path: str) -> ColumnarReport:
+    """Náš CSV formát (describe,test,status,duration,timestamp,timestampLocal)."""
+    header_note, lines = read_report_lines(abs_path)
+    rdr = csv.reader(io.StringIO("\n".join(lines)))
+    header = next(rdr, None) or []
+    # DictReader semantika: při duplicitě vyhrává poslední sloupec
+    col = {name: i for i, name in enumerate(header)}
+
+    def idx(name):
+        return col.get(name, -1)
+
+    i_desc, i_test, i_status, i_dur, i_ts, i_tsl = (
+        idx("describe"), idx("test"), idx("status"), idx("duration"), idx("timestamp"), idx("timestampLocal"))
+
+    b = ColumnarBuilder()
+    for r in rdr:
+        if not r:
+            continue  # DictReader prázdné řádky přeskakuje
+        n = len(r)
+        b.add(
+            r[i_desc] if 0 <= i_desc < n else "",
+            r[i_test] if 0 <= i_test < n else "",
+            r[i_status] if 0 <= i_status < n else "",
+            r[i_dur] if 0 <= i_dur < n else "",
+            r[i_ts] if 0 <= i_ts < n else "",
+            r[i_tsl] if 0 <= i_tsl < n else "",
+        )
+    return b.build(os.path.basename(abs_path), header_note)
+
+
+def read_report_columns(abs_path: str) -> ColumnarReport:
+    """Libovolný podporovaný formát reportu – parser vybere registr (report_parsers)."""
+    from app.utils.report_parsers import parse_report
+    return parse_report(abs_path)
@@ -0,0 +1,580 @@
+# app/utils/report_import.py
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select, union_all, update
+
+from app import db
+from app.models.project_model import Project, ProjectType
+from app.models.run_model import Run
+from app.models.run_shard_model import RunShard
+from app.models.run_stats_model import RunStats
+from app.models.suite_model import Suite
+from app.models.test_baseline_model import TestBaseline
+from app.utils.duration_analytics import (DEFAULT_MIN_DELTA_MS, DEFAULT_SLOWEST_N, DEFAULT_THRESHOLD,
+                                          DEFAULT_WINDOW, advance_baselines, report_digest,
+                                          stats_values)
+from app.utils.report_archive import ARCHIVE_DIR, is_archived
+from app.utils.report_columns import read_report_columns
+from app.utils.report_parsers import allowed_report, detect_parser
+from app.utils.report_sidecar import SUFFIX as SIDECAR_SUFFIX, write_sidecar
+from app.utils.slugs import save_with_unique_slugs
+from app.utils.suite_health import refresh_suite_health
+
+# Hromadný import existujícího stromu reportů (`flask reports import <adresář>`):
+#
+#   <projekt>/<sada>/<soubor>.csv     (stejné rozložení, jaké píše runs_upload)
+#
+# Chybějící projekty a sady se založí, každý soubor = jeden Run se
+# statistikami a sidecarem. `<sada>` = sekvence (běhy mají jen sekvence):
+# hledá se podle slugu/názvu mezi sekvencemi projektu, chybějící se založí
+# v sekci `section_name` (IMPORT_SECTION, výchozí "Import"), kterou import
+# v projektu případně také vytvoří. Průchod jde po adresářích sad, paměť drží
+# jen výpis jedné sady a jednu dávku výsledků:
+#
+#   1) výpis adresáře → kandidáti; už známé cesty (runs + run_shards) se
+#      vyřadí dotazem `csv_path IN (…)` po 500 (indexováno) – opakovaný
+#      import 500k souborů tak nic neparsuje,
+#   2) s `dedupe="hash"` se ze zbytku vyřadí i soubory, jejichž SHA-256
+#      už v DB je (přejmenované / přesunuté kopie); hash ukládá i upload
+#      a konec živého běhu, starším běhům bez něj se před importem dopočte,
+#   3) parsování, sidecar a hash běží v poolu procesů (okno rozpracovaných
+#      úloh je omezené), výsledky se berou v pořadí odeslání,
+#   4) každých `batch` souborů: jeden executemany INSERT běhů, id zpět
+#      podle csv_path, baseline sad posunuté chronologicky v paměti
+#      (prosté řádky místo ORM objektů, zpět jedním bulk UPDATE/INSERT),
+#      jeden INSERT RunStats a commit.
+#
+# Zdroj = REPORTS_DIR → soubory se jen zaregistrují na místě. Jiný adresář
+# → soubory se zkopírují do `<slug projektu>/<slug sady>/` a publikují
+# do úložiště (funguje i s S3).
+#
+# Baseline délek se posouvá v pořadí importu (v sadě podle času běhu) –
+# import starých souborů do sady s novějšími běhy je přidá "na konec".
+
+DEDUPE_PATH = "path"
+DEDUPE_HASH = "hash"
+DEFAULT_SECTION = "Import"
+
+_IN_CHUNK = 500     # hodnot v jednom IN (limit proměnných SQLite)
+_HASH_CHUNK = 1 << 20
+_TS_PREFIX = re.compile(r"^(\d{4}-\d{2}-\d{2}_\d{6})-(.+)$")
+
+
+class ImportTreeError(ValueError):
+    """Neplatné zadání importu – hláška pro uživatele."""
+
+
+@dataclass
+class ImportStats:
+    files: int = 0            # reportů ve stromu
+    known: int = 0            # cesta už v DB
+    duplicates: int = 0       # obsah (hash) už v DB
+    imported: int = 0
+    without_stats: int = 0    # zaregistrováno, ale report nešel rozparsovat
+    unrecognized: int = 0     # neznámý formát – přeskočeno
+    misplaced: int = 0        # mimo rozložení <projekt>/<sada>/<soubor>
+    projects_created: int = 0
+    suites_created: int = 0
+    hashed: int = 0           # dopočtené hashe dřív nahraných běhů (dedupe hash)
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f"souborů {self.files}: importováno {self.imported} "
+                f"(bez statistik {self.without_stats}), známých cest {self.known}, "
+                f"duplicit obsahu {self.duplicates}, neznámý formát {self.unrecognized}, "
+                f"mimo rozložení {self.misplaced}; nové projekty {self.projects_created}, "
+                f"sady {self.suites_created}"
+                + (f"; dopočtené hashe {self.hashed}" if self.hashed else ""))
+
+
+@dataclass
+class _Job:
+    rel: str                  # cílová cesta v REPORTS_DIR (= Run.csv_path)
+    src: str
+    dst: str
+    suite_key: Tuple[str, str]
+    label: str
+    created_at: datetime
+    content_hash: Optional[str] = None
+
+
+# ---------- práce v pracovním procesu (bez app contextu) ----------
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _hash_or_none(path: str) -> Optional[str]:
+    try:
+        return file_hash(path)
+    except OSError:
+        return None
+
+
+def _parse_job(src: str, dst: str, content_hash: Optional[str], slowest_n: int) -> dict:
+    """Kopie (je-li potřeba), rozpoznání formátu, sidecar a digest pro RunStats."""
+    if src != dst:
+        shutil.copy2(src, dst)
+    if detect_parser(dst) is None:
+        if src != dst:
+            os.remove(dst)
+        return {"status": "unrecognized"}
+    out = {"status": "ok", "hash": content_hash or file_hash(dst), "digest": None}
+    try:
+        rep = read_report_columns(dst)
+        write_sidecar(dst, rep)
+        out["digest"] = report_digest(rep, slowest_n)
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    return out
+
+
+class _Baseline:
+    """Řádek TestBaseline bez ORM – advance_baselines jen přepisuje atributy."""
+
+    __slots__ = ("id", "suite_id", "test_key", "window", "baseline_ms", "last_ms", "updated_at")
+
+    def __init__(self, id, suite_id, test_key, window=None, baseline_ms=None, last_ms=None):
+        self.id, self.suite_id, self.test_key = id, suite_id, test_key
+        self.window, self.baseline_ms, self.last_ms = window or [], baseline_ms, last_ms
+        self.updated_at = None
+
+
+def _load_baselines(suite_id: int) -> Dict[str, _Baseline]:
+    q = select(TestBaseline.id, TestBaseline.test_key, TestBaseline.window,
+               TestBaseline.baseline_ms, TestBaseline.last_ms).where(TestBaseline.suite_id == suite_id)
+    return {key: _Baseline(id_, suite_id, key, window, base, last)
+            for id_, key, window, base, last in db.session.execute(q)}
+
+
+def _new_baseline(suite_id: int, key: str) -> _Baseline:
+    return _Baseline(None, suite_id, key)
+
+
+def _save_baselines(baselines: Dict[int, Dict[str, _Baseline]], touched: Dict[int, set]) -> None:
+    updates, inserts = [], []
+    for suite_id, keys in touched.items():
+        for key in keys:
+            b = baselines[suite_id][key]
+            row = {"window": b.window, "baseline_ms": b.baseline_ms,
+                   "last_ms": b.last_ms, "updated_at": b.updated_at}
+            if b.id is None:
+                inserts.append({"suite_id": suite_id, "test_key": key, **row})
+            else:
+                updates.append({"id": b.id, **row})
+    if updates:
+        db.session.execute(update(TestBaseline), updates)
+    if inserts:
+        db.session.execute(insert(TestBaseline), inserts)
+
+
+class _Inline:
+    """Executor bez poolu (`workers=1`) – stejné rozhraní, výsledek hned."""
+
+    def submit(self, fn, *args):
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except BaseException as e:
+            fut.set_exception(e)
+        return fut
+
+
+# ---------- průchod stromem ----------
+
+def _dirs(path: str) -> List[os.DirEntry]:
+    with os.scandir(path) as it:
+        return sorted((e for e in it if e.is_dir(follow_symlinks=False)
+                       and not e.name.startswith((".", ARCHIVE_DIR))), key=lambda e: e.name)
+
+
+def _run_meta(entry: os.DirEntry) -> Tuple[str, datetime]:
+    """Label a čas běhu: prefix `YYYY-mm-dd_HHMMSS-` z runs_upload, jinak mtime."""
+    stem = entry.name
+    m = _TS_PREFIX.match(stem)
+    created = None
+    if m:
+        try:
+            created = datetime.strptime(m.group(1), "%Y-%m-%d_%H%M%S")
+            stem = m.group(2)
+        except ValueError:
+            created = None
+    if created is None:
+        created = datetime.utcfromtimestamp(entry.stat().st_mtime)
+    return os.path.splitext(stem)[0][:200], created
+
+
+def walk_tree(root: str, stats: ImportStats) -> Iterator[Tuple[str, str, List[os.DirEntry]]]:
+    """(adresář projektu, adresář sady, reporty v ní) – po jednotlivých sadách."""
+    for pdir in _dirs(root):
+        with os.scandir(pdir.path) as it:
+            stats.misplaced += sum(1 for e in it if e.is_file() and allowed_report(e.name))
+        for sdir in _dirs(pdir.path):
+            files = []
+            with os.scandir(sdir.path) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        stats.misplaced += sum(1 for _ in _report_files(e.path))
+                    elif e.is_file() and allowed_report(e.name):
+                        files.append(e)
+            stats.files += len(files)
+            if files:
+                yield pdir.name, sdir.name, files
+
+
+def _report_files(path: str) -> Iterator[str]:
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            if allowed_report(name):
+                yield os.path.join(dirpath, name)
+
+
+def _chunks(items: List, n: int = _IN_CHUNK) -> Iterator[List]:
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+def known_paths(rels: Iterable[str]) -> set:
+    """Které z cest už patří nějakému běhu nebo shardu (indexované IN po dávkách)."""
+    found = set()
+    for chunk in _chunks(sorted(set(rels))):
+        q = union_all(select(Run.csv_path).where(Run.csv_path.in_(chunk)),
+                      select(RunShard.csv_path).where(RunShard.csv_path.in_(chunk)))
+        found.update(db.session.execute(q).scalars())
+    return found
+
+
+def known_hashes(hashes: Iterable[str]) -> set:
+    found = set()
+    for chunk in _chunks(sorted(set(hashes))):
+        q = select(Run.content_hash).where(Run.content_hash.in_(chunk))
+        found.update(db.session.execute(q).scalars())
+    return found
+
+
+# ---------- import ----------
+
+class TreeImporter:
+    """
+    Jeden průchod stromem. `workers` = procesů pro parsování (1 = v tomto
+    procesu); `store` = úložiště reportů.
+    """
+
+    def __init__(self, root: str, reports_dir: str, store, workers: int = 1,
+                 dedupe: str = DEDUPE_PATH, batch: int = 500, dry_run: bool = False,
+                 analytics: Optional[dict] = None, section_name: str = DEFAULT_SECTION,
+                 progress: Optional[Callable[[ImportStats], None]] = None):
+        self.root = os.path.realpath(root)
+        reports_dir = os.path.realpath(reports_dir)
+        self.in_place = self.root == reports_dir
+        if not self.in_place and (self.root.startswith(reports_dir + os.sep)
+                                  or reports_dir.startswith(self.root + os.sep)):
+            raise ImportTreeError("Zdroj musí být přímo REPORTS_DIR, nebo adresář mimo něj.")
+        self.store = store
+        self.workers = max(1, workers)
+        self.window = 4 * self.workers  # rozpracovaných úloh najednou
+        self.pool = _Inline()
+        self.dedupe = dedupe
+        self.batch = max(1, batch)
+        self.dry_run = dry_run
+        self.section_name = section_name or DEFAULT_SECTION
+        opts = dict(analytics or {})
+        self.slowest_n = opts.pop("slowest_n", DEFAULT_SLOWEST_N)
+        self.baseline_opts = {"window": opts.get("window", DEFAULT_WINDOW),
+                              "threshold": opts.get("threshold", DEFAULT_THRESHOLD),
+                              "min_delta_ms": opts.get("min_delta_ms", DEFAULT_MIN_DELTA_MS)}
+        self.progress = progress
+        self.stats = ImportStats()
+
+        projects = Project.query.all()
+        self._projects_by_slug = {p.slug: p for p in projects}
+        self._projects_by_name = {p.name: p for p in projects}
+        self._suites: Dict[int, Tuple[dict, dict]] = {}
+        self._sections: Dict[int, Suite] = {}
+        self._resolved: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._seen_hashes: set = set()
+
+    # --- projekty a sady ---
+
+    def _find_project(self, dirname: str) -> Optional[Project]:
+        return self._projects_by_slug.get(dirname) or self._projects_by_name.get(dirname)
+
+    def _suite_maps(self, project_id: int) -> Tuple[dict, dict]:
+        maps = self._suites.get(project_id)
+        if maps is None:
+            by_slug, by_name = {}, {}
+            # jen sekvence – sekce běhy nemají (runs_list / dashboard je neukážou)
+            q = Suite.query.filter(Suite.project_id == project_id,
+                                   Suite.parent_id.isnot(None)).order_by(Suite.id)
+            for s in q:
+                by_slug.setdefault(s.slug, s)
+                by_name.setdefault(s.name, s)
+            maps = self._suites[project_id] = (by_slug, by_name)
+        return maps
+
+    def _find_suite(self, project: Optional[Project], dirname: str) -> Optional[Suite]:
+        if project is None:
+            return None
+        by_slug, by_name = self._suite_maps(project.id)
+        return by_slug.get(dirname) or by_name.get(dirname)
+
+    def _ensure_scope(self, pname: str, sname: str) -> Tuple[Project, Suite]:
+        project = self._find_project(pname)
+        if project is None:
+            project = Project(name=pname, type=ProjectType.e2e)
+            save_with_unique_slugs([project])
+            db.session.commit()
+            self._projects_by_slug[project.slug] = self._projects_by_name[project.name] = project
+            self.stats.projects_created += 1
+        suite = self._find_suite(project, sname)
+        if suite is None:
+            by_slug, by_name = self._suite_maps(project.id)
+            section = self._import_section(project)
+            order = (sum(1 for s in by_slug.values() if s.parent_id == section.id) + 1) * 10
+            suite = Suite(name=sname, project_id=project.id, parent_id=section.id, order_index=order)
+            save_with_unique_slugs([suite])
+            db.session.commit()
+            by_slug.setdefault(suite.slug, suite)
+            by_name.setdefault(suite.name, suite)
+            self.stats.suites_created += 1
+        return project, suite
+
+    def _import_section(self, project: Project) -> Suite:
+        """Sekce pro nově založené sekvence (najde se podle názvu, jinak se založí)."""
+        section = self._sections.get(project.id)
+        if section is None:
+            section = (Suite.query.filter_by(project_id=project.id, parent_id=None, name=self.section_name)
+                       .order_by(Suite.id).first())
+            if section is None:
+                last = (db.session.query(db.func.max(Suite.order_index))
+                        .filter(Suite.project_id == project.id, Suite.parent_id.is_(None)).scalar())
+                section = Suite(name=self.section_name, project_id=project.id, parent_id=None,
+                                order_index=(last or 0) + 10)
+                save_with_unique_slugs([section])
+                db.session.commit()
+            self._sections[project.id] = section
+        return section
+
+    # --- jedna sada ---
+
+    def _candidates(self, pname: str, sname: str, entries: List[os.DirEntry]) -> List[_Job]:
+        project = self._find_project(pname)
+        suite = self._find_suite(project, sname)
+        if self.in_place:
+            prefix = f"{pname}/{sname}"
+        elif suite is not None:
+            prefix = f"{project.slug}/{suite.slug}"
+        else:
+            prefix = None  # sada ještě neexistuje → žádný soubor v ní není známý
+
+        jobs = []
+        for e in entries:
+            label, created = _run_meta(e)
+            rel = f"{prefix}/{e.name}" if prefix else e.name
+            jobs.append(_Job(rel=rel, src=e.path, dst=e.path, suite_key=(pname, sname),
+                             label=label, created_at=created))
+        if prefix:
+            known = known_paths(j.rel for j in jobs)
+            self.stats.known += sum(1 for j in jobs if j.rel in known)
+            jobs = [j for j in jobs if j.rel not in known]
+
+        if jobs and self.dedupe == DEDUPE_HASH:
+            hashes = self._map(file_hash, [(j.src,) for j in jobs])
+            for j, h in zip(jobs, hashes):
+                j.content_hash = h
+            taken = known_hashes(hashes) | self._seen_hashes
+            fresh = []
+            for j in jobs:
+                if j.content_hash in taken:
+                    self.stats.duplicates += 1
+                else:
+                    taken.add(j.content_hash)
+                    fresh.append(j)
+            jobs = fresh
+            self._seen_hashes.update(j.content_hash for j in jobs)
+
+        jobs.sort(key=lambda j: (j.created_at, j.rel))
+        return jobs
+
+    def _map(self, fn, args: List[tuple]) -> List:
+        """fn přes pool s omezeným oknem, výsledky v pořadí vstupu."""
+        out, pending = [], deque()
+        for a in args:
+            pending.append(self.pool.submit(fn, *a))
+            if len(pending) >= self.window:
+                out.append(pending.popleft().result())
+        out.extend(f.result() for f in pending)
+        return out
+
+    def _prepare(self, jobs: List[_Job]) -> None:
+        """Sada existuje (případně ji založí) a cíle kopií mají adresář."""
+        pname, sname = jobs[0].suite_key
+        project, suite = self._ensure_scope(pname, sname)
+        self._resolved[(pname, sname)] = (project.id, suite.id)
+        if self.in_place:
+            return
+        prefix = f"{project.slug}/{suite.slug}"
+        for j in jobs:
+            if "/" not in j.rel:  # sada vznikla až teď – cíl bez prefixu
+                j.rel = f"{prefix}/{j.rel}"
+            j.dst = self.store.local_path(j.rel, create=True)
+
+    # --- hlavní smyčka ---
+
+    def run(self) -> ImportStats:
+        if self.workers == 1:
+            return self._run()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            self.pool = pool
+            try:
+                return self._run()
+            finally:
+                self.pool = _Inline()
+
+    def _run(self) -> ImportStats:
+        pending: deque = deque()
+        done: List[Tuple[_Job, dict]] = []
+        if self.dedupe == DEDUPE_HASH:
+            self._backfill_hashes()
+        for pname, sname, entries in walk_tree(self.root, self.stats):
+            jobs = self._candidates(pname, sname, entries)
+            if not jobs:
+                continue
+            if self.dry_run:
+                self.stats.imported += len(jobs)
+                continue
+            self._prepare(jobs)
+            for j in jobs:
+                pending.append((j, self.pool.submit(_parse_job, j.src, j.dst, j.content_hash,
+                                                    self.slowest_n)))
+                while len(pending) >= self.window:
+                    self._collect(pending.popleft(), done)
+                    if len(done) >= self.batch:
+                        self._flush(done)
+        while pending:
+            self._collect(pending.popleft(), done)
+            if len(done) >= self.batch:
+                self._flush(done)
+        if done:
+            self._flush(done)
+        return self.stats
+
+    def _backfill_hashes(self) -> None:
+        """
+        Hash běhů bez content_hash (upload z UI, živé běhy z doby před ním) –
+        jinak by je dedupe podle obsahu nepoznal. Shardované běhy nemají jeden
+        soubor, archivované se přeskočí; dry-run hashe jen drží v paměti.
+        """
+        last_id = 0
+        while True:
+            q = (select(Run.id, Run.csv_path)
+                 .where(Run.id > last_id, Run.content_hash.is_(None), Run.live.is_(False),
+                        ~Run.shards.any())
+                 .order_by(Run.id).limit(self.batch))
+            rows = db.session.execute(q).all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            todo = []
+            for run_id, rel in rows:
+                rel = (rel or "").lstrip("/\\")
+                if not rel or is_archived(rel):
+                    continue
+                path = self.store.local_path(rel)
+                if path and os.path.isfile(path):
+                    todo.append((run_id, path))
+            hashes = self._map(_hash_or_none, [(path,) for _id, path in todo])
+            found = [{"id": run_id, "content_hash": h} for (run_id, _p), h in zip(todo, hashes) if h]
+            self.stats.hashed += len(found)
+            if self.dry_run:
+                self._seen_hashes.update(r["content_hash"] for r in found)
+            elif found:
+                db.session.execute(update(Run), found)
+                db.session.commit()
+
+    def _collect(self, item, done: List) -> None:
+        job, fut = item
+        try:
+            res = fut.result()
+        except Exception as e:
+            self._error(job, f"{type(e).__name__}: {e}")
+            return
+        if res["status"] == "unrecognized":
+            self.stats.unrecognized += 1
+            return
+        if res.get("error"):
+            self._error(job, res["error"])
+        done.append((job, res))
+
+    def _error(self, job: _Job, msg: str) -> None:
+        if len(self.stats.errors) < 50:
+            self.stats.errors.append(f"{job.rel}: {msg}")
+
+    def _flush(self, done: List[Tuple[_Job, dict]]) -> None:
+        """Jedna dávka: publikace souborů, INSERT běhů, baseline, INSERT RunStats, commit."""
+        try:
+            for job, _res in done:
+                self.store.put_file(job.rel, job.dst,
+                                    content_type="text/csv" if job.rel.endswith(".csv") else None)
+                if os.path.isfile(job.dst + SIDECAR_SUFFIX):
+                    self.store.put_file(job.rel + SIDECAR_SUFFIX, job.dst + SIDECAR_SUFFIX,
+                                        content_type="application/octet-stream")
+
+            rows = []
+            for job, res in done:
+                project_id, suite_id = self._resolved[job.suite_key]
+                rows.append({"project_id": project_id, "suite_id": suite_id, "label": job.label,
+                             "csv_path": job.rel, "created_at": job.created_at,
+                             "content_hash": res["hash"]})
+            db.session.execute(insert(Run), rows)
+            ids = {}
+            for chunk in _chunks([r["csv_path"] for r in rows]):
+                q = select(Run.csv_path, Run.id).where(Run.csv_path.in_(chunk))
+                ids.update(db.session.execute(q).all())
+
+            # baseline se načte jednou na sadu a dávku, posouvá se v pořadí běhů
+            baselines: Dict[int, Dict[str, _Baseline]] = {}
+            touched: Dict[int, set] = {}
+            stats_rows = []
+            for job, res in done:
+                digest = res["digest"]
+                if digest is None:
+                    self.stats.without_stats += 1
+                    continue
+                _project_id, suite_id = self._resolved[job.suite_key]
+                b = baselines.get(suite_id)
+                if b is None:
+                    b = baselines[suite_id] = _load_baselines(suite_id)
+                regs = advance_baselines(b, suite_id, digest["tests"], new=_new_baseline,
+                                         **self.baseline_opts)
+                touched.setdefault(suite_id, set()).update(digest["tests"])
+                stats_rows.append(stats_values(ids[job.rel], suite_id, digest, regs))
+            _save_baselines(baselines, touched)
+            if stats_rows:
+                db.session.execute(insert(RunStats), stats_rows)
+            refresh_suite_health({self._resolved[job.suite_key][1] for job, _res in done})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.stats.imported += len(done)
+        done.clear()
+        if self.progress is not None:
+            self.progress(self.stats)
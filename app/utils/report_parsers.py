@@ -0,0 +1,218 @@
+# app/utils/report_parsers.py
+from __future__ import annotations
+
+import os
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from app.utils.metrics import observe_parse
+from app.utils.report_columns import ColumnarBuilder, ColumnarReport, read_csv_columns
+
+# Volitelná závislost – inkrementální JSON (bez ní json.load celého souboru).
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Registr parserů reportů. Každý parser vrací ColumnarReport, takže upload,
+# sidecar cache i pohledy pracují se stejnými normalizovanými řádky
+# (describe, test, status, duration_ms, timestamp) bez ohledu na formát.
+#
+# Výběr: podle přípony; když přípona nestačí (.json) nebo chybí, rozhodne
+# "sniff" nad začátkem souboru.
+
+SNIFF_BYTES = 4096
+
+
+@dataclass(frozen=True)
+class ReportParser:
+    name: str
+    extensions: tuple
+    sniff: Callable[[str], bool]        # začátek souboru (text) -> patří mi?
+    parse: Callable[[str], ColumnarReport]
+
+
+_PARSERS: List[ReportParser] = []
+
+
+def register_parser(parser: ReportParser) -> ReportParser:
+    """Přidá parser (novější registrace má při sniffování přednost)."""
+    _PARSERS.insert(0, parser)
+    return parser
+
+
+def report_extensions() -> set:
+    return {ext for p in _PARSERS for ext in p.extensions}
+
+
+def allowed_report(filename: str) -> bool:
+    return "." in (filename or "") and filename.rsplit(".", 1)[1].lower() in report_extensions()
+
+
+def _head(abs_path: str) -> str:
+    with open(abs_path, "rb") as f:
+        raw = f.read(SNIFF_BYTES)
+    return raw.decode("utf-8-sig", errors="replace").lstrip()
+
+
+def detect_parser(abs_path: str) -> Optional[ReportParser]:
+    ext = os.path.splitext(abs_path)[1].lstrip(".").lower()
+    candidates = [p for p in _PARSERS if ext in p.extensions]
+    if len(candidates) == 1:
+        return candidates[0]
+    head = _head(abs_path)
+    for p in candidates or _PARSERS:
+        if p.sniff(head):
+            return p
+    return None
+
+
+def parse_report(abs_path: str) -> ColumnarReport:
+    if not os.path.exists(abs_path):
+        raise FileNotFoundError(abs_path)
+    parser = detect_parser(abs_path)
+    if parser is None:
+        raise ValueError(f"unknown report format: {os.path.basename(abs_path)}")
+    return run_parser(parser, abs_path)
+
+
+def run_parser(parser: ReportParser, abs_path: str) -> ColumnarReport:
+    """parser.parse + metrika (délka a objem parsování)."""
+    t0 = time.perf_counter()
+    rep = parser.parse(abs_path)
+    observe_parse(parser.name, abs_path, time.perf_counter() - t0)
+    return rep
+
+
+def _json_items(abs_path: str, prefix: str):
+    """Prvky pole na cestě `prefix` (ijson syntaxe, např. "tests.item") – streamovaně."""
+    with open(abs_path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, prefix, use_float=True)
+            return
+        import json
+        data = json.load(f)
+    node = data
+    for part in prefix.split(".")[:-1]:
+        node = node.get(part) if isinstance(node, dict) else None
+    yield from (node or [])
+
+
+# ---------- CSV (náš formát) ----------
+
+def _sniff_csv(head: str) -> bool:
+    first = next((ln for ln in head.splitlines() if ln.strip() and not ln.lstrip().startswith("#")), "")
+    return "test" in first and "status" in first and "," in first
+
+
+# ---------- JUnit XML (iterparse) ----------
+
+def _sniff_junit(head: str) -> bool:
+    return head.startswith("<") and ("<testsuite" in head or "<testcase" in head)
+
+
+def parse_junit(abs_path: str) -> ColumnarReport:
+    """
+    JUnit/xUnit XML. describe = classname (nebo jméno <testsuite>), čas v s -> ms.
+    Elementy se po zpracování mažou, paměť neroste s velikostí souboru.
+    """
+    b = ColumnarBuilder()
+    suites: List[tuple] = []  # zásobník (name, timestamp)
+    for event, el in ET.iterparse(abs_path, events=("start", "end")):
+        tag = el.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            if tag == "testsuite":
+                suites.append((el.get("name") or "", el.get("timestamp") or ""))
+            continue
+        if tag == "testcase":
+            suite_name, suite_ts = suites[-1] if suites else ("", "")
+            status = "passed"
+            for child in el:
+                ctag = child.tag.rsplit("}", 1)[-1]
+                if ctag in ("failure", "error"):
+                    status = "failed"
+                    break
+                if ctag == "skipped":
+                    status = "skipped"
+            try:
+                dur_ms = float(el.get("time") or 0) * 1000.0
+            except ValueError:
+                dur_ms = 0
+            b.add(el.get("classname") or suite_name, el.get("name") or "", status,
+                  dur_ms, el.get("timestamp") or suite_ts)
+            el.clear()
+        elif tag == "testsuite":
+            suites.pop()
+            el.clear()
+    return b.build(os.path.basename(abs_path))
+
+
+# ---------- Playwright JSON reporter ----------
+
+def _sniff_playwright(head: str) -> bool:
+    # config bývá dlouhý, "suites" už se do hlavičky vejít nemusí
+    return head.startswith("{") and '"config"' in head
+
+
+_PW_STATUS = {"expected": "passed", "flaky": "passed", "unexpected": "failed", "skipped": "skipped"}
+
+
+def _walk_playwright_suite(b: ColumnarBuilder, suite: dict, path: List[str]) -> None:
+    title = suite.get("title") or ""
+    here = path + [title] if title else path
+    for spec in suite.get("specs") or ():
+        tests = spec.get("tests") or ()
+        multi = len(tests) > 1
+        for t in tests:
+            results = t.get("results") or []
+            last = results[-1] if results else {}
+            status = _PW_STATUS.get(t.get("status") or "", last.get("status") or "")
+            name = spec.get("title") or ""
+            if multi and t.get("projectName"):
+                name = f"{name} [{t['projectName']}]"
+            b.add(" › ".join(here), name, status, last.get("duration") or 0,
+                  last.get("startTime") or "")
+    for child in suite.get("suites") or ():
+        _walk_playwright_suite(b, child, here)
+
+
+def parse_playwright(abs_path: str) -> ColumnarReport:
+    """Playwright `--reporter=json`: top-level suity (soubory) se čtou po jedné."""
+    b = ColumnarBuilder()
+    for suite in _json_items(abs_path, "suites.item"):
+        _walk_playwright_suite(b, suite, [])
+    return b.build(os.path.basename(abs_path))
+
+
+# ---------- Mocha JSON reporter ----------
+
+def _sniff_mocha(head: str) -> bool:
+    return head.startswith("{") and '"stats"' in head and ('"tests"' in head or '"passes"' in head)
+
+
+def parse_mocha(abs_path: str) -> ColumnarReport:
+    """Mocha `--reporter json`: pole `tests`; neúspěch = neprázdné `err`, bez duration = pending."""
+    b = ColumnarBuilder()
+    for t in _json_items(abs_path, "tests.item"):
+        title = t.get("title") or ""
+        full = t.get("fullTitle") or title
+        describe = full[: -len(title)].strip() if title and full.endswith(title) else ""
+        if t.get("state"):
+            status = t["state"]
+        elif t.get("err"):
+            status = "failed"
+        elif t.get("pending") or t.get("duration") is None:
+            status = "skipped"
+        else:
+            status = "passed"
+        b.add(describe, title, status, t.get("duration") or 0)
+    return b.build(os.path.basename(abs_path))
+
+
+# pořadí registrace: CSV je fallback, specifičtější formáty se zkouší dřív
+CSV_PARSER = register_parser(ReportParser("csv", ("csv",), _sniff_csv, read_csv_columns))
+register_parser(ReportParser("junit", ("xml",), _sniff_junit, parse_junit))
+register_parser(ReportParser("mocha", ("json",), _sniff_mocha, parse_mocha))
+register_parser(ReportParser("playwright", ("json",), _sniff_playwright, parse_playwright))
@@ -0,0 +1,322 @@
+# app/utils/report_sidecar.py
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Sequence
+from typing import List, Optional
+
+import numpy as np
+from flask import current_app, has_app_context
+
+from app.utils.metrics import cache_event
+from app.utils.report_archive import is_archived, materialized, member_entry
+from app.utils.report_columns import ColumnarReport, read_report_columns
+
+# Binární "sidecar" vedle CSV (`<report>.csv.rcol`) – rozparsovaný report,
+# který se otevírá přes mmap bez kopírování sloupců:
+#
+#   [8 B]  MAGIC
+#   [4 B]  délka JSON hlavičky (little-endian u32)
+#   [..]   JSON hlavička: meta (zdrojový size/mtime), summary, skupiny,
+#          slovníky (describe, status) a offsety sloupců
+#   [..]   sloupce zarovnané na 8 B:
+#            describe_codes int32, status_codes int16, durations int64
+#            string tabulky (tests, timestamps, timestamps_local):
+#              offsets uint32/uint64[n+1] + UTF-8 data
+#
+# Sidecar je "čerstvý", když sedí velikost a mtime_ns zdrojového CSV.
+# U archivovaných reportů (report_archive) leží sidecar jako člen taru
+# hned za CSV a mmapuje se přímo z archivu.
+
+MAGIC = b"RPTCOL01"
+SUFFIX = ".rcol"
+VERSION = 1
+_ALIGN = 8
+
+_NUMERIC = (
+    ("describe_codes", "<i4"),
+    ("status_codes", "<i2"),
+    ("durations", "<i8"),
+)
+_STRINGS = ("tests", "timestamps", "timestamps_local")
+
+
+def sidecar_path(abs_csv: str) -> str:
+    return abs_csv + SUFFIX
+
+
+class StringColumn(Sequence):
+    """Sloupec řetězců nad mmap – dekóduje se jen řádek, na který se sáhne."""
+
+    __slots__ = ("_buf", "_offsets", "_data_off")
+
+    def __init__(self, buf, offsets: np.ndarray, data_off: int):
+        self._buf = buf
+        self._offsets = offsets
+        self._data_off = data_off
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        start = self._data_off + int(self._offsets[i])
+        end = self._data_off + int(self._offsets[i + 1])
+        return self._buf[start:end].decode("utf-8")
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def write_sidecar(abs_csv: str, rep: Optional[ColumnarReport] = None,
+                  target: Optional[str] = None, st: Optional[os.stat_result] = None) -> str:
+    """
+    Zapíše (atomicky) sidecar k CSV a vrátí jeho cestu. `target` = jiné místo
+    než `<csv>.rcol` (sdílený výsledek parsování, viz parse_flight), `st` =
+    stat zdroje z doby parsování (rostoucí živý CSV nesmí dostat novější meta).
+    """
+    if st is None:
+        st = os.stat(abs_csv)
+    if rep is None:
+        rep = read_report_columns(abs_csv)
+
+    blocks: List[bytes] = []
+    layout = {}
+    pos = 0
+
+    def add(block: bytes) -> int:
+        nonlocal pos
+        off = pos
+        blocks.append(block)
+        pad = _pad(len(block))
+        if pad:
+            blocks.append(b"\0" * pad)
+        pos += len(block) + pad
+        return off
+
+    for name, dtype in _NUMERIC:
+        arr = np.ascontiguousarray(getattr(rep, name), dtype=dtype)
+        layout[name] = {"offset": add(arr.tobytes()), "dtype": dtype, "count": int(arr.shape[0])}
+
+    for name in _STRINGS:
+        encoded = [s.encode("utf-8") for s in getattr(rep, name)]
+        data = b"".join(encoded)
+        # u32 offsety stačí do 4 GB dat sloupce – poloviční velikost proti u64
+        off_dtype = "<u4" if len(data) < 2 ** 32 else "<u8"
+        offsets = np.zeros(len(encoded) + 1, dtype=off_dtype)
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        layout[name] = {"offsets": add(offsets.tobytes()), "offsets_dtype": off_dtype,
+                        "data": add(data), "count": len(encoded)}
+
+    header = {
+        "version": VERSION,
+        "source_size": st.st_size,
+        "source_mtime_ns": st.st_mtime_ns,
+        "file_name": rep.file_name,
+        "header_note": rep.header_note,
+        "describe_names": rep.describe_names,
+        "describe_raw": rep.describe_raw,
+        "status_labels": rep.status_labels,
+        "summary": rep.summary(),
+        "groups": rep.group_stats(),
+        "columns": layout,
+    }
+    head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(head)) + head
+    prefix += b"\0" * _pad(len(prefix))
+
+    # offsety v hlavičce jsou relativní k začátku dat (za zarovnaným prefixem)
+    target = target or sidecar_path(abs_csv)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-", suffix=SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(prefix)
+            for b in blocks:
+                f.write(b)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return target
+
+
+def _read_header(f) -> tuple[dict, int]:
+    """Hlavička sidecaru od aktuální pozice `f` → (header, začátek dat relativně k ní)."""
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError("not a report sidecar")
+    (head_len,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(head_len).decode("utf-8"))
+    base = len(MAGIC) + 4 + head_len
+    return header, base + _pad(base)
+
+
+def _fresh(header: dict, abs_csv: str) -> bool:
+    try:
+        st = os.stat(abs_csv)
+    except OSError:
+        return False
+    return (header.get("version") == VERSION
+            and header.get("source_size") == st.st_size
+            and header.get("source_mtime_ns") == st.st_mtime_ns)
+
+
+def adopt_source_stamp(abs_csv: str) -> bool:
+    """
+    Kopie CSV stažená odjinud (S3 cache) má mtime stažení – sidecar z uploadu
+    by byl navždy "zastaralý". Sedí-li velikost, převezme se mtime_ns z hlavičky.
+    """
+    try:
+        with open(sidecar_path(abs_csv), "rb") as f:
+            header, _ = _read_header(f)
+        st = os.stat(abs_csv)
+    except (OSError, ValueError, struct.error):
+        return False
+    mtime_ns = header.get("source_mtime_ns")
+    if header.get("version") != VERSION or header.get("source_size") != st.st_size or mtime_ns is None:
+        return False
+    if st.st_mtime_ns != mtime_ns:
+        os.utime(abs_csv, ns=(st.st_atime_ns, mtime_ns))
+    return True
+
+
+def _archived_sidecar(abs_csv: str) -> Optional[tuple[str, dict, dict]]:
+    """
+    Sidecar člena archivu (report_archive) → (tar, index záznam sidecaru, hlavička).
+    Archiv je neměnný, čerstvost = sedí verze a velikost zdrojového člena.
+    """
+    src = member_entry(abs_csv)
+    side = member_entry(sidecar_path(abs_csv))
+    if src is None or side is None:
+        return None
+    tar_abs, entry = side
+    try:
+        with open(tar_abs, "rb") as f:
+            f.seek(entry["offset"])
+            header, _ = _read_header(f)
+    except (OSError, ValueError, struct.error):
+        return None
+    if header.get("version") != VERSION or header.get("source_size") != src[1]["size"]:
+        return None
+    return tar_abs, entry, header
+
+
+def read_sidecar_header(abs_csv: str) -> Optional[dict]:
+    """Jen JSON hlavička (summary, skupiny) – nečte sloupce. None = chybí/zastaralý."""
+    if is_archived(abs_csv):
+        found = _archived_sidecar(abs_csv)
+        return found[2] if found else None
+    try:
+        with open(sidecar_path(abs_csv), "rb") as f:
+            header, _ = _read_header(f)
+    except (OSError, ValueError, struct.error):
+        return None
+    return header if _fresh(header, abs_csv) else None
+
+
+def _open_mmap(abs_csv: str, path: Optional[str] = None) -> Optional[tuple]:
+    """(mmap, hlavička, absolutní offset dat) – samostatný sidecar nebo člen taru."""
+    if path is None and is_archived(abs_csv):
+        found = _archived_sidecar(abs_csv)
+        if found is None:
+            return None
+        tar_abs, entry, header = found
+        try:
+            with open(tar_abs, "rb") as f:
+                f.seek(entry["offset"])
+                _, data_rel = _read_header(f)
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, struct.error):
+            return None
+        return mm, header, entry["offset"] + data_rel
+    try:
+        with open(path or sidecar_path(abs_csv), "rb") as f:
+            header, data_base = _read_header(f)
+            if not _fresh(header, abs_csv):
+                return None
+            # mmap si drží vlastní referenci na soubor, `f` můžeme zavřít
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, struct.error):
+        return None
+    return mm, header, data_base
+
+
+def open_sidecar(abs_csv: str, path: Optional[str] = None) -> Optional[ColumnarReport]:
+    """Otevře čerstvý sidecar přes mmap jako ColumnarReport (sloupce bez kopie)."""
+    opened = _open_mmap(abs_csv, path)
+    if opened is None:
+        return None
+    mm, header, data_base = opened
+
+    cols = header["columns"]
+    numeric = {
+        name: np.frombuffer(mm, dtype=cols[name]["dtype"], count=cols[name]["count"],
+                            offset=data_base + cols[name]["offset"])
+        for name, _ in _NUMERIC
+    }
+    strings = {}
+    for name in _STRINGS:
+        c = cols[name]
+        offsets = np.frombuffer(mm, dtype=c["offsets_dtype"], count=c["count"] + 1,
+                                offset=data_base + c["offsets"])
+        strings[name] = StringColumn(mm, offsets, data_base + c["data"])
+
+    return ColumnarReport(
+        file_name=header["file_name"],
+        header_note=header["header_note"],
+        describe_names=header["describe_names"],
+        describe_raw=header["describe_raw"],
+        describe_codes=numeric["describe_codes"],
+        tests=strings["tests"],
+        status_labels=header["status_labels"],
+        status_codes=numeric["status_codes"],
+        durations=numeric["durations"],
+        timestamps=strings["timestamps"],
+        timestamps_local=strings["timestamps_local"],
+    )
+
+
+def _parse_source(abs_csv: str) -> ColumnarReport:
+    if is_archived(abs_csv):
+        # člen bez sidecaru (nečitelný při archivaci) – parser chce cestu
+        with materialized(abs_csv) as tmp:
+            rep = read_report_columns(tmp)
+        rep.file_name = os.path.basename(abs_csv)
+        return rep
+    return read_report_columns(abs_csv)
+
+
+def _parse_once(abs_csv: str) -> ColumnarReport:
+    """Parsování přes single-flight aplikace (souběžné požadavky sdílí jeden parse)."""
+    flight = current_app.extensions.get("parse_flight") if has_app_context() else None
+    if flight is None:
+        return _parse_source(abs_csv)
+    return flight.load(abs_csv, _parse_source)
+
+
+def load_report_columns(abs_csv: str) -> ColumnarReport:
+    """Sidecar, pokud je čerstvý; jinak parsování CSV."""
+    rep = open_sidecar(abs_csv)
+    cache_event("sidecar", rep is not None)
+    return rep if rep is not None else _parse_once(abs_csv)
+
+
+def load_report_summary(abs_csv: str) -> dict:
+    """Summary z hlavičky sidecaru (pár kB), jinak z CSV."""
+    header = read_sidecar_header(abs_csv)
+    cache_event("sidecar", header is not None)
+    if header is not None:
+        return header["summary"]
+    return _parse_once(abs_csv).summary()
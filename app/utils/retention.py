@@ -0,0 +1,356 @@
+# app/utils/retention.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from flask import current_app
+from sqlalchemy import and_, delete, func, select
+
+from app import db
+from app.models.pdf_model import PdfReport
+from app.models.retention_model import RetentionPolicy
+from app.models.run_model import Run
+from app.models.run_shard_model import RunShard
+from app.models.run_stats_model import RunStats
+from app.models.suite_model import Suite
+from app.utils.live_hub import clear_finished
+from app.utils.pdf_preview import META_SUFFIX, THUMB_SUFFIX, remove_pdf_preview
+from app.utils.report_archive import is_archived, remove_member
+from app.utils.report_sidecar import sidecar_path
+from app.utils.storage_index import KIND_PDFS, KIND_REPORTS, invalidate_index
+from app.utils.suite_health import refresh_suite_health, suites_of_runs
+
+# Retence běhů a PDF podle RetentionPolicy.
+#
+# Mazání je rozdělené tak, aby ani milion souborů nezablokoval SQLite
+# ani nevytížil disk:
+#   1) kandidáti se vyberou set-based dotazem (row_number() po sadách),
+#   2) DB se maže po dávkách `batch` id – každá dávka = krátká transakce,
+#      mezi dávkami se pustí zámek (čtenáři i upload jedou dál),
+#   3) soubory se mažou až po commitu dávky a s limitem `unlink_rate`/s.
+# Pořadí DB → soubory je schválně: osiřelý soubor nevadí (uklidí fsck),
+# řádek ukazující na smazaný soubor by vadil.
+
+DEFAULT_BATCH = 500
+DEFAULT_UNLINK_RATE = 200.0   # souborů za sekundu (0 = bez limitu)
+LOCK_NAME = "retention.lock"
+
+
+@dataclass
+class PurgeResult:
+    runs: int = 0
+    pdfs: int = 0
+    files: int = 0
+    bytes: int = 0
+
+
+class UnlinkThrottle:
+    """Jednoduchý limiter: nejvýš `rate` operací za sekundu (průměrně)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = max(self._next, now - 1.0) + self.interval  # max. 1 s "naspořeno"
+
+
+def _chunks(items: Sequence[int], size: int) -> Iterable[List[int]]:
+    for i in range(0, len(items), size):
+        yield list(items[i:i + size])
+
+
+# ---------- výběr kandidátů ----------
+
+def suite_policies() -> Dict[int, RetentionPolicy]:
+    """sekvence → platné pravidlo (sekvence > sekce > projekt)."""
+    policies = RetentionPolicy.query.all()
+    if not policies:
+        return {}
+    by_suite = {p.suite_id: p for p in policies if p.suite_id is not None}
+    by_project = {p.project_id: p for p in policies if p.suite_id is None}
+
+    out: Dict[int, RetentionPolicy] = {}
+    rows = db.session.query(Suite.id, Suite.parent_id, Suite.project_id).all()
+    for sid, parent_id, project_id in rows:
+        pol = by_suite.get(sid) or (by_suite.get(parent_id) if parent_id else None) or by_project.get(project_id)
+        if pol is not None and (pol.keep_last or pol.keep_days):
+            out[sid] = pol
+    return out
+
+
+def _expired_clause(col_rn, col_created, pol: RetentionPolicy, now: datetime):
+    conds = []
+    if pol.keep_last:
+        conds.append(col_rn > pol.keep_last)
+    if pol.keep_days:
+        conds.append(col_created < now - timedelta(days=pol.keep_days))
+    # běh jde pryč, jen když nesplní ŽÁDNOU z "keep" podmínek
+    return and_(*conds)
+
+
+def _last_failing(suite_ids: Sequence[int]) -> set:
+    """
+    Id posledního běhu s chybou v každé sadě (jeden dotaz). Chyba se bere
+    z RunStats – starší běhy bez statistik doplní `flask reports duration-stats`.
+    """
+    rn = func.row_number().over(partition_by=Run.suite_id,
+                                order_by=(Run.created_at.desc(), Run.id.desc())).label("rn")
+    sub = (select(Run.id, rn)
+           .join(RunStats, RunStats.run_id == Run.id)
+           .where(Run.suite_id.in_(suite_ids), RunStats.failed > 0)
+           .subquery())
+    return {rid for (rid,) in db.session.execute(select(sub.c.id).where(sub.c.rn == 1))}
+
+
+def expired_run_ids(policies: Optional[Dict[int, RetentionPolicy]] = None,
+                    now: Optional[datetime] = None) -> List[int]:
+    """Id běhů, které pravidla retence nepokrývají (od nejstarších)."""
+    policies = suite_policies() if policies is None else policies
+    now = now or datetime.utcnow()
+    groups: Dict[int, List[int]] = {}
+    by_id: Dict[int, RetentionPolicy] = {}
+    for sid, pol in policies.items():
+        groups.setdefault(pol.id, []).append(sid)
+        by_id[pol.id] = pol
+
+    out: List[int] = []
+    for pol_id, suite_ids in groups.items():
+        pol = by_id[pol_id]
+        rn = func.row_number().over(partition_by=Run.suite_id,
+                                    order_by=(Run.created_at.desc(), Run.id.desc())).label("rn")
+        sub = (select(Run.id, Run.created_at, Run.live, rn)
+               .where(Run.suite_id.in_(suite_ids))
+               .subquery())
+        q = (select(sub.c.id)
+             .where(_expired_clause(sub.c.rn, sub.c.created_at, pol, now),
+                    sub.c.live.is_(False))
+             .order_by(sub.c.created_at, sub.c.id))
+        ids = [rid for (rid,) in db.session.execute(q)]
+        if ids and pol.keep_last_failing:
+            keep = _last_failing(suite_ids)
+            ids = [rid for rid in ids if rid not in keep]
+        out.extend(ids)
+    return out
+
+
+def expired_pdf_ids(now: Optional[datetime] = None) -> List[int]:
+    """PDF podle projektových pravidel (suite_id NULL) – keep_last/keep_days na projekt."""
+    now = now or datetime.utcnow()
+    out: List[int] = []
+    for pol in RetentionPolicy.query.filter(RetentionPolicy.suite_id.is_(None)):
+        if not (pol.keep_last or pol.keep_days):
+            continue
+        rn = func.row_number().over(order_by=(PdfReport.created_at.desc(), PdfReport.id.desc())).label("rn")
+        sub = (select(PdfReport.id, PdfReport.created_at, rn)
+               .where(PdfReport.project_id == pol.project_id)
+               .subquery())
+        q = (select(sub.c.id)
+             .where(_expired_clause(sub.c.rn, sub.c.created_at, pol, now))
+             .order_by(sub.c.created_at, sub.c.id))
+        out.extend(rid for (rid,) in db.session.execute(q))
+    return out
+
+
+# ---------- mazání ----------
+
+def _unlink(abs_path: str, throttle: UnlinkThrottle, result: PurgeResult) -> None:
+    throttle.wait()
+    if is_archived(abs_path):
+        remove_member(abs_path)  # člen archivu – místo v taru uvolní až nové zabalení
+        return
+    try:
+        size = os.path.getsize(abs_path)
+        os.remove(abs_path)
+    except OSError:
+        return
+    result.files += 1
+    result.bytes += size
+
+
+def _prune_dirs(dirs: Iterable[str], base: str, keep_depth: int = 2) -> None:
+    """
+    Prázdné složky po smazaných souborech (nejhlubší první). Stejně jako
+    mazání v adminu se zastaví na '<project>/<suite>' (`keep_depth`).
+    """
+    base_real = os.path.realpath(base)
+    for d in sorted(set(dirs), key=len, reverse=True):
+        cur = os.path.realpath(d)
+        while cur.startswith(base_real + os.sep):
+            rel = os.path.relpath(cur, base_real)
+            if len(rel.split(os.sep)) <= keep_depth:
+                break
+            try:
+                os.rmdir(cur)  # smaže jen pokud je prázdná
+            except OSError:
+                break
+            cur = os.path.dirname(cur)
+
+
+def _remote_delete(store, keys: Iterable[str]) -> None:
+    """U vzdáleného úložiště (S3) smaže i objekty – lokálně je to jen cache."""
+    if store is None or store.name == "local":
+        return
+    for key in keys:
+        try:
+            store.delete(key)
+        except Exception:
+            pass
+
+
+def purge_runs(run_ids: Sequence[int], reports_dir: str, batch: int = DEFAULT_BATCH,
+               unlink_rate: float = DEFAULT_UNLINK_RATE, pause: float = 0.0,
+               result: Optional[PurgeResult] = None,
+               log: Optional[Callable[[str], None]] = None, store=None) -> PurgeResult:
+    result = result or PurgeResult()
+    throttle = UnlinkThrottle(unlink_rate)
+    for chunk in _chunks(run_ids, batch):
+        paths = {rel for (rel,) in db.session.query(Run.csv_path).filter(Run.id.in_(chunk))}
+        paths.update(rel for (rel,) in db.session.query(RunShard.csv_path).filter(RunShard.run_id.in_(chunk)))
+        suites = suites_of_runs(chunk)
+        # RunStats / RunShard padají přes ON DELETE CASCADE
+        db.session.execute(delete(Run).where(Run.id.in_(chunk)))
+        refresh_suite_health(suites)
+        db.session.commit()
+        invalidate_index()
+        result.runs += len(chunk)
+
+        dirs = []
+        for rel in paths:
+            abs_path = os.path.join(reports_dir, (rel or "").lstrip("/\\"))
+            _unlink(abs_path, throttle, result)
+            _unlink(sidecar_path(abs_path), throttle, result)
+            clear_finished(abs_path)
+            dirs.append(os.path.dirname(abs_path))
+        _remote_delete(store, (k for rel in paths if rel and not is_archived(rel)
+                               for k in (rel, sidecar_path(rel))))
+        _prune_dirs(dirs, reports_dir)
+        if log:
+            log(f"běhy: smazáno {result.runs}/{len(run_ids)}")
+        if pause:
+            time.sleep(pause)
+    return result
+
+
+def purge_pdfs(pdf_ids: Sequence[int], pdfs_dir: str, batch: int = DEFAULT_BATCH,
+               unlink_rate: float = DEFAULT_UNLINK_RATE, pause: float = 0.0,
+               result: Optional[PurgeResult] = None,
+               log: Optional[Callable[[str], None]] = None, store=None) -> PurgeResult:
+    result = result or PurgeResult()
+    throttle = UnlinkThrottle(unlink_rate)
+    for chunk in _chunks(pdf_ids, batch):
+        paths = [rel for (rel,) in db.session.query(PdfReport.pdf_path).filter(PdfReport.id.in_(chunk))]
+        db.session.execute(delete(PdfReport).where(PdfReport.id.in_(chunk)))
+        db.session.commit()
+        invalidate_index()
+        result.pdfs += len(chunk)
+
+        for rel in paths:
+            abs_path = os.path.join(pdfs_dir, rel)
+            _unlink(abs_path, throttle, result)
+            throttle.wait()
+            remove_pdf_preview(abs_path)
+        _remote_delete(store, (rel + sfx for rel in paths for sfx in ("", THUMB_SUFFIX, META_SUFFIX)))
+        if log:
+            log(f"PDF: smazáno {result.pdfs}/{len(pdf_ids)}")
+        if pause:
+            time.sleep(pause)
+    return result
+
+
+def enforce_retention(config, dry_run: bool = False, batch: Optional[int] = None,
+                      unlink_rate: Optional[float] = None,
+                      log: Optional[Callable[[str], None]] = None) -> PurgeResult:
+    """Jeden průchod retence (CLI i pozadí). Při `dry_run` jen spočítá kandidáty."""
+    batch = batch or config.get("RETENTION_BATCH", DEFAULT_BATCH)
+    rate = config.get("RETENTION_UNLINK_RATE", DEFAULT_UNLINK_RATE) if unlink_rate is None else unlink_rate
+    pause = config.get("RETENTION_PAUSE", 0.0)
+
+    now = datetime.utcnow()
+    run_ids = expired_run_ids(now=now)
+    pdf_ids = expired_pdf_ids(now=now)
+    if dry_run:
+        return PurgeResult(runs=len(run_ids), pdfs=len(pdf_ids))
+
+    result = PurgeResult()
+    stores = current_app.extensions.get("storage", {})
+    purge_runs(run_ids, config["REPORTS_DIR"], batch, rate, pause, result, log, stores.get(KIND_REPORTS))
+    purge_pdfs(pdf_ids, config["PDFS_DIR"], batch, rate, pause, result, log, stores.get(KIND_PDFS))
+    return result
+
+
+# ---------- běh na pozadí ----------
+
+class RetentionWorker:
+    """
+    Periodická retence ve vlákně. Přes víc gunicorn workerů běží jen
+    jedna instance – v procesu, který drží zámek `DATA_DIR/retention.lock`
+    (drží ho, dokud žije; pak ho převezme jiný). Vlákno startuje až první
+    požadavek (`ensure_started`) – CLI příkazy retenci nespouští.
+    """
+
+    def __init__(self, app, interval: float, lock_dir: str):
+        self.app = app
+        self.interval = interval
+        self.lock_path = os.path.join(lock_dir, LOCK_NAME)
+        self._fh = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self.thread = threading.Thread(target=self._run, name="retention", daemon=True)
+
+    def start(self) -> "RetentionWorker":
+        with self._start_lock:
+            if not self._started:
+                self._started = True
+                self.thread.start()
+        return self
+
+    def ensure_started(self) -> None:
+        """before_request hook – spustí vlákno s prvním požadavkem serveru."""
+        if not self._started:
+            self.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _try_lock(self) -> bool:
+        if self._fh is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:  # Windows – bez koordinace, jeden proces
+            self._fh = open(self.lock_path, "a")
+            return True
+        fh = open(self.lock_path, "a")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        self._fh = fh
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if not self._try_lock():
+                continue  # retenci dělá jiný proces
+            try:
+                with self.app.app_context():
+                    res = enforce_retention(self.app.config)
+                    if res.runs or res.pdfs:
+                        self.app.logger.info("Retence: %d běhů, %d PDF, %d souborů (%d B)",
+                                             res.runs, res.pdfs, res.files, res.bytes)
+            except Exception as e:
+                self.app.logger.warning("Retence selhala: %s", e)
@@ -0,0 +1,126 @@
+# app/utils/run_shards.py
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.csv_report import _ms_fmt
+from app.utils.report_archive import report_exists
+from app.utils.report_columns import ColumnarReport, ReportRow
+from app.utils.report_sidecar import SUFFIX as SIDECAR_SUFFIX, load_report_columns
+
+# Běh rozdělený v CI na shardy = víc souborů reportu. Nic se nespojuje do
+# jednoho souboru: každý shard se otevře samostatně (sidecar / parser)
+# a výsledek se skládá k-cestným slučováním:
+#   - řádky: heapq.merge přes shardy podle času (timestamp) – streamovaně
+#   - skupiny a souhrn: součty po shardech (NumPy agregace uvnitř shardu)
+#   - percentily: histogram délek běhu (RunStats.duration_hist), ke kterému
+#     se přičte histogram nového shardu – upload nečte soubory starších shardů
+
+
+def load_shard_reports(run, store, skip_key: Optional[str] = None) -> List[ColumnarReport]:
+    """ColumnarReport každého shardu (chybějící soubory a `skip_key` se přeskočí). `store` = backend reportů."""
+    out = []
+    for sh in run.shards:
+        if sh.shard_key == skip_key:
+            continue
+        abs_path = store.local_path((sh.csv_path or "").lstrip("/\\"), companions=(SIDECAR_SUFFIX,))
+        if abs_path and report_exists(abs_path):
+            out.append(load_report_columns(abs_path))
+    return out
+
+
+def duration_histogram(rep: ColumnarReport) -> Dict[str, int]:
+    """Počty testů podle délky v ms ({"ms": počet}) – JSON do RunStats.duration_hist."""
+    values, counts = np.unique(rep.durations, return_counts=True)
+    return {str(int(v)): int(c) for v, c in zip(values, counts)}
+
+
+def merge_histograms(*hists: Optional[Dict[str, int]]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for h in hists:
+        for k, c in (h or {}).items():
+            out[k] = out.get(k, 0) + c
+    return out
+
+
+def histogram_percentiles(hist: Dict[str, int], qs: Sequence[float] = (50, 90, 99)) -> Dict[str, int]:
+    """Percentily z histogramu – stejné pořadí jako np.percentile(..., method="nearest")."""
+    n = sum(hist.values())
+    if not n:
+        return {f"p{int(q)}": 0 for q in qs}
+    items = sorted((int(k), c) for k, c in hist.items())
+    out: Dict[str, int] = {}
+    for q in qs:
+        rank = int(np.around(q / 100.0 * (n - 1)))
+        seen = 0
+        for value, count in items:
+            seen += count
+            if seen > rank:
+                out[f"p{int(q)}"] = value
+                break
+    return out
+
+
+def merge_summaries(summaries: Sequence[dict]) -> dict:
+    total = sum(s["total"] for s in summaries)
+    passed = sum(s["passed"] for s in summaries)
+    failed = sum(s["failed"] for s in summaries)
+    skipped = sum(s["skipped"] for s in summaries)
+    total_ms = sum(s["duration_ms"] for s in summaries)
+    return {
+        "total": total, "passed": passed, "failed": failed, "skipped": skipped,
+        "pass_rate": round((passed / total * 100.0), 1) if total else 0.0,
+        "duration_ms": total_ms, "duration_fmt": _ms_fmt(total_ms),
+    }
+
+
+def _shard_stream(k: int, rep: ColumnarReport) -> Iterator[tuple]:
+    """Řádky shardu seřazené podle timestamp (stabilně) jako (klíč, shard, index)."""
+    ts = rep.timestamps
+    order = sorted(range(len(rep)), key=ts.__getitem__)
+    for i in order:
+        yield ts[i], k, i
+
+
+def merged_indices(reports: Sequence[ColumnarReport]) -> Iterator[tuple]:
+    """K-cestný merge řádků všech shardů podle času – (shard, index řádku)."""
+    for _ts, k, i in heapq.merge(*(_shard_stream(k, r) for k, r in enumerate(reports))):
+        yield k, i
+
+
+def merged_report(reports: Sequence[ColumnarReport], file_name: Optional[str] = None) -> dict:
+    """Stejná struktura jako parse_report_csv – spojený pohled přes všechny shardy."""
+    groups: Dict[str, dict] = {}
+    for rep in reports:
+        for g in rep.group_stats():
+            acc = groups.setdefault(g["describe"], {
+                "describe": g["describe"], "total": 0, "passed": 0, "failed": 0,
+                "skipped": 0, "duration_ms": 0, "tests": [],
+            })
+            for key in ("total", "passed", "failed", "skipped", "duration_ms"):
+                acc[key] += g[key]
+
+    rows = []
+    for k, i in merged_indices(reports):
+        rep = reports[k]
+        row = ReportRow(rep, i)
+        rows.append(row)
+        groups[rep.describe_names[rep.describe_codes[i]]]["tests"].append(row)
+    for g in groups.values():
+        g["duration_fmt"] = _ms_fmt(g["duration_ms"])
+
+    notes = []
+    for rep in reports:
+        if rep.header_note and rep.header_note not in notes:
+            notes.append(rep.header_note)
+
+    return {
+        "file_name": file_name,
+        "header_note": "\n".join(notes) or None,
+        "rows": rows,
+        "groups": list(groups.values()),
+        "summary": merge_summaries([r.summary() for r in reports]),
+    }
@@ -0,0 +1,164 @@
+# app/utils/slugs.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import UniqueConstraint, insert, or_
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+
+# Přidělování unikátních slugů bez dotazu na každého kandidáta:
+#   1) jeden SELECT vytáhne všechny obsazené "base" a "base-N" ve scope,
+#   2) první volná přípona se vybere v paměti,
+#   3) při konfliktu unikátního indexu slugu (souběžný zápis z jiného workeru)
+#      se savepoint vrátí, slugy se přidělí znovu z čerstvého stavu;
+#      jiné IntegrityError (např. duplicitní jméno projektu) jde hned dál.
+#
+# Hromadné vytváření (seed, import, sync) přidělí slugy všem objektům
+# jedním průchodem – objekty ve stejné dávce si slugy navzájem nepřeberou.
+
+SLUG_RETRIES = 5
+_OR_CHUNK = 200  # kolik bází v jednom OR (limit proměnných SQLite)
+
+
+def _like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def slug_clause(col, bases: Iterable[str]):
+    """WHERE pro všechny sloty `base` a `base-*` zadaných bází."""
+    conds = []
+    for base in bases:
+        conds.append(col == base)
+        conds.append(col.like(f"{_like_escape(base)}-%", escape="\\"))
+    return or_(*conds)
+
+
+def chunked_bases(bases: Iterable[str]) -> Iterable[List[str]]:
+    uniq = sorted(set(bases))
+    for i in range(0, len(uniq), _OR_CHUNK):
+        yield uniq[i:i + _OR_CHUNK]
+
+
+def pick_slug(base: str, taken: set) -> str:
+    """První volný z `base`, `base-2`, `base-3`, … (stejné pořadí jako dřív)."""
+    if base not in taken:
+        return base
+    n = 2
+    while f"{base}-{n}" in taken:
+        n += 1
+    return f"{base}-{n}"
+
+
+def allocate_slugs(objs: Sequence, exclude: Iterable[tuple] = (),
+                   bases: Optional[Sequence[str]] = None) -> None:
+    """
+    Slugy pro objekty jednoho modelu: jeden dotaz na obsazené sloty
+    (`cls.taken_slugs(objs, bases)`) + výběr v paměti. Model dodá
+    `slug_base()` a `slug_scope()` (v čem musí být slug unikátní).
+    """
+    objs = list(objs)
+    if not objs:
+        return
+    bases = list(bases) if bases is not None else [o.slug_base() for o in objs]
+    # bez autoflush – rozpracovaná změna (např. přesun sady) by narazila na starý slug
+    with db.session.no_autoflush:
+        taken_by_scope: Dict[object, set] = type(objs[0]).taken_slugs(objs, bases)
+    for scope, slug in exclude:
+        taken_by_scope.setdefault(scope, set()).add(slug)
+    for obj, base in zip(objs, bases):
+        taken = taken_by_scope.setdefault(obj.slug_scope(), set())
+        obj.slug = pick_slug(base, taken)
+        taken.add(obj.slug)
+
+
+def _insert_rows(cls, objs: Sequence) -> List[dict]:
+    """Řádky pro hromadný INSERT; None u sloupce s defaultem = nechat default."""
+    cols = [c for c in cls.__table__.columns if not c.primary_key]
+    rows = []
+    for obj in objs:
+        row = {}
+        for c in cols:
+            value = getattr(obj, c.key)
+            if value is None and (c.default is not None or c.server_default is not None):
+                continue
+            row[c.key] = value
+        rows.append(row)
+    return rows
+
+
+def _bulk_insert(objs: Sequence) -> None:
+    """
+    Jeden executemany INSERT přes všechny objekty, id se doplní dotazem podle
+    (scope, slug) – ten je unikátní. RETURNING se seřazením podle parametrů
+    by na SQLite spadl zpět na INSERT po řádcích.
+    """
+    cls = type(objs[0])
+    db.session.execute(insert(cls), _insert_rows(cls, objs))
+    scope_cols = [getattr(cls, name) for name in cls.SLUG_SCOPE_COLUMNS]
+    ids = {}
+    slugs = sorted({o.slug for o in objs})
+    for i in range(0, len(slugs), 500):
+        q = db.session.query(cls.id, *scope_cols, cls.slug).filter(cls.slug.in_(slugs[i:i + 500]))
+        for row in q:
+            ids[(tuple(row[1:-1]), row[-1])] = row[0]
+    for obj in objs:
+        obj.id = ids[(tuple(getattr(obj, name) for name in cls.SLUG_SCOPE_COLUMNS), obj.slug)]
+
+
+def _slug_constraint_names(cls) -> set:
+    """Jména unikátních omezení/indexů modelu, ve kterých je sloupec slug."""
+    table = cls.__table__
+    names = {c.name for c in table.constraints if isinstance(c, UniqueConstraint) and "slug" in c.columns}
+    names |= {i.name for i in table.indexes if i.unique and "slug" in i.columns}
+    return {n for n in names if n}
+
+
+def _is_slug_conflict(exc: IntegrityError, classes: Iterable[type]) -> bool:
+    """Narazil zápis na unikátnost slugu? Jiné porušení (např. jméno projektu) se neopakuje."""
+    msg = str(exc.orig)
+    for cls in classes:
+        # PostgreSQL/MySQL uvádí jméno omezení, SQLite sloupce
+        # ("UNIQUE constraint failed: suites.project_id, suites.slug")
+        if any(name in msg for name in _slug_constraint_names(cls)):
+            return True
+        if msg.startswith("UNIQUE constraint failed") and f"{cls.__tablename__}.slug" in msg:
+            return True
+    return False
+
+
+def save_with_unique_slugs(objs: Sequence, attempts: int = SLUG_RETRIES, bulk: bool = False) -> None:
+    """
+    Přidá (u existujících jen flushne) objekty s přidělenými slugy.
+    Konflikt unikátního indexu = souběžný zápis → nové přidělení a další
+    pokus. Commit nechává na volajícím.
+
+    `bulk=True` (nové objekty jednoho modelu): místo unit of work jeden
+    hromadný INSERT; objekty zůstanou mimo session, dostanou jen `id`.
+    """
+    objs = list(objs)
+    groups: Dict[type, list] = {}
+    for obj in objs:
+        groups.setdefault(type(obj), []).append(obj)
+
+    # báze se určí jednou – další pokus nesmí stavět na slugu z minulého
+    bases = {cls: [o.slug_base() for o in items] for cls, items in groups.items()}
+    exclude: Dict[type, set] = {}
+    for attempt in range(attempts):
+        for cls, items in groups.items():
+            allocate_slugs(items, exclude.get(cls, ()), bases[cls])
+        tried = [(type(o), o.slug_scope(), o.slug) for o in objs]
+        try:
+            with db.session.begin_nested():
+                if bulk:
+                    _bulk_insert(objs)
+                else:
+                    db.session.add_all(objs)
+            return
+        except IntegrityError as e:
+            if attempt == attempts - 1 or not _is_slug_conflict(e, groups):
+                raise
+            # snapshot nemusí souběžný řádek vidět – zkusené slugy vyřadíme
+            for cls, scope, slug in tried:
+                exclude.setdefault(cls, set()).add((scope, slug))
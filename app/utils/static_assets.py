@@ -0,0 +1,171 @@
+# app/utils/static_assets.py
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, request, send_file
+
+try:  # volitelné – bez balíčku jen .gz
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Otisky statických souborů bez build kroku:
+#
+#   1) při startu se app/static projde a každý soubor dostane otisk obsahu
+#      (`css/styles2.css` → `css/styles2.3f9a1c0b7d2e.css`),
+#   2) url_for('static', filename=...) přes url_defaults vrací otiskovanou
+#      URL – změna obsahu = nová URL, takže může být `immutable` na rok,
+#   3) textové soubory se předkomprimují do STATIC_CACHE_DIR (.br, .gz;
+#      jméno s otiskem = platí i po restartu) a posílají se podle
+#      Accept-Encoding,
+#   4) neotiskovaná URL (soubor přidaný za běhu, ruční odkaz) jde přes
+#      původní send_static_file s výchozí cache.
+
+FINGERPRINT_LEN = 12
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESS_MIN = 256   # menší soubory se nevyplatí komprimovat
+COMPRESSIBLE = {".css", ".js", ".mjs", ".map", ".svg", ".json", ".txt", ".html", ".xml", ".ico"}
+# (přípona, Content-Encoding) v pořadí preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+@dataclass
+class Asset:
+    path: str                      # absolutní cesta zdroje
+    fingerprint: str
+    mimetype: str
+    variants: Dict[str, str] = field(default_factory=dict)   # encoding → cesta
+
+
+def hashed_name(filename: str, fingerprint: str) -> str:
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{fingerprint}{ext}"
+
+
+def file_fingerprint(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()[:FINGERPRINT_LEN]
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _write_atomic(target: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def precompress(asset: Asset, hashed: str, cache_dir: str) -> None:
+    """Varianty .br/.gz do cache (už existující se jen převezmou)."""
+    encodings = [(enc, suffix) for enc, suffix in ENCODINGS if enc != "br" or brotli is not None]
+    data = None
+    for enc, suffix in encodings:
+        target = os.path.join(cache_dir, hashed + suffix)
+        if not os.path.exists(target):
+            if data is None:
+                with open(asset.path, "rb") as f:
+                    data = f.read()
+            packed = _compress(data, enc)
+            if len(packed) >= len(data) * 0.9:
+                continue
+            _write_atomic(target, packed)
+        asset.variants[enc] = target
+
+
+class AssetManifest:
+    """logická cesta → otiskovaná a zpět; sestaví se jednou při startu."""
+
+    def __init__(self, static_folder: str, cache_dir: Optional[str] = None):
+        self.static_folder = static_folder
+        self.cache_dir = cache_dir
+        self.urls: Dict[str, str] = {}
+        self.assets: Dict[str, Asset] = {}
+        self.build()
+
+    def build(self) -> None:
+        for root, dirs, files in os.walk(self.static_folder):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.static_folder).replace(os.sep, "/")
+                asset = Asset(path=path, fingerprint=file_fingerprint(path),
+                              mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream")
+                hashed = hashed_name(rel, asset.fingerprint)
+                ext = os.path.splitext(name)[1].lower()
+                if (self.cache_dir and ext in COMPRESSIBLE
+                        and os.path.getsize(path) >= COMPRESS_MIN):
+                    try:
+                        precompress(asset, hashed, self.cache_dir)
+                    except OSError:
+                        pass   # bez variant – pošle se originál
+                self.urls[rel] = hashed
+                self.assets[hashed] = asset
+
+    def pick(self, asset: Asset, accept) -> Tuple[str, Optional[str]]:
+        """(cesta, Content-Encoding) podle Accept-Encoding klienta."""
+        for enc, _ in ENCODINGS:
+            path = asset.variants.get(enc)
+            if path and accept[enc] > 0 and os.path.exists(path):
+                return path, enc
+        return asset.path, None
+
+
+def _url_defaults(endpoint: str, values: dict) -> None:
+    if endpoint == "static" and "filename" in values:
+        hashed = current_app.extensions["static_assets"].urls.get(values["filename"])
+        if hashed:
+            values["filename"] = hashed
+
+
+def static_view(filename: str):
+    manifest: AssetManifest = current_app.extensions["static_assets"]
+    asset = manifest.assets.get(filename)
+    if asset is None:
+        return current_app.send_static_file(filename)
+
+    path, encoding = manifest.pick(asset, request.accept_encodings)
+    resp = send_file(path, mimetype=asset.mimetype, conditional=True,
+                     download_name=os.path.basename(asset.path),
+                     etag=f"{asset.fingerprint}-{encoding}" if encoding else asset.fingerprint,
+                     max_age=IMMUTABLE_MAX_AGE)
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    if asset.variants:
+        resp.vary.add("Accept-Encoding")
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    return resp
+
+
+def init_app(app) -> None:
+    """Otisky + předkomprimace (STATIC_FINGERPRINT); jinak Flask static beze změny."""
+    if not app.config.get("STATIC_FINGERPRINT") or not app.static_folder:
+        return
+    app.extensions["static_assets"] = AssetManifest(app.static_folder, app.config.get("STATIC_CACHE_DIR"))
+    app.url_defaults(_url_defaults)
+    app.view_functions["static"] = static_view
@@ -0,0 +1,463 @@
+# app/utils/storage_backend.py
+from __future__ import annotations
+
+import io
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, Optional, Sequence, Union
+
+from flask import Response, current_app, redirect, send_from_directory
+from werkzeug.security import safe_join
+
+from app.utils.metrics import cache_event
+from app.utils.report_archive import is_archived
+from app.utils.report_sidecar import SUFFIX as SIDECAR_SUFFIX, adopt_source_stamp
+from app.utils.storage_index import KIND_PDFS, KIND_REPORTS
+
+try:  # volitelné – jen pro STORAGE_BACKEND=s3
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover
+    boto3 = None
+    ClientError = Exception
+
+# Úložiště souborů za jedním rozhraním (logos / reports / pdfs).
+#
+# Klíč = relativní cesta s "/" (stejná hodnota jako Run.csv_path,
+# PdfReport.pdf_path, Project.logo_path). Dvě implementace:
+#   - LocalStorage – adresář na disku (výchozí, chování jako dřív),
+#   - S3Storage    – S3 kompatibilní bucket (AWS, MinIO, moto); download
+#                    jde přes presigned URL, takže web worker soubor nestreamuje.
+#
+# Parsery, mmap sidecarů a náhledy PDF potřebují lokální soubor –
+# `local_path()` ho vrátí (lokálně přímo, u S3 jako read-through cache),
+# zápisy se dělají do `local_path(create=True)` a publikují přes `put_file()`.
+# Stažený report dostane mtime zdroje ze sidecaru, aby sidecar zůstal čerstvý.
+
+CHUNK = 64 * 1024
+KIND_LOGOS = "logos"
+
+Data = Union[bytes, BinaryIO]
+
+
+@dataclass(frozen=True)
+class StorageObject:
+    key: str
+    size: int
+    mtime: float
+
+
+class StorageBackend(ABC):
+    """Společné rozhraní – implementace přepisují všechny abstraktní metody."""
+
+    name = "base"
+
+    @abstractmethod
+    def put(self, key: str, data: Data, content_type: Optional[str] = None) -> None:
+        raise NotImplementedError
+
+    def put_file(self, key: str, src_path: str, content_type: Optional[str] = None) -> None:
+        with open(src_path, "rb") as f:
+            self.put(key, f, content_type)
+
+    def get(self, key: str) -> bytes:
+        return b"".join(self.stream(key))
+
+    @abstractmethod
+    def stream(self, key: str, chunk_size: int = CHUNK) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Iterator[StorageObject]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def presign(self, key: str, expires: int = 3600) -> Optional[str]:
+        """Dočasná přímá URL na objekt (None = backend neumí, servíruje aplikace)."""
+        return None
+
+    @abstractmethod
+    def local_path(self, key: str, create: bool = False,
+                   companions: Sequence[str] = ()) -> Optional[str]:
+        """
+        Cesta k lokálnímu souboru pro čtení (None = nejde získat), s `create=True`
+        cesta pro zápis (adresáře se založí). `companions` = přípony souborů,
+        které patří ke klíči (např. ".rcol" sidecar) a mají být lokálně taky.
+        """
+        raise NotImplementedError
+
+    def prune_dirs(self, key: str, stop_at: Optional[str] = None) -> None:
+        """Úklid prázdných "adresářů" po smazání (jen tam, kde nějaké jsou)."""
+
+    @abstractmethod
+    def send(self, key: str, max_age: Optional[int] = None, immutable: bool = False,
+             mimetype: Optional[str] = None) -> Response:
+        raise NotImplementedError
+
+
+# ---------- lokální disk ----------
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = safe_join(self.root, (key or "").lstrip("/\\"))
+        if not path:
+            raise FileNotFoundError(key)
+        return path
+
+    def put(self, key: str, data: Data, content_type: Optional[str] = None) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    f.write(data)
+                else:
+                    shutil.copyfileobj(data, f, CHUNK)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def put_file(self, key: str, src_path: str, content_type: Optional[str] = None) -> None:
+        path = self._path(key)
+        if os.path.realpath(src_path) == os.path.realpath(path):
+            return  # zapsáno rovnou na místo (local_path(create=True))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(src_path, path)
+
+    def stream(self, key: str, chunk_size: int = CHUNK) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            while True:
+                block = f.read(chunk_size)
+                if not block:
+                    return
+                yield block
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except (FileNotFoundError, OSError):
+            pass
+
+    def delete_prefix(self, prefix: str) -> int:
+        try:
+            target = os.path.realpath(self._path(prefix))
+        except FileNotFoundError:
+            return 0
+        base = os.path.realpath(self.root)
+        if target == base or os.path.commonpath([base, target]) != base:
+            return 0
+        count = sum(len(files) for _, _, files in os.walk(target))
+        try:
+            shutil.rmtree(target)
+        except OSError:
+            # nechceme blokovat transakci kvůli FS chybě
+            pass
+        return count
+
+    def list(self, prefix: str = "") -> Iterator[StorageObject]:
+        start = self._path(prefix) if prefix else self.root
+        for dirpath, _dirs, files in os.walk(start):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                yield StorageObject(key, st.st_size, st.st_mtime)
+
+    def exists(self, key: str) -> bool:
+        try:
+            return os.path.isfile(self._path(key))
+        except FileNotFoundError:
+            return False
+
+    def local_path(self, key: str, create: bool = False,
+                   companions: Sequence[str] = ()) -> Optional[str]:
+        try:
+            path = self._path(key)
+        except FileNotFoundError:
+            return None
+        if create:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def prune_dirs(self, key: str, stop_at: Optional[str] = None) -> None:
+        """
+        Po smazání souboru/složky zkusí vyčistit prázdné nadřazené složky až po
+        `stop_at` (typicky '<project_slug>' nebo '<project_slug>/<suite_slug>').
+        """
+        cur = safe_join(self.root, (key or "").strip("/"))
+        if not cur:
+            return
+        base_real = os.path.realpath(self.root)
+        stop_abs = safe_join(self.root, (stop_at or "").strip("/")) if stop_at else self.root
+        try:
+            while True:
+                if not cur or os.path.realpath(cur) in (base_real, os.path.realpath(stop_abs)):
+                    break
+                try:
+                    os.rmdir(cur)  # smaže jen pokud je prázdná
+                except FileNotFoundError:
+                    pass  # už smazaný soubor / složka – pokračuj k rodiči
+                except OSError:
+                    break
+                cur = os.path.dirname(cur)
+        except Exception:
+            pass
+
+    def send(self, key: str, max_age: Optional[int] = None, immutable: bool = False,
+             mimetype: Optional[str] = None) -> Response:
+        resp = send_from_directory(self.root, (key or "").lstrip("/\\"), conditional=True,
+                                   max_age=max_age, mimetype=mimetype)
+        if immutable:
+            resp.cache_control.immutable = True
+        return resp
+
+
+# ---------- S3 kompatibilní bucket ----------
+
+class S3Storage(StorageBackend):
+    """
+    Objekty v bucketu pod `prefix`. `cache_dir` = lokální read-through cache
+    pro parsery/mmap (objekty jsou neměnné – jméno nese čas/hash).
+    Stažené a publikované kopie drží proces v LRU s limitem `cache_max_bytes`
+    (0 = bez limitu); rozepsané soubory z local_path(create=True) a archivy
+    LRU nespravuje – jsou jen lokálně.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", cache_dir: Optional[str] = None,
+                 client=None, endpoint_url: Optional[str] = None, region: Optional[str] = None,
+                 presign_expires: int = 300, cache_max_bytes: int = 0):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("STORAGE_BACKEND=s3 vyžaduje balíček boto3")
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.cache_dir = cache_dir or tempfile.mkdtemp(prefix="reporty-s3-")
+        self.presign_expires = presign_expires
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache_max_bytes = cache_max_bytes
+        self._lru: "OrderedDict[str, int]" = OrderedDict()  # stažená kopie -> velikost
+        self._lru_bytes = 0
+        self._lru_lock = threading.Lock()
+
+    def _k(self, key: str) -> str:
+        return self.prefix + (key or "").lstrip("/\\")
+
+    def _cache(self, key: str) -> Optional[str]:
+        return safe_join(self.cache_dir, (key or "").lstrip("/\\"))
+
+    def _lru_touch(self, paths: Sequence[str]) -> None:
+        with self._lru_lock:
+            for path in paths:
+                if path in self._lru:
+                    self._lru.move_to_end(path)
+
+    def _lru_add(self, paths: Sequence[str]) -> None:
+        """Zapíše stažené kopie a nad limitem smaže nejdéle nepoužité (kromě `paths`)."""
+        victims = []
+        with self._lru_lock:
+            for path in paths:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                self._lru_bytes += size - self._lru.pop(path, 0)
+                self._lru[path] = size
+            while self.cache_max_bytes and self._lru_bytes > self.cache_max_bytes:
+                oldest = next(iter(self._lru))
+                if oldest in paths:
+                    break  # právě stažené nevyhazujeme
+                self._lru_bytes -= self._lru.pop(oldest)
+                victims.append(oldest)
+        for path in victims:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _lru_forget(self, prefix: str) -> None:
+        with self._lru_lock:
+            for path in [p for p in self._lru if p == prefix or p.startswith(prefix + os.sep)]:
+                self._lru_bytes -= self._lru.pop(path)
+
+    @staticmethod
+    def _missing(e) -> bool:
+        code = str(getattr(e, "response", {}).get("Error", {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, key: str, data: Data, content_type: Optional[str] = None) -> None:
+        body = io.BytesIO(bytes(data)) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        ctype = content_type or mimetypes.guess_type(key)[0] or "application/octet-stream"
+        self.client.upload_fileobj(body, self.bucket, self._k(key), ExtraArgs={"ContentType": ctype})
+
+    def put_file(self, key: str, src_path: str, content_type: Optional[str] = None) -> None:
+        ctype = content_type or mimetypes.guess_type(key)[0] or "application/octet-stream"
+        self.client.upload_file(src_path, self.bucket, self._k(key), ExtraArgs={"ContentType": ctype})
+        if src_path == self._cache(key):
+            self._lru_add([src_path])  # publikovaná kopie je odteď jen cache
+
+    def stream(self, key: str, chunk_size: int = CHUNK) -> Iterator[bytes]:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self._k(key))
+        except ClientError as e:
+            if self._missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+        yield from obj["Body"].iter_chunks(chunk_size)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._k(key))
+        cached = self._cache(key)
+        if cached:
+            self._lru_forget(cached)
+            try:
+                os.remove(cached)
+            except OSError:
+                pass
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = [{"Key": self._k(o.key)} for o in self.list(prefix)]
+        for i in range(0, len(keys), 1000):  # limit DeleteObjects
+            self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": keys[i:i + 1000], "Quiet": True})
+        cached = self._cache(prefix)
+        if cached and os.path.isdir(cached):
+            self._lru_forget(cached)
+            shutil.rmtree(cached, ignore_errors=True)
+        return len(keys)
+
+    def list(self, prefix: str = "") -> Iterator[StorageObject]:
+        pfx = self._k(prefix.rstrip("/") + "/" if prefix else "")
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=pfx):
+            for o in page.get("Contents", []):
+                yield StorageObject(o["Key"][len(self.prefix):], o["Size"], o["LastModified"].timestamp())
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._k(key))
+        except ClientError as e:
+            if self._missing(e):
+                return False
+            raise
+        return True
+
+    def presign(self, key: str, expires: Optional[int] = None) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._k(key)},
+            ExpiresIn=expires or self.presign_expires,
+        )
+
+    def _download(self, key: str, path: str) -> bool:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._k(key), tmp)
+            os.replace(tmp, path)
+            return True
+        except ClientError as e:
+            if self._missing(e):
+                return False
+            raise
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def local_path(self, key: str, create: bool = False,
+                   companions: Sequence[str] = ()) -> Optional[str]:
+        path = self._cache(key)
+        if not path:
+            return None
+        if create:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return path
+        if is_archived(key):
+            return path  # archivy (flask reports archive) jsou jen v lokální cache
+        cached = os.path.isfile(path)
+        cache_event("s3_local", cached)
+        if not cached and not self._download(key, path):
+            return None
+        downloaded = [] if cached else [path]
+        for suffix in companions:
+            if not os.path.isfile(path + suffix) and self._download(key + suffix, path + suffix):
+                downloaded.append(path + suffix)
+        if downloaded and SIDECAR_SUFFIX in companions:
+            # mtime stažené kopie ≠ mtime zdroje, podle kterého je sidecar čerstvý
+            adopt_source_stamp(path)
+        self._lru_touch([path, *(path + suffix for suffix in companions)])
+        if downloaded:
+            self._lru_add(downloaded)
+        return path
+
+    def send(self, key: str, max_age: Optional[int] = None, immutable: bool = False,
+             mimetype: Optional[str] = None) -> Response:
+        # klient si objekt stáhne přímo z bucketu (Range, ETag řeší S3)
+        resp = redirect(self.presign(key), code=302)
+        resp.cache_control.no_store = True
+        return resp
+
+
+# ---------- továrna ----------
+
+def make_storage(config) -> Dict[str, StorageBackend]:
+    """Backend pro každý druh souborů podle STORAGE_BACKEND (local | s3)."""
+    dirs = {KIND_LOGOS: config["UPLOAD_DIR"], KIND_REPORTS: config["REPORTS_DIR"],
+            KIND_PDFS: config["PDFS_DIR"]}
+    if config.get("STORAGE_BACKEND", "local") != "s3":
+        return {kind: LocalStorage(path) for kind, path in dirs.items()}
+
+    client = None
+    if boto3 is not None:
+        client = boto3.client("s3", endpoint_url=config.get("S3_ENDPOINT_URL"),
+                              region_name=config.get("S3_REGION"))
+    prefix = (config.get("S3_PREFIX") or "").strip("/")
+    # lokální adresáře slouží jako cache (parsery, mmap sidecarů, náhledy PDF)
+    return {
+        kind: S3Storage(config["S3_BUCKET"], prefix=f"{prefix}/{kind}" if prefix else kind,
+                        cache_dir=path, client=client,
+                        presign_expires=config.get("S3_PRESIGN_EXPIRES", 300),
+                        cache_max_bytes=config.get("S3_CACHE_MAX_MB", 0) * 1024 * 1024)
+        for kind, path in dirs.items()
+    }
+
+
+def get_storage(kind: str) -> StorageBackend:
+    return current_app.extensions["storage"][kind]
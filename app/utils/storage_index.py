@@ -0,0 +1,155 @@
+# app/utils/storage_index.py
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app import db
+from app.utils.metrics import cache_event
+from app.models.project_model import Project
+from app.models.run_model import Run
+from app.models.pdf_model import PdfReport
+
+# Top-level adresář v REPORTS_DIR / PDFS_DIR = slug projektu v době uploadu.
+# Index drží mapování "<top dir>" -> vlastník (projekt + zámek), aby kontrola
+# přístupu k souboru byla jen lookup ve slovníku a ne dotaz do DB.
+
+KIND_REPORTS = "reports"
+KIND_PDFS = "pdfs"
+
+_TRACKED = (Project, Run, PdfReport)
+_DIRTY_KEY = "storage_index_dirty"
+
+# globální generace – zvedne se po commitu, který změnil projekty/runy/PDF
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def _bump_generation() -> None:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dirty(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _TRACKED):
+            session.info[_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        _bump_generation()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def invalidate_index() -> None:
+    """
+    Po hromadném DELETE mimo ORM (retence, fsck) – session události ho
+    nevidí, index tohoto procesu se přestaví při dalším dotazu.
+    """
+    index = current_app.extensions.get("storage_index") if has_app_context() else None
+    if index is not None:
+        index.invalidate()
+
+
+@dataclass(frozen=True)
+class StorageOwner:
+    project_id: int
+    slug: str
+    locked: bool
+
+
+def _top_dir(rel_path: str) -> str:
+    return (rel_path or "").lstrip("/\\").split("/", 1)[0]
+
+
+class StorageIndex:
+    """
+    In-memory index vlastníků top-level adresářů úložiště.
+
+    Přestaví se líně při prvním dotazu po změně projektů/runů/PDF (v tomto
+    procesu) nebo po vypršení `ttl` (změny udělané jinými workery).
+    """
+
+    def __init__(self, ttl: float = 30.0, miss_rebuild_interval: float = 1.0):
+        self.ttl = ttl
+        self.miss_rebuild_interval = miss_rebuild_interval
+        self._lock = threading.Lock()
+        self._maps: Dict[str, Dict[str, StorageOwner]] = {KIND_REPORTS: {}, KIND_PDFS: {}}
+        self._built_generation = -1
+        self._built_at = 0.0
+
+    def _stale(self) -> bool:
+        return (self._built_generation != _generation
+                or time.monotonic() - self._built_at > self.ttl)
+
+    def _build(self) -> None:
+        generation = _generation
+        owners: Dict[int, StorageOwner] = {}
+        by_slug: Dict[str, StorageOwner] = {}
+        for pid, slug, pass_hash in db.session.query(Project.id, Project.slug, Project.passphrase_hash):
+            owner = StorageOwner(project_id=pid, slug=slug, locked=bool(pass_hash))
+            owners[pid] = owner
+            by_slug[slug] = owner
+
+        maps: Dict[str, Dict[str, StorageOwner]] = {}
+        for kind, model, column in ((KIND_REPORTS, Run, Run.csv_path),
+                                    (KIND_PDFS, PdfReport, PdfReport.pdf_path)):
+            # aktuální slugy + historické top-level adresáře z uložených cest
+            m = dict(by_slug)
+            top = func.substr(column, 1, func.instr(column, "/") - 1)
+            rows = (db.session.query(top, model.project_id)
+                    .filter(func.instr(column, "/") > 0)
+                    .group_by(top, model.project_id)
+                    .all())
+            for top_dir, pid in rows:
+                owner = owners.get(pid)
+                if top_dir and owner:
+                    m[top_dir] = owner
+            maps[kind] = m
+
+        self._maps = maps
+        self._built_generation = generation
+        self._built_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._built_generation = -1
+
+    def owner(self, kind: str, rel_path: str) -> Optional[StorageOwner]:
+        """Vrátí vlastníka souboru podle relativní cesty (nebo None)."""
+        top = _top_dir(rel_path)
+        if not top:
+            return None
+
+        rebuilt = False
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self._build()
+                    rebuilt = True
+
+        found = self._maps.get(kind, {}).get(top)
+        if found is None and time.monotonic() - self._built_at > self.miss_rebuild_interval:
+            # adresář mohl vzniknout v jiném workeru – jednou zkusíme přestavět
+            with self._lock:
+                if time.monotonic() - self._built_at > self.miss_rebuild_interval:
+                    self._build()
+                    rebuilt = True
+            found = self._maps.get(kind, {}).get(top)
+        cache_event("storage_index", not rebuilt)
+        return found
@@ -0,0 +1,186 @@
+# app/utils/suite_health.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models.project_model import Project
+from app.models.run_model import Run
+from app.models.run_stats_model import RunStats
+from app.models.suite_health_model import SuiteHealth
+from app.models.suite_model import Suite
+
+# Dashboard přes všechny projekty nad materializovanou tabulkou suite_health:
+#
+#   - řádek na sekvenci = poslední běh (id, čas, live) + jeho čítače z RunStats,
+#   - přepočet `refresh_suite_health(suite_ids)` volá každý ingest a mazání
+#     běhů (upload, shard, živý běh, import, retence, fsck) ve stejné
+#     transakci – poslední běh sady = jeden krok indexem ix_runs_suite_created,
+#   - mazání sady/projektu řeší ON DELETE CASCADE,
+#   - dashboard = projects ⋈ suites ⋈ suite_health, jen přes indexy/PK.
+#
+# `flask reports health-rebuild` přepočítá všechny sady (oprava po ručních zásazích).
+
+_CHUNK = 500
+
+STATUS_NONE = "none"       # sekvence bez běhu
+STATUS_LIVE = "live"
+STATUS_FAILED = "failed"
+STATUS_PASSED = "passed"
+STATUS_EMPTY = "empty"     # běh bez testů / bez statistik
+
+
+def _chunks(ids: Sequence[int], size: int = _CHUNK):
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def refresh_suite_health(suite_ids: Iterable[int]) -> None:
+    """Přepočítá řádky suite_health daných sad (commit nechává na volajícím)."""
+    ids = sorted({int(s) for s in suite_ids if s is not None})
+    if not ids:
+        return
+    db.session.flush()
+    now = datetime.utcnow()
+    prev = aliased(Run)
+    for chunk in _chunks(ids):
+        latest = (select(prev.id)
+                  .where(prev.suite_id == Suite.id)
+                  .order_by(prev.created_at.desc(), prev.id.desc())
+                  .limit(1)
+                  .correlate(Suite)
+                  .scalar_subquery())
+        q = (select(Suite.id, Run.id, Run.created_at, Run.live,
+                    RunStats.total, RunStats.passed, RunStats.failed, RunStats.skipped,
+                    RunStats.duration_ms)
+             .select_from(Suite)
+             .join(Run, Run.id == latest)
+             .outerjoin(RunStats, RunStats.run_id == Run.id)
+             .where(Suite.id.in_(chunk)))
+        rows = [
+            {"suite_id": sid, "last_run_id": run_id, "last_run_at": created_at, "live": bool(live),
+             "total": total, "passed": passed, "failed": failed, "skipped": skipped,
+             "duration_ms": duration_ms, "updated_at": now}
+            for sid, run_id, created_at, live, total, passed, failed, skipped, duration_ms
+            in db.session.execute(q)
+        ]
+        # sady bez běhů řádek nemají – delete + insert pokryje i je
+        db.session.execute(delete(SuiteHealth).where(SuiteHealth.suite_id.in_(chunk)))
+        if rows:
+            db.session.execute(insert(SuiteHealth), rows)
+
+
+def rebuild_suite_health() -> int:
+    """Přepočet všech sad s běhy; vrací počet řádků."""
+    db.session.execute(delete(SuiteHealth))
+    suite_ids = [s for (s,) in db.session.query(Run.suite_id).distinct()]
+    refresh_suite_health(suite_ids)
+    return len(suite_ids)
+
+
+def suites_of_runs(run_ids: Sequence[int]) -> set:
+    out = set()
+    for chunk in _chunks(list(run_ids)):
+        out.update(s for (s,) in db.session.query(Run.suite_id).filter(Run.id.in_(chunk)).distinct())
+    return out
+
+
+@dataclass
+class HealthRow:
+    project_id: int
+    project_name: str
+    project_slug: str
+    suite_id: Optional[int]
+    section_name: Optional[str]
+    suite_name: Optional[str]
+    last_run_id: Optional[int]
+    last_run_at: Optional[datetime]
+    live: bool
+    total: Optional[int]
+    passed: Optional[int]
+    failed: Optional[int]
+    skipped: Optional[int]
+
+    @property
+    def status(self) -> str:
+        if self.last_run_id is None:
+            return STATUS_NONE
+        if self.live:
+            return STATUS_LIVE
+        if self.failed:
+            return STATUS_FAILED
+        return STATUS_PASSED if self.total else STATUS_EMPTY
+
+    @property
+    def pass_rate(self) -> Optional[float]:
+        """Podíl prošlých testů posledního běhu v % (None = bez statistik)."""
+        if not self.total:
+            return None
+        return round(100.0 * (self.passed or 0) / self.total, 1)
+
+
+@dataclass
+class ProjectHealth:
+    project_id: int
+    name: str
+    slug: str
+    rows: List[HealthRow]
+
+    @property
+    def failing(self) -> int:
+        return sum(1 for r in self.rows if r.status == STATUS_FAILED)
+
+    @property
+    def failed_tests(self) -> int:
+        return sum(r.failed or 0 for r in self.rows)
+
+    @property
+    def last_run_at(self) -> Optional[datetime]:
+        return max((r.last_run_at for r in self.rows if r.last_run_at), default=None)
+
+
+def dashboard(q: str = "", failing_only: bool = False) -> List[ProjectHealth]:
+    """Všechny projekty a jejich sekvence se stavem posledního běhu – jeden dotaz."""
+    seq = aliased(Suite)
+    section = aliased(Suite)
+    stmt = (select(Project.id, Project.name, Project.slug, seq.id, section.name, seq.name,
+                   SuiteHealth.last_run_id, SuiteHealth.last_run_at, SuiteHealth.live,
+                   SuiteHealth.total, SuiteHealth.passed, SuiteHealth.failed, SuiteHealth.skipped)
+            .select_from(Project)
+            .outerjoin(seq, (seq.project_id == Project.id) & seq.parent_id.isnot(None))
+            .outerjoin(section, section.id == seq.parent_id)
+            .outerjoin(SuiteHealth, SuiteHealth.suite_id == seq.id)
+            .order_by(Project.name, Project.id, section.order_index, section.name,
+                      seq.order_index, seq.name))
+    if q:
+        stmt = stmt.where(Project.name.ilike(f"%{q}%"))
+    if failing_only:
+        stmt = stmt.where(SuiteHealth.failed > 0, SuiteHealth.live.is_(False))
+
+    projects: List[ProjectHealth] = []
+    for row in db.session.execute(stmt):
+        hr = HealthRow(*row)
+        if not projects or projects[-1].project_id != hr.project_id:
+            projects.append(ProjectHealth(hr.project_id, hr.project_name, hr.project_slug, []))
+        if hr.suite_id is not None:
+            projects[-1].rows.append(hr)
+    return projects
+
+
+def time_ago(dt: Optional[datetime], now: Optional[datetime] = None) -> str:
+    """'před 5 min' pro UTC čas z DB (Jinja filtr `ago`)."""
+    if dt is None:
+        return "—"
+    secs = max(0, int(((now or datetime.utcnow()) - dt).total_seconds()))
+    if secs < 60:
+        return "právě teď"
+    if secs < 3600:
+        return f"před {secs // 60} min"
+    if secs < 86400:
+        return f"před {secs // 3600} h"
+    return f"před {secs // 86400} d"
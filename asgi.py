@@ -0,0 +1,5 @@
+from app import create_app
+from app.asgi import FlaskASGI
+
+# uvicorn asgi:app  (viz app/asgi.py)
+app = FlaskASGI(create_app())
@@ -0,0 +1,179 @@
+"""
+Benchmark: souběžná pomalá spojení – WSGI (gunicorn sync) vs. ASGI (uvicorn + app/asgi.py).
+
+Spuštění (z kořene repa, potřebuje gunicorn a uvicorn):
+    python -m benchmarks.asgi_concurrency --slow 200 --probes 50
+
+Scénář: `--slow` klientů stáhne velký report (`/storage/reports/...`) a čte
+ho schválně pomalu (pár kB/s) – jako mobilní klient nebo otevřený SSE
+stream. Mezitím měříme latenci `--probes` obyčejných requestů (úvodní stránka `/`).
+
+Sync worker drží jedno spojení po celou dobu přenosu, takže jakmile je
+pomalých klientů víc než workerů, ostatní requesty čekají ve frontě
+(nebo vyprší). ASGI adaptér čte soubor po blocích v thread poolu a na
+pomalého klienta čeká v event loopu, proby odpovídají hned.
+
+Naměřeno (1 vCPU, 2 procesy na obou stranách, 20MB report, --slow 200 --probes 50):
+
+    server                        probe p50  probe p95  probe OK   pomalých s hlavičkou
+    gunicorn -w 2 (sync)            timeout    timeout     0/50               2/200
+    uvicorn --workers 2 (asgi)     137.3 ms   139.2 ms    50/50             200/200
+
+(latence ASGI je hlavně 50 souběžných renderů úvodní stránky na jednom jádru)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _prepare(tmp: str, size_mb: int) -> str:
+    """Projekt bez hesla + velký CSV report, vrátí jeho relativní cestu."""
+    os.environ.update(
+        DATA_DIR=tmp, SQLITE_PATH=os.path.join(tmp, "app.db"),
+        UPLOAD_DIR=os.path.join(tmp, "logos"), REPORTS_DIR=os.path.join(tmp, "reports"),
+        PDFS_DIR=os.path.join(tmp, "pdfs"), ADMIN_PASSWORD="bench",
+    )
+    sys.path.insert(0, ROOT)
+    from app import create_app, db
+    from app.models.project_model import Project, ProjectType
+    from app.models.run_model import Run
+    from app.models.suite_model import Suite
+    from benchmarks.fixtures import write_csv
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        p = Project(name="bench-asgi", type=ProjectType.e2e)
+        p.ensure_unique_slug()
+        db.session.add(p)
+        db.session.flush()
+        sec = Suite(project_id=p.id, name="sec")
+        sec.ensure_unique_slug()
+        db.session.add(sec)
+        db.session.flush()
+        seq = Suite(project_id=p.id, parent_id=sec.id, name="seq")
+        seq.ensure_unique_slug()
+        db.session.add(seq)
+        db.session.flush()
+        rel = f"{p.slug}/{seq.slug}/big.csv"
+        abs_path = os.path.join(os.environ["REPORTS_DIR"], rel)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        rows = max(1, size_mb * 1024 * 1024 // 80)
+        write_csv(abs_path, rows)
+        db.session.add(Run(project_id=p.id, suite_id=seq.id, label="big", csv_path=rel))
+        db.session.commit()
+    return rel
+
+
+async def _slow_client(port: int, path: str, rate_kb: float, hold: float, got_headers: list):
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    except OSError:
+        return
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    deadline = time.monotonic() + hold
+    try:
+        first = await asyncio.wait_for(reader.read(4096), timeout=hold)
+        if first.startswith(b"HTTP/1.1 200"):
+            got_headers.append(1)
+        while time.monotonic() < deadline:
+            await asyncio.sleep(1.0)
+            if not await reader.read(int(rate_kb * 1024)):
+                break
+    except (asyncio.TimeoutError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _probe(port: int, timeout: float) -> float | None:
+    t0 = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+        writer.write(b"GET / HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+    except (asyncio.TimeoutError, OSError):
+        return None
+    return (time.perf_counter() - t0) * 1000 if data.startswith(b"HTTP/1.1 200") else None
+
+
+async def _scenario(port: int, rel: str, slow: int, probes: int, hold: float, timeout: float):
+    got_headers: list = []
+    slow_tasks = [asyncio.ensure_future(_slow_client(port, f"/storage/reports/{rel}", 4, hold, got_headers))
+                  for _ in range(slow)]
+    await asyncio.sleep(2.0)  # pomalí klienti obsadí server
+    lat = await asyncio.gather(*(_probe(port, timeout) for _ in range(probes)))
+    await asyncio.gather(*slow_tasks)
+    return lat, len(got_headers)
+
+
+def _serve(cmd: list, env: dict, port: int):
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+    import socket
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server se nespustil: {' '.join(cmd)}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--slow", type=int, default=200, help="počet pomalých klientů")
+    ap.add_argument("--probes", type=int, default=50, help="počet měřených requestů")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--size-mb", type=int, default=20, help="velikost stahovaného reportu")
+    ap.add_argument("--hold", type=float, default=15.0, help="s – jak dlouho pomalí klienti čtou")
+    ap.add_argument("--timeout", type=float, default=10.0, help="s – timeout proby")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="reporty-asgi-")
+    try:
+        rel = _prepare(tmp, args.size_mb)
+        env = dict(os.environ)
+        bindir = os.path.dirname(sys.executable)
+        servers = [
+            ("gunicorn -w %d (sync)" % args.workers, 8801,
+             [os.path.join(bindir, "gunicorn"), "-w", str(args.workers), "-b", "127.0.0.1:8801", "wsgi:app"]),
+            ("uvicorn --workers %d (asgi)" % args.workers, 8802,
+             [os.path.join(bindir, "uvicorn"), "asgi:app", "--workers", str(args.workers),
+              "--port", "8802", "--log-level", "warning"]),
+        ]
+        print(f"{'server':28} {'probe p50':>10} {'probe p95':>10} {'probe OK':>9} {'pomalých s hlavičkou':>22}")
+        for name, port, cmd in servers:
+            proc = _serve(cmd, env, port)
+            try:
+                lat, headers = asyncio.run(_scenario(port, rel, args.slow, args.probes, args.hold, args.timeout))
+            finally:
+                os.killpg(proc.pid, signal.SIGTERM)
+                proc.wait()
+            ok = sorted(x for x in lat if x is not None)
+            if len(ok) == len(lat):
+                p50 = f"{statistics.median(ok):.1f} ms"
+                p95 = f"{ok[int(0.95 * (len(ok) - 1))]:.1f} ms"
+            else:
+                p50 = p95 = "timeout"
+            print(f"{name:28} {p50:>10} {p95:>10} {len(ok):>5}/{len(lat):<3} {headers:>14}/{args.slow}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
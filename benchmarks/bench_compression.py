@@ -0,0 +1,70 @@
+# benchmarks/bench_compression.py – komprese velkých stránek (report_view 5 MB+)
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from benchmarks import fixtures
+
+# Odhad přenosu = čas serveru + bajty / šířka pásma (B/s). Test client
+# neposílá po síti, proto se přenos modeluje a ukládá do extra_info.
+BANDWIDTHS = {"10mbit": 10e6 / 8, "100mbit": 100e6 / 8, "1gbit": 1e9 / 8}
+PAGE_MIN_BYTES = 5 * 1024 * 1024
+REPORT_ROWS = 12_000
+
+
+@pytest.fixture(scope="module")
+def big_report(app, client, seeded):
+    rel = f"{seeded['project_slug']}/compression/report-{REPORT_ROWS}.csv"
+    fixtures.write_csv(os.path.join(app.config["REPORTS_DIR"], rel), REPORT_ROWS)
+    url = f"/report?file={rel}"
+    page = client.get(url).data
+    assert len(page) >= PAGE_MIN_BYTES, len(page)
+    return url, page
+
+
+def _transfer(seconds: float, nbytes: int) -> dict:
+    return {f"est_{name}_s": round(seconds + nbytes / bw, 4) for name, bw in BANDWIDTHS.items()}
+
+
+def _median(benchmark):
+    """Medián měření; s --benchmark-disable se neměří (stats je None)."""
+    return benchmark.stats.stats.median if benchmark.stats is not None else None
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip", "br"])
+def bench_report_view_encoding(benchmark, client, big_report, encoding):
+    """Celý požadavek (parse + render + komprese) a odhad doby přenosu."""
+    url, page = big_report
+
+    def get():
+        resp = client.get(url, headers={"Accept-Encoding": encoding})
+        assert resp.status_code == 200
+        return resp
+
+    resp = benchmark.pedantic(get, rounds=5, iterations=1, warmup_rounds=1)
+    wire = len(resp.data)
+    assert (resp.headers.get("Content-Encoding") or "identity") == encoding
+    took = _median(benchmark)
+    benchmark.extra_info.update(page_bytes=len(page), wire_bytes=wire,
+                                ratio=round(wire / len(page), 4),
+                                **(_transfer(took, wire) if took is not None else {}))
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def bench_compress_page(benchmark, app, big_report, encoding):
+    """Jen komprese 5 MB+ stránky – musí se vyplatit už na 100 Mbit/s."""
+    from app.utils.compression import compress_bytes
+
+    _, page = big_report
+    level = app.config["COMPRESS_BR_LEVEL"] if encoding == "br" else app.config["COMPRESS_GZIP_LEVEL"]
+    out = benchmark.pedantic(compress_bytes, args=(page, encoding, level), rounds=5, iterations=1)
+    benchmark.extra_info.update(page_bytes=len(page), wire_bytes=len(out))
+    took = _median(benchmark)
+    if took is None:
+        return
+    raw_100 = len(page) / BANDWIDTHS["100mbit"]
+    packed_100 = took + len(out) / BANDWIDTHS["100mbit"]
+    benchmark.extra_info.update(raw_100mbit_s=round(raw_100, 4), compressed_100mbit_s=round(packed_100, 4))
+    assert packed_100 < raw_100
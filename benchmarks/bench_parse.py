@@ -0,0 +1,46 @@
+# benchmarks/bench_parse.py – parse_report_csv nad syntetickými CSV
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from benchmarks import fixtures
+from app.utils.csv_report import parse_report_csv
+
+
+@pytest.mark.parametrize("rows", fixtures.scale()["csv_rows"], ids=lambda n: f"{n}rows")
+def bench_parse_report_csv(benchmark, csv_dir, rows):
+    path = fixtures.write_csv(os.path.join(csv_dir, f"report-{rows}.csv"), rows)
+    benchmark.extra_info.update(rows=rows, bytes=os.path.getsize(path))
+    rounds = 3 if rows >= 100_000 else 10
+    rep = benchmark.pedantic(parse_report_csv, args=(path,), rounds=rounds, iterations=1, warmup_rounds=1)
+    assert rep["summary"]["total"] == rows
+
+
+@pytest.mark.parametrize("rows", fixtures.scale()["csv_rows"], ids=lambda n: f"{n}rows")
+def bench_columnar_aggregate(benchmark, csv_dir, rows):
+    """Agregace nad sloupcovým modelem (bez parsování CSV)."""
+    from app.utils.report_columns import read_report_columns
+
+    path = fixtures.write_csv(os.path.join(csv_dir, f"report-{rows}.csv"), rows)
+    rep = read_report_columns(path)
+    benchmark.extra_info.update(rows=rows)
+
+    def aggregate():
+        return rep.summary(), rep.group_stats(), rep.percentiles(), rep.slowest(20)
+
+    summary, *_ = benchmark(aggregate)
+    assert summary["total"] == rows
+
+
+@pytest.mark.parametrize("rows", fixtures.scale()["csv_rows"], ids=lambda n: f"{n}rows")
+def bench_sidecar_open(benchmark, csv_dir, rows):
+    """Otevření rozparsovaného reportu z binárního sidecaru (mmap)."""
+    from app.utils.report_sidecar import open_sidecar, write_sidecar
+
+    path = fixtures.write_csv(os.path.join(csv_dir, f"report-{rows}.csv"), rows)
+    write_sidecar(path)
+    benchmark.extra_info.update(rows=rows, bytes=os.path.getsize(path + ".rcol"))
+    rep = benchmark(open_sidecar, path)
+    assert rep is not None and len(rep) == rows
@@ -0,0 +1,75 @@
+# benchmarks/bench_views.py – end-to-end přes Flask test client
+from __future__ import annotations
+
+import io
+import os
+
+import pytest
+
+from benchmarks import fixtures
+from benchmarks.conftest import RUN_CSV_ROWS, RUNS_WITH_CSV
+
+
+def _get(client, url, expect=200):
+    resp = client.get(url)
+    assert resp.status_code == expect, (url, resp.status_code)
+    return resp
+
+
+def bench_project_detail(benchmark, client, seeded):
+    url = f"/projects/{seeded['project_slug']}"
+    benchmark.extra_info.update(suites=220)
+    benchmark(_get, client, url)
+
+
+def bench_runs_list(benchmark, client, seeded):
+    url = f"/projects/{seeded['project_id']}/suites/{seeded['suite_id']}/runs"
+    benchmark.extra_info.update(runs=RUNS_WITH_CSV, rows_per_run=RUN_CSV_ROWS)
+    benchmark(_get, client, url)
+
+
+def bench_admin_runs_list(benchmark, admin_client, seeded):
+    url = f"/admin/projects/{seeded['project_id']}/suites/{seeded['suite_id']}/runs"
+    benchmark(_get, admin_client, url)
+
+
+@pytest.mark.parametrize("rows", [1_000, 100_000], ids=lambda n: f"{n}rows")
+def bench_report_view(benchmark, app, client, seeded, rows):
+    rel = f"{seeded['project_slug']}/report-view/report-{rows}.csv"
+    fixtures.write_csv(os.path.join(app.config["REPORTS_DIR"], rel), rows)
+    benchmark.extra_info.update(rows=rows)
+    benchmark.pedantic(_get, args=(client, f"/report?file={rel}"), rounds=5, iterations=1, warmup_rounds=1)
+
+
+def bench_admin_dashboard(benchmark, app, admin_client, seeded):
+    from app import db
+    from app.utils.suite_health import rebuild_suite_health
+
+    # seed vkládá běhy hromadně mimo ingest – materializovaný stav se dopočítá jednou
+    with app.app_context():
+        n = rebuild_suite_health()
+        db.session.commit()
+    benchmark.extra_info.update(suites_with_runs=n)
+    benchmark(_get, admin_client, "/admin/dashboard")
+
+
+def bench_runs_upload(benchmark, admin_client, seeded):
+    payload = fixtures.make_csv_text(10_000).encode("utf-8")
+    url = f"/admin/projects/{seeded['project_id']}/suites/{seeded['suite_id']}/runs"
+    benchmark.extra_info.update(rows=10_000, bytes=len(payload))
+
+    def upload():
+        resp = admin_client.post(url, data={"csv": (io.BytesIO(payload), "upload.csv"), "label": "bench",
+                                            "next": "/"},
+                                 content_type="multipart/form-data")
+        assert resp.status_code == 303
+
+    benchmark.pedantic(upload, rounds=10, iterations=1)
+
+
+def bench_web_pdf_list(benchmark, client, seeded):
+    benchmark(_get, client, f"/projects/{seeded['web_id']}/pdfs")
+
+
+def bench_storage_pdf_download(benchmark, client, seeded):
+    benchmark(_get, client, f"/storage/pdfs/{seeded['pdf_path']}")
@@ -0,0 +1,144 @@
+# benchmarks/conftest.py
+"""
+Sdílené fixtures pro benchmarky: dočasné úložiště + SQLite, syntetické
+projekty/sady/běhy, CSV reporty a PDF. Velikost řídí REPORTY_BENCH_SCALE
+(small | full), viz fixtures.SCALES.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Konfigurace musí být v env dřív, než se importuje app (create_app ji čte z os.environ).
+_TMP = tempfile.mkdtemp(prefix="reporty-bench-")
+os.environ.update(
+    DATA_DIR=_TMP,
+    SQLITE_PATH=os.path.join(_TMP, "app.db"),
+    UPLOAD_DIR=os.path.join(_TMP, "logos"),
+    REPORTS_DIR=os.path.join(_TMP, "reports"),
+    PDFS_DIR=os.path.join(_TMP, "pdfs"),
+    ADMIN_PASSWORD="bench",
+    MAX_CONTENT_LENGTH_MB="512",
+)
+
+from benchmarks import fixtures  # noqa: E402
+
+RUNS_WITH_CSV = 30      # běhy v měřené sekvenci, každý s reálným CSV
+RUN_CSV_ROWS = 1_000
+PDF_COUNT = 50
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app, db
+
+    app = create_app({"TESTING": True, "WTF_CSRF_ENABLED": False})
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture(scope="session")
+def seeded(app):
+    """Naplní DB: bulk projekty/sady/běhy + jeden měřený E2E a WEB projekt."""
+    from app import db
+    from app.models.project_model import Project, ProjectType, Visibility
+    from app.models.suite_model import Suite
+    from app.models.run_model import Run
+    from app.models.pdf_model import PdfReport
+
+    sc = fixtures.scale()
+    with app.app_context():
+        s = db.session
+        fixtures.bulk_insert(s, Project, (
+            {"name": f"bulk-{i}", "slug": f"bulk-{i}", "type": ProjectType.e2e,
+             "visibility": Visibility.public}
+            for i in range(sc["projects"])
+        ))
+        first_pid = s.query(db.func.min(Project.id)).scalar()
+        fixtures.bulk_insert(s, Suite, (
+            {"project_id": first_pid + (i % sc["projects"]), "parent_id": None,
+             "name": f"suite-{i}", "slug": f"suite-{i}", "order_index": i, "is_active": True}
+            for i in range(sc["suites"])
+        ))
+        first_sid = s.query(db.func.min(Suite.id)).scalar()
+        fixtures.bulk_insert(s, Run, (
+            {"project_id": first_pid + (i % sc["suites"]) % sc["projects"],
+             "suite_id": first_sid + (i % sc["suites"]),
+             "label": f"run-{i}", "csv_path": f"bulk/missing/{i}.csv"}
+            for i in range(sc["runs"])
+        ))
+
+        # měřený E2E projekt: 20 sekcí × 10 sekvencí, jedna sekvence s reálnými CSV
+        proj = Project(name="bench-e2e", slug="bench-e2e", type=ProjectType.e2e,
+                       visibility=Visibility.public)
+        s.add(proj)
+        s.flush()
+        sections = [Suite(project_id=proj.id, name=f"sec-{i}", slug=f"sec-{i}", order_index=i)
+                    for i in range(20)]
+        s.add_all(sections)
+        s.flush()
+        seqs = [Suite(project_id=proj.id, parent_id=sec.id, name=f"seq-{j}", slug=f"seq-{j}", order_index=j)
+                for sec in sections for j in range(10)]
+        s.add_all(seqs)
+        s.flush()
+        target = seqs[0]
+        reports_dir = app.config["REPORTS_DIR"]
+        rel_paths = []
+        for k in range(RUNS_WITH_CSV):
+            rel = f"{proj.slug}/{target.slug}/run-{k:03d}.csv"
+            fixtures.write_csv(os.path.join(reports_dir, rel), RUN_CSV_ROWS, seed=k)
+            s.add(Run(project_id=proj.id, suite_id=target.id, label=f"run {k}", csv_path=rel))
+            rel_paths.append(rel)
+
+        # WEB projekt s PDF
+        web = Project(name="bench-web", slug="bench-web", type=ProjectType.web,
+                      visibility=Visibility.public)
+        s.add(web)
+        s.flush()
+        pdf_bytes = fixtures.make_pdf_bytes(pages=5)
+        pdf_dir = os.path.join(app.config["PDFS_DIR"], web.slug)
+        os.makedirs(pdf_dir, exist_ok=True)
+        for k in range(PDF_COUNT):
+            rel = f"{web.slug}/doc-{k:03d}.pdf"
+            with open(os.path.join(app.config["PDFS_DIR"], rel), "wb") as f:
+                f.write(pdf_bytes)
+            s.add(PdfReport(project_id=web.id, label=f"doc {k}", pdf_path=rel, size=len(pdf_bytes)))
+        s.commit()
+
+        return {
+            "project_id": proj.id, "project_slug": proj.slug, "suite_id": target.id,
+            "report_paths": rel_paths, "web_id": web.id,
+            "pdf_path": f"{web.slug}/doc-000.pdf",
+        }
+
+
+@pytest.fixture(scope="session")
+def client(app, seeded):
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def admin_client(app, seeded):
+    c = app.test_client()
+    resp = c.post("/admin/login", data={"password": "bench"})
+    assert resp.status_code == 302
+    return c
+
+
+@pytest.fixture(scope="session")
+def csv_dir():
+    path = os.path.join(_TMP, "csv")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def pytest_sessionfinish(session, exitstatus):
+    import shutil
+    shutil.rmtree(_TMP, ignore_errors=True)
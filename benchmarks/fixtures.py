@@ -0,0 +1,74 @@
+# benchmarks/fixtures.py – generátory syntetických dat pro benchmarky
+from __future__ import annotations
+
+import io
+import itertools
+import os
+import random
+from datetime import datetime, timedelta
+
+STATUSES = ("passed",) * 16 + ("failed", "skipped", "pending")
+
+# Škály: "small" pro rychlé lokální běhy, "full" odpovídá velikosti produkce.
+SCALES = {
+    "small": {"csv_rows": (1_000, 10_000, 100_000), "projects": 1_000, "suites": 1_000, "runs": 100_000},
+    "full":  {"csv_rows": (1_000, 10_000, 100_000, 1_000_000), "projects": 10_000, "suites": 10_000, "runs": 1_000_000},
+}
+
+
+def scale() -> dict:
+    return SCALES[os.getenv("REPORTY_BENCH_SCALE", "small")]
+
+
+def make_csv_text(rows: int, describes: int = 50, seed: int = 1) -> str:
+    """CSV v layoutu, který čte parse_report_csv (s poznámkou v hlavičce)."""
+    rnd = random.Random(seed)
+    ts0 = datetime(2025, 9, 1, 8, 0, 0)
+    buf = io.StringIO()
+    buf.write("# Syntetický report pro benchmark\n")
+    buf.write("describe,test,status,duration,timestamp,timestampLocal\n")
+    for i in range(rows):
+        ts = ts0 + timedelta(milliseconds=i * 350)
+        buf.write(f"group-{i % describes},test case {i},{rnd.choice(STATUSES)},{rnd.randint(5, 90_000)},"
+                  f"{ts.isoformat()}Z,{ts.strftime('%d.%m.%Y %H:%M:%S')}\n")
+    return buf.getvalue()
+
+
+def write_csv(path: str, rows: int, **kw) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_csv_text(rows, **kw))
+    return path
+
+
+def make_pdf_bytes(pages: int = 3) -> bytes:
+    """Minimální validní PDF s `pages` prázdnými stránkami (bez závislostí)."""
+    objs = ["<</Type/Catalog/Pages 2 0 R>>"]
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objs.append(f"<</Type/Pages/Kids[{kids}]/Count {pages}>>")
+    objs += ["<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]>>"] * pages
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objs, start=1):
+        offsets.append(out.tell())
+        out.write(f"{n} 0 obj{body}endobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode())
+    for off in offsets:
+        out.write(f"{off:010d} 00000 n \n".encode())
+    out.write(f"trailer<</Size {len(objs) + 1}/Root 1 0 R>>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def bulk_insert(session, model, rows, batch: int = 50_000) -> None:
+    """executemany přes Core insert (rows může být generátor) – o řád rychlejší než ORM add()."""
+    table = model.__table__
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, batch))
+        if not chunk:
+            break
+        session.execute(table.insert(), chunk)
+    session.commit()
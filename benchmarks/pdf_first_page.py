@@ -0,0 +1,126 @@
+"""
+Benchmark: time-to-first-page pro velké PDF (obyčejné vs. linearizované).
+
+Spuštění (z kořene repa):
+    python -m benchmarks.pdf_first_page --pages 150 --bandwidth-mbit 20
+
+Viewer s Range requesty potřebuje u obyčejného PDF prakticky celý soubor
+(xref je na konci, objekty strany 1 kdekoli). U linearizovaného stačí
+prvních `/E` bajtů (konec první stránky z linearizačního slovníku).
+Měříme reálný čas odpovědi Flask test clientu + simulovaný přenos linkou.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+
+def _make_pdf(path: str, pages: int) -> None:
+    import pikepdf
+    from PIL import Image
+
+    pdf = pikepdf.new()
+    for i in range(pages):
+        img = Image.frombytes("RGB", (400, 300), os.urandom(400 * 300 * 3))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=70)
+        xobj = pikepdf.Stream(pdf, buf.getvalue(), Type=pikepdf.Name.XObject, Subtype=pikepdf.Name.Image,
+                              Width=400, Height=300, ColorSpace=pikepdf.Name.DeviceRGB,
+                              BitsPerComponent=8, Filter=pikepdf.Name.DCTDecode)
+        content = pikepdf.Stream(pdf, b"q 400 0 0 300 100 400 cm /Im0 Do Q")
+        pdf.pages.append(pikepdf.Page(pikepdf.Dictionary(
+            Type=pikepdf.Name.Page, MediaBox=[0, 0, 595, 842], Contents=content,
+            Resources=pikepdf.Dictionary(XObject=pikepdf.Dictionary(Im0=xobj)),
+        )))
+    pdf.save(path)
+
+
+def _first_page_end(path: str) -> int | None:
+    with open(path, "rb") as f:
+        head = f.read(2048)
+    if b"/Linearized" not in head:
+        return None
+    m = re.search(rb"/E\s+(\d+)", head)
+    return int(m.group(1)) if m else None
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--pages", type=int, default=150)
+    ap.add_argument("--bandwidth-mbit", type=float, default=20.0, help="simulovaná linka (Mbit/s)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", default=None, help="kam uložit výsledky (default stdout)")
+    args = ap.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="reporty-bench-")
+    os.environ.update(
+        DATA_DIR=tmp, SQLITE_PATH=os.path.join(tmp, "app.db"),
+        UPLOAD_DIR=os.path.join(tmp, "logos"), REPORTS_DIR=os.path.join(tmp, "reports"),
+        PDFS_DIR=os.path.join(tmp, "pdfs"),
+    )
+    try:
+        from app import create_app, db
+        from app.models.project_model import Project, ProjectType
+        from app.models.pdf_model import PdfReport
+        from app.utils.pdf_linearize import linearize_pdf
+
+        app = create_app({"TESTING": True})
+        pdf_dir = os.path.join(app.config["PDFS_DIR"], "bench")
+        os.makedirs(pdf_dir, exist_ok=True)
+        plain = os.path.join(pdf_dir, "plain.pdf")
+        lin = os.path.join(pdf_dir, "linear.pdf")
+        _make_pdf(plain, args.pages)
+        shutil.copy(plain, lin)
+        linearize_pdf(lin)
+
+        with app.app_context():
+            db.create_all()
+            p = Project(name="bench", slug="bench", type=ProjectType.web)
+            db.session.add(p)
+            db.session.flush()
+            for name in ("plain.pdf", "linear.pdf"):
+                db.session.add(PdfReport(project_id=p.id, label=name, pdf_path=f"bench/{name}"))
+            db.session.commit()
+
+        client = app.test_client()
+        bps = args.bandwidth_mbit * 1_000_000 / 8
+        results = {"pages": args.pages, "bandwidth_mbit": args.bandwidth_mbit, "cases": {}}
+
+        for name, path in (("plain", plain), ("linearized", lin)):
+            size = os.path.getsize(path)
+            end = _first_page_end(path)
+            headers = {"Range": f"bytes=0-{end - 1}"} if end else {}
+            best = None
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                resp = client.get(f"/storage/pdfs/bench/{os.path.basename(path)}", headers=headers)
+                nbytes = len(resp.get_data())
+                dt = time.perf_counter() - t0
+                best = dt if best is None else min(best, dt)
+            results["cases"][name] = {
+                "file_bytes": size,
+                "status": resp.status_code,
+                "bytes_to_first_page": nbytes,
+                "server_s": round(best, 6),
+                "time_to_first_page_s": round(best + nbytes / bps, 4),
+            }
+
+        out = json.dumps(results, indent=2)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(out)
+        print(out)
+        return 0
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+# gunicorn.conf.py – gunicorn ho načte sám (gunicorn wsgi:app)
+import os
+import shutil
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Metriky v multiprocess režimu (app/utils/metrics.py): adresář musí být
+# nastavený dřív, než se workery naforkují, a při startu prázdný – soubory
+# procesů z minulého běhu by se do čítačů přičítaly.
+_BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+_DATA_DIR = os.getenv("DATA_DIR", os.path.join(_BASE_DIR, "data"))
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(_DATA_DIR, "metrics"))
+
+
+def on_starting(server):
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    os.environ["METRICS_DIR"] = os.environ["PROMETHEUS_MULTIPROC_DIR"] = METRICS_DIR
+
+
+def child_exit(server, worker):
+    # živé gauge mrtvého workeru pryč; čítače a histogramy zůstávají v součtu
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,47 @@
+"""unique section slug
+
+Revision ID: 5d8e1b3a7f02
+Revises: 83ac1085d8d3
+Create Date: 2026-10-19 21:05:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e1b3a7f02'
+down_revision = '83ac1085d8d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # duplicitní slugy sekcí (souběžné zápisy před tímto indexem) dostanou příponu
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT id, project_id, slug FROM suites WHERE parent_id IS NULL ORDER BY project_id, id"
+    )).fetchall()
+    taken = {}
+    for _id, project_id, slug in rows:
+        taken.setdefault(project_id, set()).add(slug)
+    seen = set()
+    for sid, project_id, slug in rows:
+        if (project_id, slug) not in seen:
+            seen.add((project_id, slug))
+            continue
+        n = 2
+        while f"{slug}-{n}" in taken[project_id]:
+            n += 1
+        taken[project_id].add(f"{slug}-{n}")
+        conn.execute(sa.text("UPDATE suites SET slug = :slug WHERE id = :id"),
+                     {"slug": f"{slug}-{n}", "id": sid})
+
+    with op.batch_alter_table('suites', schema=None) as batch_op:
+        batch_op.create_index('uq_suite_section_slug', ['project_id', 'slug'], unique=True,
+                              sqlite_where=sa.text('parent_id IS NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('suites', schema=None) as batch_op:
+        batch_op.drop_index('uq_suite_section_slug')
@@ -0,0 +1,46 @@
+"""shard ingest
+
+Revision ID: a2f7c4e9d1b6
+Revises: 5d8e1b3a7f02
+Create Date: 2026-10-19 23:14:52.406117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2f7c4e9d1b6'
+down_revision = '5d8e1b3a7f02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('runs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('shard_label', sa.String(length=200), nullable=True))
+
+    with op.batch_alter_table('run_stats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('duration_hist', sa.JSON(), nullable=True))
+
+    # existující shardované běhy: label dostane nejnovější běh se shardy
+    # (do toho dosud mířily další shardy se stejným labelem)
+    op.execute(sa.text(
+        "UPDATE runs SET shard_label = label WHERE id IN ("
+        " SELECT MAX(r.id) FROM runs r"
+        " WHERE r.label IS NOT NULL"
+        " AND EXISTS (SELECT 1 FROM run_shards s WHERE s.run_id = r.id)"
+        " GROUP BY r.suite_id, r.label)"
+    ))
+
+    with op.batch_alter_table('runs', schema=None) as batch_op:
+        batch_op.create_index('uq_runs_suite_shard_label', ['suite_id', 'shard_label'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('runs', schema=None) as batch_op:
+        batch_op.drop_index('uq_runs_suite_shard_label')
+        batch_op.drop_column('shard_label')
+
+    with op.batch_alter_table('run_stats', schema=None) as batch_op:
+        batch_op.drop_column('duration_hist')